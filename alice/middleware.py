@@ -12,6 +12,9 @@ ADMIN_PATH = r'newadmin/'
 
 ADMIN_PATH_RE = re.compile(ADMIN_PATH)
 
+# optional header naming the server a request claims to be signed by
+SERVER_HINT_HEADER = 'HTTP_X_SIGNATURE_SERVER'
+
 
 def alice_exempt(view_func):
     """
@@ -41,10 +44,19 @@ class SignatureRejectionMiddleware(MiddlewareMixin):
                 return HttpResponseBadRequest("PFO")
         return None
 
+    def _message_hash(self, path, body):
+        """ sha256 state of the path and body, to be completed with a secret """
+        message_hash = sha256(bytes(path, "utf-8"))
+        message_hash.update(body)
+        return message_hash
+
+    def _sign(self, message_hash, secret):
+        signature = message_hash.copy()
+        signature.update(bytes(secret, "utf-8"))
+        return signature.hexdigest()
+
     def _generate_signature(self, secret, path, body):
-        salt = bytes(secret, "utf-8")
-        path = bytes(path, "utf-8")
-        return sha256(path + body + salt).hexdigest()
+        return self._sign(self._message_hash(path, body), secret)
 
     def _test_signature(self, request):
         """ Return True/False if the signature is recognized
@@ -54,6 +66,11 @@ class SignatureRejectionMiddleware(MiddlewareMixin):
         Note, we set the `server_name` attribute of the matched server on
         request for permission management.
 
+        The path and body are hashed once, and the hash copied for each
+        server's secret. Every secret is compared, so the time taken does not
+        tell which matched; of those matching, the server named by the
+        X-Signature-Server header is preferred, then the first in order.
+
         """
         offered = request.META.get("HTTP_X_SIGNATURE")
         if not offered:
@@ -66,12 +83,15 @@ class SignatureRejectionMiddleware(MiddlewareMixin):
             (settings.MI_SECRET, 'mi'),
             (settings.DATA_SECRET, 'data')
         ]
-        for secret, server_name in servers:
-            generated = self._generate_signature(
-                secret,
-                request.get_full_path(),
-                request.body,
-            )
-            if constant_time_compare(generated, offered):
-                request.server_name = server_name
-                return True
+        claimed = request.META.get(SERVER_HINT_HEADER)
+        servers.sort(key=lambda server: server[1] != claimed)
+
+        message_hash = self._message_hash(request.get_full_path(), request.body)
+        matched = [
+            server_name for secret, server_name in servers
+            if constant_time_compare(self._sign(message_hash, secret), offered)
+        ]
+        if not matched:
+            return False
+        request.server_name = matched[0]
+        return True
@@ -1,3 +1,4 @@
+from hashlib import sha256
 from os import path
 from unittest import mock
 
@@ -53,6 +54,36 @@ class SignatureRejectionMiddlewareTestCase(BaseSignatureTestCase):
         self.request.META['HTTP_X_SIGNATURE'] = self.sig
         self.assertTrue(self.middleware._test_signature(self.request))
 
+    @override_settings(UI_SECRET='other', MI_SECRET=AliceClient.SECRET)
+    def test_test_signature_server_name(self):
+        self.request.META['HTTP_X_SIGNATURE'] = self.sig
+        self.assertTrue(self.middleware._test_signature(self.request))
+        self.assertEqual(self.request.server_name, 'mi')
+
+    @override_settings(UI_SECRET=AliceClient.SECRET, MI_SECRET=AliceClient.SECRET)
+    def test_test_signature_server_hint(self):
+        self.request.META['HTTP_X_SIGNATURE'] = self.sig
+        self.assertTrue(self.middleware._test_signature(self.request))
+        self.assertEqual(self.request.server_name, 'ui')
+
+        self.request.META['HTTP_X_SIGNATURE_SERVER'] = 'mi'
+        self.assertTrue(self.middleware._test_signature(self.request))
+        self.assertEqual(self.request.server_name, 'mi')
+
+    @override_settings(UI_SECRET=AliceClient.SECRET)
+    def test_test_signature_server_hint_not_trusted(self):
+        self.request.META['HTTP_X_SIGNATURE'] = self.sig
+        self.request.META['HTTP_X_SIGNATURE_SERVER'] = 'admin'
+        self.assertTrue(self.middleware._test_signature(self.request))
+        self.assertEqual(self.request.server_name, 'ui')
+
+    @override_settings(UI_SECRET=AliceClient.SECRET)
+    def test_test_signature_hashes_body_once(self):
+        self.request.META['HTTP_X_SIGNATURE'] = self.sig
+        with mock.patch('alice.middleware.sha256', wraps=sha256) as hash_function:
+            self.assertTrue(self.middleware._test_signature(self.request))
+        hash_function.assert_called_once_with(b'/path')
+
     @override_settings(UI_SECRET=AliceClient.SECRET)
     def test_process_request_pass(self):
         self.request.META['HTTP_X_SIGNATURE'] = self.sig
@@ -20,6 +20,12 @@ def pytest_configure():
     django.setup()
 
 
+@pytest.fixture(autouse=True)
+def csv_artifact_root(settings, tmpdir):
+    """Write CSV artifacts of each test to a directory of its own."""
+    settings.CSV_ARTIFACT_ROOT = str(tmpdir)
+
+
 @pytest.fixture()
 def local_memory_cache(monkeypatch):
     """Configure settings.CACHES to use LocMemCache."""
@@ -1,7 +1,13 @@
+import hashlib
+import json
 import logging
+from base64 import b64encode
+from types import MappingProxyType
 
 from django.conf import settings
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils.crypto import constant_time_compare
 
 from rest_framework.authentication import BaseAuthentication
@@ -9,28 +15,50 @@ from rest_framework.permissions import BasePermission
 from rest_framework.exceptions import AuthenticationFailed
 
 from mohawk import Receiver
+from mohawk.base import Resource
 from mohawk.exc import HawkFail
+from mohawk.util import HAWK_VER, calculate_mac, parse_content_type, prepare_header_val
 
 logger = logging.getLogger(__name__)
 
 NO_CREDENTIALS_MESSAGE = 'Authentication credentials were not provided.'
 INCORRECT_CREDENTIALS_MESSAGE = 'Incorrect authentication credentials.'
 PAAS_ADDED_X_FORWARDED_FOR_IPS = 2
+# streamed responses of these types are signed by a last line, see HawkResponseMiddleware
+SIGNED_STREAM_CONTENT_TYPES = ('application/x-ndjson',)
+SIGNED_STREAM_EXT = 'signature=last-line'
+
+
+# {access key ID: read-only credentials as mohawk takes them}, built once
+_CREDENTIALS = {}
+
+
+def load_credentials():
+    """Builds the credentials of each access key ID of settings.HAWK_RECEIVER_CREDENTIALS"""
+    _CREDENTIALS.clear()
+    _CREDENTIALS.update({
+        access_key_id: MappingProxyType({
+            'id': access_key_id,
+            'algorithm': 'sha256',
+            **credentials,
+        })
+        for access_key_id, credentials in settings.HAWK_RECEIVER_CREDENTIALS.items()
+    })
+
+
+@receiver(setting_changed)
+def _reload_credentials(setting, **kwargs):
+    if setting == 'HAWK_RECEIVER_CREDENTIALS':
+        load_credentials()
 
 
 def _lookup_credentials(access_key_id):
     """Raises HawkFail if the access key ID cannot be found."""
     try:
-        credentials = settings.HAWK_RECEIVER_CREDENTIALS[access_key_id]
+        return _CREDENTIALS[access_key_id]
     except KeyError as exc:
         raise HawkFail(f'No Hawk ID of {access_key_id}') from exc
 
-    return {
-        'id': access_key_id,
-        'algorithm': 'sha256',
-        **credentials,
-    }
-
 
 def _seen_nonce(access_key_id, nonce, _):
     """Returns if the passed access_key_id/nonce combination has been
@@ -134,18 +162,85 @@ class HawkAuthentication(BaseAuthentication):
         return (None, hawk_receiver)
 
 
+class _PayloadHash:
+    """Hawk payload hash of a response body, updated as it is streamed"""
+
+    def __init__(self, algorithm, content_type):
+        self._hash = hashlib.new(algorithm)
+        self._hash.update(f'hawk.{HAWK_VER}.payload\n{parse_content_type(content_type)}\n'.encode('utf-8'))
+
+    def update(self, chunk):
+        self._hash.update(chunk)
+
+    def digest(self):
+        payload_hash = self._hash.copy()
+        payload_hash.update(b'\n')
+        return b64encode(payload_hash.digest())
+
+
+def _response_header(receiver, content_hash):
+    """Server-Authorization of the response to the request of `receiver`,
+    whose body has the Hawk payload hash `content_hash`
+    """
+    resource = Resource(
+        url=receiver.resource.url,
+        credentials=receiver.resource.credentials,
+        method=receiver.resource.method,
+        nonce=receiver.parsed_header['nonce'],
+        timestamp=receiver.parsed_header['ts'],
+        app=receiver.parsed_header.get('app'),
+        dlg=receiver.parsed_header.get('dlg'),
+    )
+    mac = calculate_mac('response', resource, content_hash)
+    return f'Hawk mac="{prepare_header_val(mac)}", hash="{prepare_header_val(content_hash)}"'
+
+
+def _signed_stream(receiver, streaming_content, content_type):
+    """Chunks of a streamed body followed by a line signing them"""
+    payload_hash = _PayloadHash(receiver.resource.credentials['algorithm'], content_type)
+    for chunk in streaming_content:
+        payload_hash.update(chunk)
+        yield chunk
+    signature = _response_header(receiver, payload_hash.digest())
+    yield json.dumps({'server_authorization': signature}).encode('utf-8') + b'\n'
+
+
 class HawkResponseMiddleware:
     """Adds the Server-Authorization header to the response, so the originator
     of the request can authenticate the response
+
+    The header of a response streamed as one of `SIGNED_STREAM_CONTENT_TYPES`
+    is sent before its body is produced, so does not hash it, and has ext
+    `SIGNED_STREAM_EXT`. The body is hashed as it is streamed, and its last
+    line is then {"server_authorization": <header>}, a Server-Authorization
+    of the body before that line, checked as a usual Hawk response. Other
+    streamed responses are read whole before they are signed.
     """
 
     def process_response(self, viewset, response):
         """Adds the Server-Authorization header to the response, so the originator
         of the request can authenticate the response
         """
-        response['Server-Authorization'] = viewset.request.auth.respond(
-            content=response.content,
-            content_type=response['Content-Type'],
+        receiver = viewset.request.auth
+        content_type = response['Content-Type']
+        if response.streaming and content_type in SIGNED_STREAM_CONTENT_TYPES:
+            response['Server-Authorization'] = receiver.respond(
+                always_hash_content=False,
+                ext=SIGNED_STREAM_EXT,
+            )
+            response.streaming_content = _signed_stream(
+                receiver, response.streaming_content, content_type)
+            return response
+
+        if response.streaming:
+            # the signature covers the whole body, so it is read before sending
+            content = b''.join(response.streaming_content)
+            response.streaming_content = [content]
+        else:
+            content = response.content
+        response['Server-Authorization'] = receiver.respond(
+            content=content,
+            content_type=content_type,
         )
         return response
 
@@ -1,11 +1,15 @@
 import datetime
+import json
 
 import pytest
+from django.test import override_settings
 from django.urls import reverse
 from freezegun import freeze_time
+from mohawk.exc import MacMismatch, MisComputedContentHash
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, APIClient
 
+from core.hawk import _lookup_credentials
 from test_helpers.mock_views import HawkViewWithScope
 from test_helpers.hawk_utils import hawk_auth_sender as _hawk_auth_sender
 from users.factories import UserFactory
@@ -23,6 +27,10 @@ def _url_incorrect_path():
     return 'http://testserver' + reverse('hawk-view-without-scope') + 'incorrect/'
 
 
+def _url_streaming():
+    return 'http://testserver' + reverse('hawk-streaming-view')
+
+
 def _url_with_scope():
     return 'http://testserver' + reverse('hawk-view-with-scope')
 
@@ -250,6 +258,51 @@ class TestHawkResponseSigning:
         )
         assert response.status_code == status.HTTP_200_OK
 
+    def _get_streamed(self, api_client):
+        sender = hawk_auth_sender(_url_streaming())
+        response = api_client.get(
+            _url_streaming(),
+            content_type='',
+            HTTP_AUTHORIZATION=sender.request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        *lines, signature = b''.join(response.streaming_content).splitlines(keepends=True)
+        return sender, response, lines, json.loads(signature)['server_authorization']
+
+    def test_streamed_response_signed_by_last_line(self, api_client):
+        """A streamed response is signed by a header not hashing its body,
+        then by a last line hashing the lines before it
+        """
+        sender, response, lines, signature = self._get_streamed(api_client)
+
+        sender.accept_response(response['Server-Authorization'], accept_untrusted_content=True)
+        assert 'ext="signature=last-line"' in response['Server-Authorization']
+        assert 'hash=' not in response['Server-Authorization']
+        sender.accept_response(
+            signature,
+            content=b''.join(lines),
+            content_type=response['Content-Type'],
+        )
+        assert [json.loads(line) for line in lines] == [{'line': 0}, {'line': 1}, {'line': 2}]
+
+    def test_streamed_response_tampered(self, api_client):
+        """The last line of a streamed response does not sign any other body"""
+        sender, response, lines, signature = self._get_streamed(api_client)
+
+        with pytest.raises(MisComputedContentHash):
+            sender.accept_response(
+                signature,
+                content=b''.join(lines[:-1]),
+                content_type=response['Content-Type'],
+            )
+        with pytest.raises(MacMismatch):
+            sender.accept_response(
+                signature.replace('hash="', 'hash="x'),
+                content=b''.join(lines),
+                content_type=response['Content-Type'],
+            )
+
     def test_does_not_sign_non_hawk_requests(self):
         """Test that a 403 is returned if the request is not authenticated using Hawk."""
         from rest_framework.test import force_authenticate
@@ -269,6 +322,25 @@ class TestHawkResponseSigning:
         }
 
 
+class TestLookupCredentials:
+    """Tests the credentials built from HAWK_RECEIVER_CREDENTIALS."""
+
+    def test_built_once(self):
+        credentials = _lookup_credentials('no-scope-id')
+        assert credentials == {
+            'id': 'no-scope-id',
+            'algorithm': 'sha256',
+            'key': 'no-scope-key',
+            'scopes': (),
+        }
+        assert _lookup_credentials('no-scope-id') is credentials
+
+    def test_rebuilt_when_settings_change(self):
+        with override_settings(HAWK_RECEIVER_CREDENTIALS={'new-id': {'key': 'new-key', 'scopes': ()}}):
+            assert _lookup_credentials('new-id')['key'] == 'new-key'
+        assert _lookup_credentials('no-scope-id')['key'] == 'no-scope-key'
+
+
 @pytest.mark.django_db
 @pytest.mark.urls('core.tests.urls')
 class TestHawkScopePermission:
@@ -1,8 +1,9 @@
 from django.urls import path
 
-from test_helpers.mock_views import HawkViewWithScope, HawkViewWithoutScope
+from test_helpers.mock_views import HawkStreamingView, HawkViewWithScope, HawkViewWithoutScope
 
 urlpatterns = (
     path('hawk-view-with-scope', HawkViewWithScope.as_view(), name='hawk-view-with-scope'),
     path('hawk-view-without-scope', HawkViewWithoutScope.as_view(), name='hawk-view-without-scope'),
+    path('hawk-streaming-view', HawkStreamingView.as_view(), name='hawk-streaming-view'),
 )
@@ -2,14 +2,15 @@ from functools import lru_cache
 
 import boto3
 import itertools
+import zlib
 from collections import defaultdict
 from operator import itemgetter
 from typing import List, MutableMapping
 
 from django.conf import settings
 from rest_framework.fields import (
-    BooleanField, CharField, ChoiceField, DateField, DecimalField, EmailField, IntegerField,
-    UUIDField,
+    BooleanField, CharField, ChoiceField, DateField, DateTimeField, DecimalField, EmailField,
+    IntegerField, UUIDField,
 )
 
 from extended_choices import Choices
@@ -89,6 +90,55 @@ def get_s3_client_for_bucket(bucket_id):
     )
 
 
+# bytes of each part of a multipart upload, S3 needs all but the last >= 5MB
+S3_PART_SIZE = 8 * 1024 * 1024
+
+
+def gzip_chunks(chunks):
+    """ Gzip compress the bytes `chunks` yields, as they are yielded """
+
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def upload_chunks_to_s3(s3, bucket, key, chunks, part_size=None, **extra_args):
+    """
+    Multipart upload of the bytes `chunks` yields to `key` of `bucket`,
+    holding no more than about `part_size` bytes in memory at a time
+
+    The upload is aborted if reading `chunks` or uploading a part fails.
+    """
+    part_size = part_size or S3_PART_SIZE
+    upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)['UploadId']
+    parts = []
+
+    def upload_part(body):
+        part_number = len(parts) + 1
+        response = s3.upload_part(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body)
+        parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    try:
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= part_size:
+                upload_part(bytes(buffer))
+                buffer.clear()
+        # an upload needs a part, even an empty one
+        if buffer or not parts:
+            upload_part(bytes(buffer))
+        s3.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
+    except BaseException:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+
 def parse_bool(value):
     """Parses a boolean value from a string."""
     return _parse_value(value, BooleanField())
@@ -99,6 +149,11 @@ def parse_date(value):
     return _parse_value(value, DateField())
 
 
+def parse_datetime(value):
+    """Parses a date and time from a string."""
+    return _parse_value(value, DateTimeField())
+
+
 def parse_decimal(value, max_digits=19, decimal_places=2):
     """Parses a decimal from a string."""
     return _parse_value(value, DecimalField(max_digits, decimal_places))
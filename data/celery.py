@@ -12,3 +12,6 @@ app = Celery('export-wins')
 # - namespace='CELERY' means all celery-related configuration keys
 #   should have a `CELERY_` prefix.
 app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# tasks modules of installed apps, e.g. `mi.tasks`
+app.autodiscover_tasks()
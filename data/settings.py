@@ -3,8 +3,10 @@ import logging
 import os
 import shutil
 import sys
+import tempfile
 from urllib.parse import urlencode
 
+from celery.schedules import crontab
 from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 from dotenv import find_dotenv, load_dotenv
@@ -216,6 +218,15 @@ AWS_KEY_CSV_UPLOAD_ACCESS = os.getenv(
 AWS_SECRET_CSV_UPLOAD_ACCESS = os.getenv(
     'AWS_SECRET_CSV_UPLOAD_ACCESS')
 
+# local directory of prebuilt CSV downloads, built by the instance serving
+# them, see `wins.artifacts`
+CSV_ARTIFACT_ROOT = os.getenv('CSV_ARTIFACT_ROOT', os.path.join(tempfile.gettempdir(), 'export-wins-csv'))
+# seconds the watermark of a delta CSV export lags behind its request, so
+# wins saved by transactions committed after the export are in the next one
+CSV_DELTA_LAG = int(os.getenv('CSV_DELTA_LAG', 10 * 60))
+# CSVs of the admin zip built at the same time, each with a DB connection
+CSV_EXPORT_WORKERS = int(os.getenv('CSV_EXPORT_WORKERS', '6'))
+
 BASEDIR = os.path.dirname(os.path.abspath(__file__))
 
 SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", 'True') == 'True'
@@ -400,6 +411,9 @@ _add_hawk_credentials(
 HAWK_IP_WHITELIST = os.getenv('HAWK_IP_WHITELIST', default='')
 HAWK_NONCE_EXPIRY_SECONDS = 60
 
+# most rows of a dataset streamed as NDJSON in a response, see `datasets.pagination`
+DATASET_STREAM_MAX_PAGE_SIZE = int(os.getenv('DATASET_STREAM_MAX_PAGE_SIZE', '100000'))
+
 
 def get_redis_instance():
     """
@@ -441,6 +455,12 @@ CACHES = {
 
 IMPORT_MATCH_ID_TO_WIN_BATCH_SIZE = int(os.getenv('IMPORT_MATCH_ID_TO_WIN_BATCH_SIZE', 500))
 
+# seconds MI responses are cached for, unless MI data changes first
+MI_CACHE_TIMEOUT = int(os.getenv('MI_CACHE_TIMEOUT', 60 * 60))
+# seconds the latest MI responses are kept for, served while being refreshed,
+# outliving the day between warm-ups of the cache
+MI_CACHE_STALE_TIMEOUT = int(os.getenv('MI_CACHE_STALE_TIMEOUT', 26 * 60 * 60))
+
 COMPANY_MATCHING_SERVICE_BASE_URL = os.getenv('COMPANY_MATCHING_SERVICE_BASE_URL', default=None)
 COMPANY_MATCHING_HAWK_ID = os.getenv('COMPANY_MATCHING_HAWK_ID', default=None)
 COMPANY_MATCHING_HAWK_KEY = os.getenv('COMPANY_MATCHING_HAWK_KEY', default=None)
@@ -451,6 +471,13 @@ url_args = {'ssl_cert_reqs': 'CERT_REQUIRED'} if is_rediss else {}
 celery_redis_url = _build_redis_url(redis_uri, 1, **url_args)
 CELERY_RESULT_BACKEND = celery_redis_url
 CELERY_BROKER_URL = celery_redis_url
+CELERY_BEAT_SCHEDULE = {
+    # shortly before working hours, so the first requests of the day are served warm
+    'warm-mi-cache': {
+        'task': 'mi.tasks.warm_mi_cache',
+        'schedule': crontab(minute=30, hour=5),
+    },
+}
 
 CHAR_FIELD_MAX_LENGTH = 255
 
@@ -15,8 +15,8 @@ from activity_stream.views import ActivityStreamViewSet
 from alice.middleware import ADMIN_PATH
 from users.views import IsLoggedIn, LoggedInUserRetrieveViewSet, LoginView, LogoutView
 from wins.views import (AddUserView, AdvisorViewSet, BreakdownViewSet, CSVView,
-                        ChangeCustomerEmailView, CompleteWinsCSVView, ConfirmationViewSet,
-                        CurrentFinancialYearWins, DetailsWinViewSet, LimitedWinViewSet,
+                        ChangeCustomerEmailView, CompleteWinsCSVView, CompleteWinsParquetView,
+                        ConfirmationViewSet, CurrentFinancialYearWins, DetailsWinViewSet, LimitedWinViewSet,
                         NewPasswordView, SendAdminEmailView, SendCustomerEmailView,
                         SoftDeleteWinView, WinViewSet, WinDataHubView)
 
@@ -97,6 +97,7 @@ urlpatterns = [
 
 if settings.API_DEBUG or WINS_CSV_SECRET_PATH:
     secret_path = '/' + WINS_CSV_SECRET_PATH if WINS_CSV_SECRET_PATH else ''
-    urlpatterns.append(
+    urlpatterns += [
         url(fr"^csv{secret_path}/wins/$", CompleteWinsCSVView.as_view(), name="csv_wins"),
-    )
+        url(fr"^csv{secret_path}/wins/parquet/$", CompleteWinsParquetView.as_view(), name="parquet_wins"),
+    ]
@@ -1,4 +1,16 @@
-from rest_framework.pagination import CursorPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _positive_int
+from rest_framework.utils.encoders import JSONEncoder
 
 
 class DatasetViewCursorPagination(CursorPagination):
@@ -14,3 +26,98 @@ class WinsDatasetViewCursorPagination(DatasetViewCursorPagination):
     Cursor Pagination for WinsDatasetView
     """
     ordering = ('created', 'id')
+
+
+class KeysetStreamPagination:
+    """
+    Pages of a dataset streamed as newline-delimited JSON, a row a line
+
+    The final line is `{"next": cursor}`, where the cursor holds the
+    ordering values of the last row, so the next page is read with one
+    query continuing after it, however deep it is, or null once done.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    # rows fetched from the server-side cursor, and completed, at a time
+    chunk_size = 1000
+
+    def __init__(self, ordering):
+        self.ordering = (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+    def get_page_size(self, request):
+        max_page_size = settings.DATASET_STREAM_MAX_PAGE_SIZE
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=max_page_size,
+            )
+        except (KeyError, ValueError):
+            return max_page_size
+
+    def encode_cursor(self, row):
+        position = json.dumps([row[name] for name in self.ordering], cls=JSONEncoder)
+        return urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        """ Ordering values of the row the page continues after, if any """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError(position)
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, position)
+            ]
+        except (BinasciiError, UnicodeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, position):
+        """ Filter of rows after `position` in the ordering """
+
+        return reduce(or_, (
+            Q(**dict(zip(self.ordering[:index], position[:index])),
+              **{self.ordering[index] + '__gt': position[index]})
+            for index in range(len(self.ordering))
+        ))
+
+    def stream(self, queryset, request, complete_page):
+        """
+        Lines of NDJSON of a page of `queryset`, read through a server-side
+        cursor, each chunk of rows passed through `complete_page`
+
+        The cursor is read before the lines are, so an invalid one is raised
+        while the view is called rather than once the response is streamed.
+        """
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+        return self._lines(queryset, page_size, complete_page)
+
+    def _lines(self, queryset, page_size, complete_page):
+        # one row more than the page tells if there is a next page
+        rows = queryset.order_by(*self.ordering)[:page_size + 1].iterator(chunk_size=self.chunk_size)
+
+        encoder = JSONEncoder()
+        streamed = 0
+        last = None
+        has_next = False
+        for chunk in iter(lambda: list(islice(rows, self.chunk_size)), []):
+            if streamed + len(chunk) > page_size:
+                chunk = chunk[:page_size - streamed]
+                has_next = True
+            if not chunk:
+                break
+            for row in complete_page(chunk):
+                yield encoder.encode(row).encode('utf-8') + b'\n'
+            streamed += len(chunk)
+            last = chunk[-1]
+
+        next_cursor = self.encode_cursor(last) if has_next else None
+        yield encoder.encode({'next': next_cursor}).encode('utf-8') + b'\n'
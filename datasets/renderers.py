@@ -0,0 +1,19 @@
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON, requested with `?format=ndjson`
+
+    Datasets stream their rows rather than render them, see
+    `DatasetView.stream`, so only errors are rendered, as a single line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return JSONEncoder().encode(data).encode('utf-8') + b'\n'
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 
 import pytest
@@ -10,8 +11,9 @@ from rest_framework.test import APIClient
 from fixturedb.factories.win import create_win_factory
 from test_helpers.hawk_utils import hawk_auth_sender as _hawk_auth_sender
 from users.factories import UserFactory
-from wins.factories import AdvisorFactory, BreakdownFactory, HVCFactory
-from wins.models import CustomerResponse
+from wins.constants import PROGRAMMES
+from wins.factories import AdvisorFactory, BreakdownFactory, HVCFactory, NotificationFactory
+from wins.models import CustomerResponse, Notification
 
 
 @pytest.fixture
@@ -319,6 +321,58 @@ class TestAdvisorsDatasetViewSet(BaseDatasetViewSetTest):
             self._build_advisor_data(advisor4)
         ]
 
+    @pytest.mark.django_db
+    def test_updated_since(self, api_client):
+        """
+        Test that only advisors changed after updated_since are returned, flagged if deleted
+        """
+        with freeze_time('2019-01-01 01:00:00'):
+            win = create_win_factory(UserFactory.create())(
+                hvc_code='E001',
+                confirm=False,
+                export_value=88,
+                win_date=datetime(2018, 12, 12),
+                notify_date=datetime(2018, 11, 25),
+                response_date=datetime(2018, 12, 30)
+            )
+            AdvisorFactory.create(win=win)
+            deleted_win = create_win_factory(UserFactory.create())(
+                hvc_code='E002',
+                confirm=False,
+                export_value=88,
+                win_date=datetime(2018, 12, 12),
+                notify_date=datetime(2018, 11, 25),
+                response_date=datetime(2018, 12, 30)
+            )
+            deleted = AdvisorFactory.create(win=deleted_win)
+        with freeze_time('2019-02-01 01:00:00'):
+            added = AdvisorFactory.create(win=win)
+            deleted_win.soft_delete()
+
+        url = self.url + '?updated_since=2019-01-15T00:00:00Z'
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == [
+            {**self._build_advisor_data(deleted), 'is_deleted': True},
+            {**self._build_advisor_data(added), 'is_deleted': False},
+        ]
+
+    @pytest.mark.django_db
+    def test_invalid_updated_since(self, api_client):
+        url = self.url + '?updated_since=yesterday'
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     @pytest.mark.django_db
     def test_pagination(self, api_client):
         """
@@ -852,6 +906,132 @@ class TestWinsDatasetViewSet:
         for index, win in enumerate(expected):
             assert self._build_win_data(win) == results[index]
 
+    def _get_ndjson(self, api_client, query):
+        url = self.url + '?' + query
+        sender = hawk_auth_sender(url)
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=sender.request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        sender.accept_response(response['Server-Authorization'], accept_untrusted_content=True)
+        *lines, signature = b''.join(response.streaming_content).splitlines(keepends=True)
+        sender.accept_response(
+            json.loads(signature)['server_authorization'],
+            content=b''.join(lines),
+            content_type=response['Content-Type'],
+        )
+        lines = [json.loads(line) for line in lines]
+        return lines[:-1], lines[-1]['next']
+
+    @pytest.mark.django_db
+    def test_ndjson_stream(self, api_client):
+        """
+        Test that wins are streamed as NDJSON in pages continuing after the last win
+        """
+        wins = []
+        for created in ('2019-01-01 01:00:00', '2017-01-01 03:01:00', '2017-01-01 03:01:00'):
+            with freeze_time(created):
+                wins.append(create_win_factory(UserFactory.create())(
+                    hvc_code='E001',
+                    confirm=True,
+                    export_value=88,
+                    win_date=datetime(2016, 12, 12),
+                    notify_date=datetime(2016, 12, 25),
+                    response_date=datetime(2016, 12, 30)
+                ))
+        expected = sorted(wins[1:], key=lambda win: str(win.pk)) + wins[:1]
+
+        rows, cursor = self._get_ndjson(api_client, 'format=ndjson&page_size=2')
+        assert rows == [self._build_win_data(win) for win in expected[:2]]
+        assert cursor is not None
+
+        rows, cursor = self._get_ndjson(api_client, f'format=ndjson&page_size=2&cursor={cursor}')
+        assert rows == [self._build_win_data(expected[2])]
+        assert cursor is None
+
+        rows, cursor = self._get_ndjson(api_client, 'format=ndjson')
+        assert len(rows) == 3
+        assert cursor is None
+
+    @pytest.mark.django_db
+    def test_ndjson_invalid_cursor(self, api_client):
+        url = self.url + '?format=ndjson&cursor=invalid'
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.django_db
+    def test_updated_since(self, api_client):
+        """
+        Test that wins changed after updated_since, or whose related rows were, are returned
+        """
+        wins = []
+        with freeze_time('2019-01-01 01:00:00'):
+            for hvc_code in ('E001', 'E002', 'E003'):
+                wins.append(create_win_factory(UserFactory.create())(
+                    hvc_code=hvc_code,
+                    confirm=True,
+                    export_value=88,
+                    win_date=datetime(2016, 12, 12),
+                    notify_date=datetime(2016, 12, 25),
+                    response_date=datetime(2016, 12, 30)
+                ))
+        unchanged, advised, deleted = wins
+        with freeze_time('2019-02-01 01:00:00'):
+            AdvisorFactory.create(win=advised)
+            deleted.soft_delete()
+
+        url = self.url + '?updated_since=2019-01-15T00:00:00Z'
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        results = {result['id']: result['is_deleted'] for result in response.json()['results']}
+        assert results == {str(advised.id): False, str(deleted.id): True}
+
+    @pytest.mark.django_db
+    def test_labels_and_notifications(self, api_client):
+        """
+        Test that labels of retired choices and every notification of a win are included
+        """
+        win = create_win_factory(UserFactory.create())(
+            hvc_code='E083',
+            confirm=True,
+            export_value=10000000,
+            win_date=datetime(2017, 3, 25),
+            notify_date=datetime(2017, 3, 25),
+            response_date=datetime(2017, 4, 5)
+        )
+        win.associated_programme_1 = PROGRAMMES.BOFB
+        win.save()
+        first = win.notifications.get()
+        NotificationFactory(win=win)
+        inactive = NotificationFactory(win=win)
+        Notification.objects.filter(pk=inactive.pk).update(is_active=False)
+
+        response = api_client.get(
+            self.url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(self.url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()['results'][0]
+        assert result['associated_programme_1_display'] == 'Britain Open for Business'
+        assert result['num_notifications'] == 3
+        assert result['customer_email_date'] == DateTimeField().to_representation(first.created)
+
     @pytest.mark.django_db
     def test_pagination(self, api_client):
         """
@@ -1029,3 +1209,23 @@ class TestHVCDatasetViewSet:
         )
         assert response.status_code == status.HTTP_200_OK
         assert response.json()['next'] is not None
+
+    @pytest.mark.django_db
+    def test_updated_since(self, api_client):
+        """
+        Test that only HVCs changed after updated_since are returned
+        """
+        with freeze_time('2019-01-01 01:00:00'):
+            HVCFactory.create()
+        with freeze_time('2019-02-01 01:00:00'):
+            hvc = HVCFactory.create()
+
+        url = self.url + '?updated_since=2019-01-15T00:00:00Z'
+        response = api_client.get(
+            url,
+            content_type='',
+            HTTP_AUTHORIZATION=hawk_auth_sender(url).request_header,
+            HTTP_X_FORWARDED_FOR='1.2.3.4, 123.123.123.123',
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == [self._build_hvc_data(hvc)]
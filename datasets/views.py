@@ -1,36 +1,22 @@
-from django.db.models import (
-    Case, CharField, Count, OuterRef, Subquery, Value, When
-)
+from django.db.models import BooleanField, Case, F, Value, When
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator, decorator_from_middleware
-from django_countries import countries
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from core.hawk import HawkAuthentication, HawkResponseMiddleware, HawkScopePermission
 from core.types import HawkScope
+from core.utils import parse_datetime
 from alice.middleware import alice_exempt
-from datasets.pagination import WinsDatasetViewCursorPagination, DatasetViewCursorPagination
-
-from wins.models import Win, Notification, CustomerResponse, Advisor, Breakdown, HVC
+from datasets.pagination import (
+    DatasetViewCursorPagination,
+    KeysetStreamPagination,
+    WinsDatasetViewCursorPagination,
+)
+from datasets.renderers import NDJSONRenderer
 
-
-# Taken from data hubs query utils
-# https://github.com/uktrade/data-hub-leeloo/blob/develop/datahub/core/query_utils.py
-def get_choices_as_case_expression(model, field_name, lookup_field=None):
-    """
-    Gets an SQL expression that returns the display name for a field with choices.
-
-    Usage example:
-        InvestmentProject.objects.annotate(
-            status_name=get_choices_as_case_expression(InvestmentProject, 'status'),
-        )
-    """
-    field = model._meta.get_field(field_name)
-    if lookup_field is None:
-        lookup_field = field_name
-    whens = (
-        When(**{lookup_field: identifier}, then=Value(name)) for identifier, name in field.choices
-    )
-    return Case(*whens, output_field=CharField())
+from wins.choice_labels import choice_labels
+from wins.models import Win, Notification, CustomerResponse, Advisor, Breakdown, HVC, SoftDeleteModel
 
 
 @method_decorator(alice_exempt, name='dispatch')
@@ -38,15 +24,71 @@ class DatasetView(APIView):
     authentication_classes = (HawkAuthentication,)
     permission_classes = (HawkScopePermission,)
     pagination_class = DatasetViewCursorPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
     required_hawk_scope = HawkScope.data_flow_api
+    model = None
+    updated_since = None
+    # (key, model, name of its field with choices) of each column of the
+    # dataset holding the field's value, replaced with its label once fetched
+    choice_label_columns = ()
 
     @decorator_from_middleware(HawkResponseMiddleware)
     def get(self, request):
         """Endpoint returning all `Win` records"""
+        self.updated_since = parse_datetime(request.query_params.get('updated_since'))
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return self.stream(request)
+
         paginator = self.pagination_class()
-        win_data = self.get_dataset()
+        win_data = self.get_rows()
         page = paginator.paginate_queryset(win_data, request)
-        return paginator.get_paginated_response(page)
+        return paginator.get_paginated_response(self.complete_page(page))
+
+    def stream(self, request):
+        """
+        Response streaming a page of up to `DATASET_STREAM_MAX_PAGE_SIZE`
+        rows as NDJSON, in the order of the paginated JSON, see
+        `KeysetStreamPagination`, signed by a last line as it is streamed,
+        see `HawkResponseMiddleware`
+        """
+        paginator = KeysetStreamPagination(self.pagination_class.ordering)
+        lines = paginator.stream(self.get_rows(), request, self.complete_page)
+        return StreamingHttpResponse(lines, content_type=NDJSONRenderer.media_type)
+
+    def get_queryset(self):
+        """
+        Rows of `model` in the dataset, those active, or with `updated_since`
+        those changed after it, soft deleted or not
+        """
+        if self.updated_since is None:
+            return self.model.objects.all()
+        if issubclass(self.model, SoftDeleteModel):
+            return self.model.objects.including_inactive().filter(updated__gt=self.updated_since)
+        return self.model.objects.filter(updated__gt=self.updated_since)
+
+    def get_rows(self):
+        """ The dataset, where changes after `updated_since` tell if soft deleted """
+
+        rows = self.get_dataset()
+        if self.updated_since is not None and issubclass(self.model, SoftDeleteModel):
+            rows = rows.annotate(is_deleted=Case(
+                When(is_active=False, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ))
+        return rows
+
+    def complete_page(self, rows):
+        """ Fill in columns of a page of rows not fetched from the database """
+
+        columns = [
+            (key, choice_labels(model, field_name))
+            for key, model, field_name in self.choice_label_columns
+        ]
+        for row in rows:
+            for key, labels in columns:
+                row[key] = labels.get(row[key])
+        return rows
 
 
 class AdvisorsDatasetView(DatasetView):
@@ -54,10 +96,16 @@ class AdvisorsDatasetView(DatasetView):
     API view providing 'GET' action returning advisers for consumption
     by data flow.
     """
+    model = Advisor
+    choice_label_columns = (
+        ('team_type_display', Advisor, 'team_type'),
+        ('hq_team_display', Advisor, 'hq_team'),
+    )
+
     def get_dataset(self):
-        return Advisor.objects.annotate(
-            team_type_display=get_choices_as_case_expression(Advisor, 'team_type'),
-            hq_team_display=get_choices_as_case_expression(Advisor, 'hq_team'),
+        return self.get_queryset().annotate(
+            team_type_display=F('team_type'),
+            hq_team_display=F('hq_team'),
         ).values(
             'hq_team_display',
             'hq_team',
@@ -75,9 +123,14 @@ class BreakdownsDatasetView(DatasetView):
     API view providing 'GET' action returning breakdowns for consumption
     by data flow.
     """
+    model = Breakdown
+    choice_label_columns = (
+        ('breakdown_type', Breakdown, 'type'),
+    )
+
     def get_dataset(self):
-        return Breakdown.objects.annotate(
-            breakdown_type=get_choices_as_case_expression(Breakdown, 'type'),
+        return self.get_queryset().annotate(
+            breakdown_type=F('type'),
         ).values(
             'id',
             'win__id',
@@ -92,8 +145,10 @@ class HVCDatasetView(DatasetView):
     API view providing 'GET' action returning HVC data for consumption
     by data flow.
     """
+    model = HVC
+
     def get_dataset(self):
-        return HVC.objects.values(
+        return self.get_queryset().values(
             'campaign_id',
             'financial_year',
             'id',
@@ -107,71 +162,38 @@ class WinsDatasetView(DatasetView):
     by data flow.
     """
     pagination_class = WinsDatasetViewCursorPagination
+    model = Win
+    choice_label_columns = (
+        ('associated_programme_1_display', Win, 'associated_programme_1'),
+        ('associated_programme_2_display', Win, 'associated_programme_2'),
+        ('associated_programme_3_display', Win, 'associated_programme_3'),
+        ('associated_programme_4_display', Win, 'associated_programme_4'),
+        ('associated_programme_5_display', Win, 'associated_programme_5'),
+        ('business_potential_display', Win, 'business_potential'),
+        ('confirmation_last_export', CustomerResponse, 'last_export'),
+        ('confirmation_marketing_source', CustomerResponse, 'marketing_source'),
+        ('confirmation_portion_without_help', CustomerResponse, 'expected_portion_without_help'),
+        ('country_name', Win, 'country'),
+        ('customer_location_display', Win, 'customer_location'),
+        ('export_experience_display', Win, 'export_experience'),
+        ('goods_vs_services_display', Win, 'goods_vs_services'),
+        ('hq_team_display', Win, 'hq_team'),
+        ('hvo_programme_display', Win, 'hvo_programme'),
+        ('sector_display', Win, 'sector'),
+        ('team_type_display', Win, 'team_type'),
+        ('type_of_support_1_display', Win, 'type_of_support_1'),
+        ('type_of_support_2_display', Win, 'type_of_support_2'),
+        ('type_of_support_3_display', Win, 'type_of_support_3'),
+    )
 
     def get_dataset(self):
-        notifications_queryset = Notification.objects.filter(
-            win_id=OuterRef('pk'),
-        ).order_by(
-            'pk',
-        )[:1]
-
-        return Win.objects.annotate(
-            associated_programme_1_display=get_choices_as_case_expression(
-                Win,
-                'associated_programme_1'
-            ),
-            associated_programme_2_display=get_choices_as_case_expression(
-                Win,
-                'associated_programme_2'
-            ),
-            associated_programme_3_display=get_choices_as_case_expression(
-                Win,
-                'associated_programme_3'
-            ),
-            associated_programme_4_display=get_choices_as_case_expression(
-                Win,
-                'associated_programme_4'
-            ),
-            associated_programme_5_display=get_choices_as_case_expression(
-                Win,
-                'associated_programme_5'
-            ),
-            business_potential_display=get_choices_as_case_expression(
-                Win,
-                'business_potential'
-            ),
-            confirmation_last_export=get_choices_as_case_expression(
-                CustomerResponse,
-                'last_export',
-                lookup_field='confirmation__last_export'
-            ),
-            confirmation_marketing_source=get_choices_as_case_expression(
-                CustomerResponse,
-                'marketing_source',
-                lookup_field='confirmation__marketing_source'
-            ),
-            confirmation_portion_without_help=get_choices_as_case_expression(
-                CustomerResponse,
-                'expected_portion_without_help',
-                lookup_field='confirmation__expected_portion_without_help'
-            ),
-            country_name=Case(
-                *[When(country=k, then=Value(v)) for k, v in countries],
-                default=None,
-                output_field=CharField()
-            ),
-            customer_email_date=Subquery(notifications_queryset.values('created')),
-            customer_location_display=get_choices_as_case_expression(Win, 'customer_location'),
-            export_experience_display=get_choices_as_case_expression(Win, 'export_experience'),
-            goods_vs_services_display=get_choices_as_case_expression(Win, 'goods_vs_services'),
-            hq_team_display=get_choices_as_case_expression(Win, 'hq_team'),
-            hvo_programme_display=get_choices_as_case_expression(Win, 'hvo_programme'),
-            num_notifications=Count('notifications'),
-            sector_display=get_choices_as_case_expression(Win, 'sector'),
-            team_type_display=get_choices_as_case_expression(Win, 'team_type'),
-            type_of_support_1_display=get_choices_as_case_expression(Win, 'type_of_support_1'),
-            type_of_support_2_display=get_choices_as_case_expression(Win, 'type_of_support_2'),
-            type_of_support_3_display=get_choices_as_case_expression(Win, 'type_of_support_3'),
+        # the labels of these columns are filled in once a page is fetched
+        label_values = {
+            key: F(field_name if model is Win else 'confirmation__' + field_name)
+            for key, model, field_name in self.choice_label_columns
+        }
+        return self.get_queryset().annotate(
+            **label_values
         ).order_by('created').values(
             'associated_programme_1_display',
             'associated_programme_2_display',
@@ -212,7 +234,6 @@ class WinsDatasetView(DatasetView):
             'country_name',
             'created',
             'customer_email_address',
-            'customer_email_date',
             'customer_job_title',
             'customer_location_display',
             'customer_name',
@@ -234,7 +255,6 @@ class WinsDatasetView(DatasetView):
             'line_manager_name',
             'name_of_customer',
             'name_of_export',
-            'num_notifications',
             'other_official_email_address',
             'sector_display',
             'team_type_display',
@@ -247,3 +267,33 @@ class WinsDatasetView(DatasetView):
             'user__email',
             'user__name',
         )
+
+    def get_queryset(self):
+        """
+        Wins, or with `updated_since` those changed after it, soft deleted or
+        not, including changes to the rows of related tables in the dataset
+        """
+        if self.updated_since is None:
+            return Win.objects.all()
+        return Win.objects.including_inactive().changed_since(self.updated_since)
+
+    def complete_page(self, rows):
+        """
+        Fill in labels, and the date of the first and the number of
+        notifications of each win from one query of the page's notifications
+        """
+        rows = super().complete_page(rows)
+        notifications = Notification.objects.including_inactive().filter(
+            win_id__in=[row['id'] for row in rows],
+        ).order_by('win_id', 'pk').values_list('win_id', 'created', 'is_active')
+
+        notified = {}
+        for win_id, created, is_active in notifications:
+            first_active, count = notified.get(win_id, (None, 0))
+            if first_active is None and is_active:
+                first_active = created
+            notified[win_id] = (first_active, count + 1)
+
+        for row in rows:
+            row['customer_email_date'], row['num_notifications'] = notified.get(row['id'], (None, 0))
+        return rows
@@ -0,0 +1,109 @@
+import hashlib
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'mi:data-version'
+RESPONSE_KEY_PREFIX = 'mi:response'
+STALE_RESPONSE_KEY_PREFIX = 'mi:stale-response'
+REFRESH_LOCK_PREFIX = 'mi:refreshing'
+
+# seconds a background refresh of a response is expected to take at most
+REFRESH_LOCK_TIMEOUT = 5 * 60
+
+
+class CachedResponse(Exception):
+    """
+    Raised by MI views when a response can be served without computing it,
+    either from the cache or as 304 Not Modified
+    """
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def get_data_version(key=DATA_VERSION_KEY):
+    """
+    Version of the data MI reports on
+
+    It is the time, in milliseconds, of the last change to wins, customer
+    responses, notifications, targets or HVCs, see `mi.signals`. Other
+    cached MI data (e.g. `mi.geography`) is versioned under its own key.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_data_version(key=DATA_VERSION_KEY):
+    """ Invalidate all cached MI responses, or other data versioned by `key` """
+
+    version = int(time.time() * 1000)
+    current = cache.get(key)
+    if current is not None and current >= version:
+        version = current + 1
+    cache.set(key, version, timeout=None)
+
+
+def _digest(parts):
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _request_parts(view, request, **kwargs):
+    return [
+        '{}.{}'.format(view.__module__, view.__class__.__name__),
+        repr(sorted(kwargs.items())),
+        repr(sorted(request.GET.lists())),
+    ]
+
+
+def response_cache_key(view, request, version, **kwargs):
+    """
+    Cache key of an MI response
+
+    Made of the view, its URL kwargs and query params (`year`, `date_start`,
+    `date_end` etc.), the MI data version and today's date, as unconfirmed
+    wins and the end of the current financial year move with the date.
+    """
+    parts = _request_parts(view, request, **kwargs) + [str(version), date.today().isoformat()]
+    return '{}:{}'.format(RESPONSE_KEY_PREFIX, _digest(parts))
+
+
+def stale_response_cache_key(view, request, **kwargs):
+    """
+    Cache key of the latest MI response of a request, whichever data version
+    and day it was computed for, served only while a current one is computed
+    """
+    parts = _request_parts(view, request, **kwargs)
+    return '{}:{}'.format(STALE_RESPONSE_KEY_PREFIX, _digest(parts))
+
+
+def get_response_data(key):
+    return cache.get(key)
+
+
+def set_response_data(key, data):
+    cache.set(key, data, timeout=settings.MI_CACHE_TIMEOUT)
+
+
+def set_stale_response_data(key, data):
+    cache.set(key, data, timeout=settings.MI_CACHE_STALE_TIMEOUT)
+
+
+def _refresh_lock_key(path, query_string):
+    return '{}:{}'.format(REFRESH_LOCK_PREFIX, _digest([path, query_string]))
+
+
+def lock_refresh(path, query_string):
+    """ True unless a refresh of the response to the request is under way """
+    return cache.add(_refresh_lock_key(path, query_string), True, timeout=REFRESH_LOCK_TIMEOUT)
+
+
+def unlock_refresh(path, query_string):
+    cache.delete(_refresh_lock_key(path, query_string))
@@ -0,0 +1,146 @@
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from mi.cache import bump_data_version, get_data_version
+from mi.models import OverseasRegionYear, Target, TargetCountry
+from wins.models import HVC
+
+GEOGRAPHY_VERSION_KEY = 'mi:geography-version'
+GEOGRAPHY_KEY_PREFIX = 'mi:geography'
+
+
+class GeoTarget(NamedTuple):
+    """ `Target` of a financial year along with the name of its HVC """
+    id: int
+    campaign_id: str
+    target: int
+    charcode: str
+    name: str
+
+
+class FinYearGeography:
+    """
+    Overseas regions, their countries and the countries' HVC targets in a
+    financial year
+
+    Loaded in five queries, rather than one per country of a region and one
+    per target name, and cached by `get_geography` until any of them change.
+    Countries are referred to by their `Country` id and target countries by
+    their country codes, as in `Win.country`.
+    """
+
+    def __init__(self, fin_year_id):
+        self.fin_year_id = fin_year_id
+        fy_digits = str(fin_year_id)[-2:]
+
+        hvc_names = dict(
+            HVC.objects.filter(financial_year=fy_digits).values_list('campaign_id', 'name')
+        )
+        self.targets = {
+            target_id: GeoTarget(target_id, campaign_id, target, campaign_id + fy_digits, hvc_names.get(campaign_id))
+            for target_id, campaign_id, target in Target.objects.for_fin_year(fin_year_id).values_list(
+                'id', 'campaign_id', 'target')
+        }
+
+        # {region id: [country id]} and {country id: country code}
+        self.region_countries = {}
+        self.country_codes = {}
+        region_years = OverseasRegionYear.objects.filter(financial_year_id=fin_year_id).values_list(
+            'overseas_region_id', 'country_id', 'country__country')
+        for region_id, country_id, country_code in region_years:
+            self.region_countries.setdefault(region_id, []).append(country_id)
+            self.country_codes[country_id] = country_code
+
+        # {country id: {target id: contributes to target}}
+        self.country_target_ids = {}
+        target_countries = TargetCountry.objects.filter(target__financial_year_id=fin_year_id).values_list(
+            'country_id', 'target_id', 'contributes_to_target')
+        for country_id, target_id, contributes in target_countries:
+            self.country_target_ids.setdefault(country_id, {})[target_id] = contributes
+
+        # {country id: number of targets of any year it contributes to}
+        self.contributing_target_counts = dict(
+            TargetCountry.objects.filter(contributes_to_target=True).values('country_id').annotate(
+                count=Count('id')).values_list('country_id', 'count')
+        )
+
+    def _country_targets(self, country_id, contributes_to_target):
+        return {
+            self.targets[target_id]
+            for target_id, contributes in self.country_target_ids.get(country_id, {}).items()
+            if contributes == contributes_to_target
+        }
+
+    def _non_contributing(self, targets, contributing_targets):
+        """ targets not also contributing, with a target of 0 """
+        campaign_ids = {t.campaign_id for t in contributing_targets}
+        return {t._replace(target=0) for t in targets if t.campaign_id not in campaign_ids}
+
+    def country_targets(self, country_id):
+        """ See `Country.fin_year_targets` """
+        return self._country_targets(country_id, True)
+
+    def country_non_contributing_targets(self, country_id):
+        """ See `Country.non_contributing_targets` """
+        return self._non_contributing(self._country_targets(country_id, False), self.country_targets(country_id))
+
+    def region_targets(self, region_id):
+        """ See `OverseasRegion.fin_year_targets` """
+        targets = set()
+        for country_id in self.region_countries.get(region_id, []):
+            targets |= self.country_targets(country_id)
+        return targets
+
+    def region_non_contributing_targets(self, region_id):
+        """ See `OverseasRegion.fin_year_non_contributing_targets` """
+        targets = set()
+        for country_id in self.region_countries.get(region_id, []):
+            targets |= self.country_non_contributing_targets(country_id)
+        return self._non_contributing(targets, self.region_targets(region_id))
+
+    def region_country_ids(self, region_id, contributes_to_target=None):
+        """
+        Country codes of the region, optionally only those with a target
+        they contribute to (or not) this financial year
+        """
+        country_ids = self.region_countries.get(region_id, [])
+        if contributes_to_target is not None:
+            country_ids = [
+                country_id for country_id in country_ids
+                if contributes_to_target in self.country_target_ids.get(country_id, {}).values()
+            ]
+        return [self.country_codes[country_id] for country_id in country_ids]
+
+    def region_market_count(self, region_id):
+        """
+        Markets of the region in overviews, counted as they always were by
+        `OverseasRegion.fin_year_country_ids(..., contributes_to_target=True)`:
+        once for each target, of any year, each country of the region this
+        year contributes to
+        """
+        return sum(
+            self.contributing_target_counts.get(country_id, 0)
+            for country_id in self.region_countries.get(region_id, [])
+        )
+
+
+def get_geography(fin_year):
+    """ Cached `FinYearGeography` of given `FinancialYear` """
+
+    version = get_data_version(GEOGRAPHY_VERSION_KEY)
+    key = '{}:{}:{}'.format(GEOGRAPHY_KEY_PREFIX, fin_year.id, version)
+    geography = cache.get(key)
+    if geography is None:
+        geography = FinYearGeography(fin_year.id)
+        cache.set(key, geography, timeout=settings.MI_CACHE_TIMEOUT)
+    return geography
+
+
+def bump_geography_version():
+    """ Invalidate cached geographies, and MI responses built from them """
+
+    bump_data_version(GEOGRAPHY_VERSION_KEY)
+    bump_data_version()
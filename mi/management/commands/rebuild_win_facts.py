@@ -0,0 +1,18 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from mi.win_facts import rebuild_win_facts, REBUILD_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MI win fact table from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = rebuild_win_facts(batch_size=options['batch_size'])
+        self.stdout.write(f'Rebuilt {count} win facts')
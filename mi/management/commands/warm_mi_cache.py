@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from mi.prewarm import warm_cache
+
+
+class Command(BaseCommand):
+    help = 'Precompute cached MI responses, e.g. after a deploy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year', type=int, action='append', dest='years',
+            help='financial year to warm, current and previous by default',
+        )
+
+    def handle(self, *args, **options):
+        count = warm_cache(years=options['years'])
+        self.stdout.write(f'Warmed {count} MI responses')
@@ -0,0 +1,126 @@
+# Generated by Django 2.2.13 on 2026-10-16 20:52
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.db.models.deletion
+import django_countries.fields
+from pytz import UTC
+
+
+START_OF_2017_FY = datetime.datetime(2017, 4, 1, tzinfo=UTC)
+
+
+def populate_win_facts(apps, schema_editor):
+    # frozen copy of `mi.win_facts.rebuild_win_facts` using historical models
+    Win = apps.get_model('wins', 'Win')
+    CustomerResponse = apps.get_model('wins', 'CustomerResponse')
+    Notification = apps.get_model('wins', 'Notification')
+    WinFact = apps.get_model('mi', 'WinFact')
+
+    responses = {
+        r['win_id']: r
+        for r in CustomerResponse.objects.values('win_id', 'created', 'agree_with_win')
+    }
+    notifications = dict(
+        Notification.objects.filter(
+            type='c', is_active=True,
+        ).values('win_id').annotate(
+            created=Max('created'),
+        ).values_list('win_id', 'created')
+    )
+
+    facts = []
+    for win in Win.objects.filter(is_active=True).iterator():
+        response = responses.get(win.id, {})
+        confirmation_created = response.get('created')
+        agree_with_win = response.get('agree_with_win')
+        if not confirmation_created:
+            status = 'unconfirmed'
+        elif confirmation_created < START_OF_2017_FY or agree_with_win:
+            status = 'confirmed'
+        else:
+            status = 'rejected'
+        when = confirmation_created or win.date
+        facts.append(WinFact(
+            win_id=win.id,
+            status=status,
+            financial_year=when.year - 1 if when.month < 4 else when.year,
+            hvc=win.hvc,
+            hvc_campaign_id=win.hvc[:4] if win.hvc else None,
+            sector=win.sector,
+            country=win.country,
+            team_type=win.team_type,
+            hq_team=win.hq_team,
+            export_experience=win.export_experience,
+            date=win.date,
+            total_expected_export_value=win.total_expected_export_value,
+            total_expected_non_export_value=win.total_expected_non_export_value,
+            confirmation_created=confirmation_created,
+            agree_with_win=agree_with_win,
+            notification_created=notifications.get(win.id),
+        ))
+    WinFact.objects.bulk_create(facts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wins', '0060_auto_20210120_1408'),
+        ('mi', '0004_update_sectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WinFact',
+            fields=[
+                ('win', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='mi_fact', serialize=False, to='wins.Win')),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('unconfirmed', 'Unconfirmed'), ('rejected', 'Rejected')], max_length=16)),
+                ('financial_year', models.PositiveIntegerField()),
+                ('hvc', models.CharField(blank=True, max_length=6, null=True)),
+                ('hvc_campaign_id', models.CharField(blank=True, max_length=4, null=True)),
+                ('sector', models.PositiveIntegerField()),
+                ('country', django_countries.fields.CountryField(max_length=2)),
+                ('team_type', models.CharField(max_length=128)),
+                ('hq_team', models.CharField(max_length=128)),
+                ('export_experience', models.PositiveIntegerField(null=True)),
+                ('date', models.DateField()),
+                ('total_expected_export_value', models.BigIntegerField()),
+                ('total_expected_non_export_value', models.BigIntegerField()),
+                ('confirmation_created', models.DateTimeField(null=True)),
+                ('agree_with_win', models.NullBooleanField()),
+                ('notification_created', models.DateTimeField(null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['financial_year', 'status'], name='mi_winfact_financi_594de8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['confirmation_created'], name='mi_winfact_confirm_1a4066_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['date'], name='mi_winfact_date_db183a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['hvc_campaign_id'], name='mi_winfact_hvc_cam_a08dae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['sector'], name='mi_winfact_sector_692c57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['country'], name='mi_winfact_country_488b3b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='winfact',
+            index=models.Index(fields=['hq_team'], name='mi_winfact_hq_team_cbac62_idx'),
+        ),
+        migrations.RunPython(populate_win_facts, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,7 @@ import datetime
 from django.contrib.postgres.fields import ArrayField
 
 from django.db import models
-from django.db.models import PROTECT
+from django.db.models import PROTECT, Q
 from django.utils.functional import cached_property
 
 from django_countries.fields import CountryField
@@ -10,7 +10,7 @@ from extended_choices import Choices
 from pytz import UTC
 
 from wins.constants import UK_REGIONS
-from wins.models import HVC
+from wins.models import HVC, Win
 
 
 class OverseasRegionGroupYear(models.Model):
@@ -438,3 +438,104 @@ class UKRegionTarget(models.Model):
 
     class Meta:
         unique_together = ('financial_year', 'region')
+
+
+class WinFact(models.Model):
+    """
+    Denormalised MI row for a single active `Win`
+
+    Holds the columns MI endpoints group and sum on, so they can be read
+    without joining customer responses and notifications on each request.
+    Rows are kept in sync by `mi.signals` and can be rebuilt in full with
+    the `rebuild_win_facts` management command.
+    """
+
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_UNCONFIRMED = 'unconfirmed'
+    STATUS_REJECTED = 'rejected'
+    STATUSES = (
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_UNCONFIRMED, 'Unconfirmed'),
+        (STATUS_REJECTED, 'Rejected'),
+    )
+
+    # before 2017/18 FY any customer response confirmed a win, afterwards
+    # the customer has to explicitly agree with it
+    START_OF_2017_FY = datetime.datetime(2017, 4, 1, tzinfo=UTC)
+
+    win = models.OneToOneField(
+        Win,
+        primary_key=True,
+        related_name='mi_fact',
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(max_length=16, choices=STATUSES)
+    financial_year = models.PositiveIntegerField()
+    hvc = models.CharField(max_length=6, blank=True, null=True)
+    hvc_campaign_id = models.CharField(max_length=4, blank=True, null=True)
+    sector = models.PositiveIntegerField()
+    country = CountryField()
+    team_type = models.CharField(max_length=128)
+    hq_team = models.CharField(max_length=128)
+    export_experience = models.PositiveIntegerField(null=True)
+    date = models.DateField()
+    total_expected_export_value = models.BigIntegerField()
+    total_expected_non_export_value = models.BigIntegerField()
+    confirmation_created = models.DateTimeField(null=True)
+    agree_with_win = models.NullBooleanField()
+    notification_created = models.DateTimeField(null=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['financial_year', 'status']),
+            models.Index(fields=['confirmation_created']),
+            models.Index(fields=['date']),
+            models.Index(fields=['hvc_campaign_id']),
+            models.Index(fields=['sector']),
+            models.Index(fields=['country']),
+            models.Index(fields=['hq_team']),
+        ]
+
+    def __str__(self):
+        return 'WinFact: {} ({})'.format(self.win_id, self.status)
+
+    @classmethod
+    def status_for(cls, confirmation_created, agree_with_win):
+        """ Confirmed, unconfirmed or rejected, see `BaseWinMIView._win_status` """
+
+        if not confirmation_created:
+            return cls.STATUS_UNCONFIRMED
+
+        if confirmation_created < cls.START_OF_2017_FY or agree_with_win:
+            return cls.STATUS_CONFIRMED
+
+        return cls.STATUS_REJECTED
+
+    @classmethod
+    def status_filter(cls, status, prefix=''):
+        """
+        `Q` object matching the rows `status_for` gives `status`, so that
+        statuses can be aggregated in the database
+
+        `prefix` is the lookup path to the `WinFact` e.g. 'mi_fact__'
+        """
+        created = prefix + 'confirmation_created'
+        if status == cls.STATUS_UNCONFIRMED:
+            return Q(**{created + '__isnull': True})
+
+        confirmed = Q(**{created + '__lt': cls.START_OF_2017_FY}) | Q(**{prefix + 'agree_with_win': True})
+        if status == cls.STATUS_CONFIRMED:
+            return Q(**{created + '__isnull': False}) & confirmed
+        return Q(**{created + '__isnull': False}) & ~confirmed
+
+    @classmethod
+    def financial_year_for(cls, confirmation_created, date):
+        """
+        `FinancialYear` id the win is reported in: that of the customer
+        response if there is one, else that of the win date
+        """
+        when = confirmation_created or date
+        if when.month < 4:
+            return when.year - 1
+        return when.year
@@ -0,0 +1,130 @@
+import logging
+from urllib.parse import urlencode
+
+from django.http import HttpRequest, QueryDict
+from django.urls import resolve, reverse
+
+from mi.models import Country, FinancialYear, HVCGroup, OverseasRegion, SectorTeam, Target
+
+logger = logging.getLogger(__name__)
+
+
+def _team_ids(fin_year, view):
+    return SectorTeam.objects.filter(hvc_groups__targets__financial_year=fin_year).distinct().values_list(
+        'id', flat=True)
+
+
+def _region_ids(fin_year, view):
+    return OverseasRegion.objects.filter(overseasregionyear__financial_year=fin_year).distinct().values_list(
+        'id', flat=True)
+
+
+def _group_ids(fin_year, view):
+    return HVCGroup.objects.filter(targets__financial_year=fin_year).distinct().values_list('id', flat=True)
+
+
+def _campaign_ids(fin_year, view):
+    return Target.objects.for_fin_year(fin_year).values_list('campaign_id', flat=True).distinct()
+
+
+def _country_codes(fin_year, view):
+    return Country.objects.values_list('country', flat=True)
+
+
+def _team_slugs(fin_year, view):
+    return [option['slug'] for option in view.valid_options]
+
+
+# {URL kwarg of `mi.urls`: function of (fin_year, view) giving its values}
+ENTITY_KWARGS = {
+    'team_id': _team_ids,
+    'region_id': _region_ids,
+    'group_id': _group_ids,
+    'campaign_id': _campaign_ids,
+    'country_code': _country_codes,
+    'team_slug': _team_slugs,
+}
+
+
+def _pattern_kwargs(pattern, fin_year):
+    """ URL kwargs of every entity a `mi.urls` pattern exposes in the year """
+
+    names = list(pattern.pattern.regex.groupindex)
+    if not names:
+        return [{}]
+    if len(names) > 1:
+        raise ValueError('cannot enumerate {} of {}'.format(names, pattern.name))
+
+    name = names[0]
+    view = pattern.callback.view_class(**pattern.callback.view_initkwargs)
+    return [{name: value} for value in ENTITY_KWARGS[name](fin_year, view)]
+
+
+def mi_paths(fin_years):
+    """ (path, query string) of every cached MI response for given `FinancialYear`s """
+
+    from mi.urls import urlpatterns
+
+    for fin_year in fin_years:
+        query_string = urlencode({'year': fin_year.id})
+        for pattern in urlpatterns:
+            if not getattr(pattern.callback.view_class, 'cache_responses', False):
+                continue
+            for kwargs in _pattern_kwargs(pattern, fin_year):
+                yield reverse('mi:{}'.format(pattern.name), kwargs=kwargs), query_string
+
+
+def render_response(path, query_string):
+    """
+    Compute the MI response to a GET of `path`, storing it in the cache
+
+    The view runs as for any request, apart from checking permissions and
+    serving a cached response, see `BaseExportMIView.refreshing`.
+    """
+    match = resolve(path)
+    view = match.func.view_class(refreshing=True, **match.func.view_initkwargs)
+
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.path = http_request.path_info = path
+    http_request.GET = QueryDict(query_string)
+    http_request.META['QUERY_STRING'] = query_string
+
+    view.args = match.args
+    view.kwargs = match.kwargs
+    request = view.initialize_request(http_request, *match.args, **match.kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+
+    try:
+        view.initial(request, *match.args, **match.kwargs)
+        response = view.get(request, *match.args, **match.kwargs)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    return response
+
+
+def warm_cache(years=None):
+    """
+    Precompute cached MI responses of every entity, for the current and
+    previous financial years by default
+
+    Returns the number of responses computed.
+    """
+    if years is None:
+        current = FinancialYear.current_fy()
+        years = [current - 1, current]
+    fin_years = FinancialYear.objects.filter(id__in=years).order_by('id')
+
+    count = 0
+    for path, query_string in mi_paths(fin_years):
+        try:
+            response = render_response(path, query_string)
+        except Exception:
+            logger.exception('MI cache warm-up of %s?%s failed', path, query_string)
+            continue
+        if response.status_code != 200:
+            logger.warning('MI cache warm-up of %s?%s failed: %s', path, query_string, response.status_code)
+            continue
+        count += 1
+    return count
@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mi.cache import bump_data_version
+from mi.geography import bump_geography_version
+from mi.models import Country, OverseasRegionYear, Target, TargetCountry
+from mi.win_facts import refresh_win_fact
+from wins.models import CustomerResponse, HVC, Notification, Win
+
+
+@receiver(post_save, sender=Win, dispatch_uid='mi_win_fact_win_post_save')
+def win_saved(sender, instance, **kwargs):
+    """Keep the MI fact row of a win in step with the win itself."""
+    if kwargs['raw']:
+        return
+    refresh_win_fact(instance.pk)
+
+
+@receiver(post_save, sender=CustomerResponse, dispatch_uid='mi_win_fact_response_post_save')
+@receiver(post_save, sender=Notification, dispatch_uid='mi_win_fact_notification_post_save')
+def win_related_saved(sender, instance, **kwargs):
+    """Customer responses and notifications change a win's MI status."""
+    if kwargs['raw']:
+        return
+    refresh_win_fact(instance.win_id)
+
+
+@receiver(post_delete, sender=CustomerResponse, dispatch_uid='mi_win_fact_response_post_delete')
+@receiver(post_delete, sender=Notification, dispatch_uid='mi_win_fact_notification_post_delete')
+def win_related_deleted(sender, instance, **kwargs):
+    """
+    Refresh once the deletion is committed, as it may be part of deleting
+    the win itself, whose fact row then goes with it
+    """
+    win_id = instance.win_id
+    transaction.on_commit(lambda: refresh_win_fact(win_id))
+
+
+@receiver(post_save, sender=Win, dispatch_uid='mi_cache_win_post_save')
+@receiver(post_delete, sender=Win, dispatch_uid='mi_cache_win_post_delete')
+@receiver(post_save, sender=CustomerResponse, dispatch_uid='mi_cache_response_post_save')
+@receiver(post_delete, sender=CustomerResponse, dispatch_uid='mi_cache_response_post_delete')
+@receiver(post_save, sender=Notification, dispatch_uid='mi_cache_notification_post_save')
+@receiver(post_delete, sender=Notification, dispatch_uid='mi_cache_notification_post_delete')
+@receiver(post_save, sender=Target, dispatch_uid='mi_cache_target_post_save')
+@receiver(post_delete, sender=Target, dispatch_uid='mi_cache_target_post_delete')
+@receiver(post_save, sender=HVC, dispatch_uid='mi_cache_hvc_post_save')
+@receiver(post_delete, sender=HVC, dispatch_uid='mi_cache_hvc_post_delete')
+def mi_data_changed(sender, **kwargs):
+    """
+    Cached MI responses are stale once the change is committed, bumping the
+    version any earlier would let a concurrent request cache old data
+    """
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(post_save, sender=Target, dispatch_uid='mi_geography_target_post_save')
+@receiver(post_delete, sender=Target, dispatch_uid='mi_geography_target_post_delete')
+@receiver(post_save, sender=TargetCountry, dispatch_uid='mi_geography_target_country_post_save')
+@receiver(post_delete, sender=TargetCountry, dispatch_uid='mi_geography_target_country_post_delete')
+@receiver(post_save, sender=OverseasRegionYear, dispatch_uid='mi_geography_region_year_post_save')
+@receiver(post_delete, sender=OverseasRegionYear, dispatch_uid='mi_geography_region_year_post_delete')
+@receiver(post_save, sender=Country, dispatch_uid='mi_geography_country_post_save')
+@receiver(post_delete, sender=Country, dispatch_uid='mi_geography_country_post_delete')
+@receiver(post_save, sender=HVC, dispatch_uid='mi_geography_hvc_post_save')
+@receiver(post_delete, sender=HVC, dispatch_uid='mi_geography_hvc_post_delete')
+def mi_geography_changed(sender, **kwargs):
+    """ Cached `mi.geography` graphs are stale once the change is committed """
+    transaction.on_commit(bump_geography_version)
@@ -0,0 +1,42 @@
+import logging
+
+from celery import shared_task
+
+from mi.cache import lock_refresh, unlock_refresh
+from mi.prewarm import render_response, warm_cache
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_in_background(path, query_string):
+    """
+    Refresh the cached MI response to a request, unless already under way
+
+    A refresh that cannot be queued is logged and left to the next request,
+    so the stale response is still served.
+    """
+    if not lock_refresh(path, query_string):
+        return
+    try:
+        refresh_mi_response.delay(path, query_string)
+    except Exception:
+        logger.exception('Could not queue a refresh of MI response of %s?%s', path, query_string)
+        unlock_refresh(path, query_string)
+
+
+@shared_task
+def refresh_mi_response(path, query_string):
+    """ Recompute the cached MI response to a GET of `path` """
+    try:
+        response = render_response(path, query_string)
+        logger.info('Refreshed MI response of %s?%s: %s', path, query_string, response.status_code)
+    finally:
+        unlock_refresh(path, query_string)
+
+
+@shared_task
+def warm_mi_cache(years=None):
+    """ Precompute the cached responses of every MI entity, see `mi.prewarm` """
+    count = warm_cache(years=years)
+    logger.info('Warmed %s MI responses', count)
+    return count
@@ -166,6 +166,6 @@ class BaseWinMIViewTestCase(BaseTestCase):
 
         win_filter = self.view._wins_filter()
         filter_key, filter_params = win_filter.children[0] # first filtering of the win_filter
-        self.assertEqual(filter_key, 'confirmation__created__range')
+        self.assertEqual(filter_key, 'mi_fact__confirmation_created__range')
         self.assertEqual(filter_params, (start, end,))
 
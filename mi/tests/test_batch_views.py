@@ -0,0 +1,85 @@
+from django.core.management import call_command
+from django.urls import reverse
+from freezegun import freeze_time
+
+from fixturedb.factories.win import create_win_factory
+from mi.tests.base_test_case import MiApiViewsBaseTestCase, MiApiViewsWithWinsBaseTestCase
+
+ENVELOPE_KEYS = ('timestamp', 'financial_year', 'date_range')
+
+
+@freeze_time(MiApiViewsBaseTestCase.frozen_date)
+class BatchViewsTestCase(MiApiViewsWithWinsBaseTestCase):
+    """ Each facet of a batch matches the response of its own endpoint """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('create_missing_hvcs', verbose=False)
+
+    def setUp(self):
+        super().setUp()
+        self._win_factory_function = create_win_factory(self.user, sector_choices=self.TEAM_1_SECTORS)
+        self._create_hvc_win(hvc_code='E006', confirm=True, export_value=100000,
+                             response_date=self.frozen_date)
+        self._create_hvc_win(hvc_code='E017', export_value=200000, country='FR')
+        self._create_hvc_win(hvc_code='E045', confirm=True, export_value=300000, country='FR',
+                             response_date=self.frozen_date)
+        self._create_non_hvc_win(export_value=400000, country='FR')
+        self._create_non_hvc_win(confirm=True, export_value=500000, country='CA',
+                                 response_date=self.frozen_date)
+
+    def _endpoint_data(self, url_name, kwargs):
+        data = self._get_api_response(reverse(url_name, kwargs=kwargs) + '?year=2016').data
+        return {key: value for key, value in data.items() if key not in ENVELOPE_KEYS}
+
+    def assertBatchMatchesEndpoints(self, batch_url_name, kwargs, facet_url_names):
+        url = reverse(batch_url_name, kwargs=kwargs) + '?year=2016'
+        batch = self._get_api_response(url).data['results']
+        self.assertEqual(set(batch), set(facet_url_names))
+        for facet, url_name in facet_url_names.items():
+            self.assertEqual(batch[facet], self._endpoint_data(url_name, kwargs))
+        return batch
+
+    def test_sector_team_batch(self):
+        batch = self.assertBatchMatchesEndpoints('mi:sector_team_batch', {'team_id': 1}, {
+            'detail': 'mi:sector_team_detail',
+            'months': 'mi:sector_team_months',
+            'campaigns': 'mi:sector_team_campaigns',
+            'top_non_hvcs': 'mi:sector_team_top_non_hvc',
+            'win_table': 'mi:sector_team_win_table',
+        })
+        self.assertEqual(len(batch['win_table']['results']['wins']['hvc']), 1)
+        self.assertEqual(len(batch['win_table']['results']['wins']['non_hvc']), 2)
+
+    def test_overseas_region_batch(self):
+        self.assertBatchMatchesEndpoints('mi:overseas_region_batch', {'region_id': 10}, {
+            'detail': 'mi:overseas_region_detail',
+            'months': 'mi:overseas_region_monthly',
+            'campaigns': 'mi:overseas_region_campaigns',
+            'top_non_hvcs': 'mi:overseas_region_top_nonhvc',
+            'win_table': 'mi:overseas_region_win_table',
+        })
+
+    def test_country_batch(self):
+        batch = self.assertBatchMatchesEndpoints('mi:country_batch', {'country_code': 'FR'}, {
+            'detail': 'mi:country_detail',
+            'months': 'mi:country_monthly',
+            'campaigns': 'mi:country_campaigns',
+            'top_non_hvcs': 'mi:country_top_nonhvc',
+            'win_table': 'mi:country_win_table',
+        })
+        self.assertEqual(batch['detail']['results']['wins']['export']['totals']['number']['grand_total'], 2)
+
+    def test_batch_of_selected_facets(self):
+        url = reverse('mi:sector_team_batch', kwargs={'team_id': 1}) + '?year=2016&facets=months,win_table'
+        batch = self._get_api_response(url).data['results']
+        self.assertEqual(set(batch), {'months', 'win_table'})
+
+    def test_batch_of_unknown_facet(self):
+        url = reverse('mi:sector_team_batch', kwargs={'team_id': 1}) + '?year=2016&facets=months,targets'
+        self._get_api_response(url, status_code=400)
+
+    def test_batch_of_unknown_entity(self):
+        url = reverse('mi:sector_team_batch', kwargs={'team_id': 1000}) + '?year=2016'
+        self._get_api_response(url, status_code=400)
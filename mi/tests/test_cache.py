@@ -0,0 +1,118 @@
+import datetime
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from freezegun import freeze_time
+
+from fixturedb.factories.win import create_win_factory
+from mi.cache import bump_data_version, get_data_version
+from mi.models import FinancialYear
+from mi.prewarm import mi_paths, render_response, warm_cache
+from mi.tests.base_test_case import MiApiViewsWithWinsBaseTestCase
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MIResponseCacheTestCase(MiApiViewsWithWinsBaseTestCase):
+    url = reverse('mi:global_wins') + '?year=2016'
+
+    def setUp(self):
+        super().setUp()
+        self._win_factory_function = create_win_factory(self.user, sector_choices=self.TEAM_1_SECTORS)
+        # responses cached by other tests
+        cache.clear()
+
+    def _hvc_number(self):
+        return self._api_response_data['wins']['hvc']['number']['total']
+
+    def test_response_is_cached_until_data_version_changes(self):
+        self.assertEqual(self._hvc_number(), 0)
+
+        # test transactions are never committed, so the version isn't bumped
+        self._create_hvc_win(hvc_code='E017', confirm=True, response_date=self.frozen_date)
+        self.assertEqual(self._hvc_number(), 0)
+
+        bump_data_version()
+        # the latest response is served while being refreshed in the background
+        self.assertEqual(self._hvc_number(), 0)
+        self.assertEqual(self._hvc_number(), 1)
+
+    def test_stale_response_served_when_refresh_cannot_be_queued(self):
+        self.assertEqual(self._hvc_number(), 0)
+        self._create_hvc_win(hvc_code='E017', confirm=True, response_date=self.frozen_date)
+        bump_data_version()
+
+        with patch('mi.tasks.refresh_mi_response.delay', side_effect=OSError('broker down')) as delay:
+            self.assertEqual(self._hvc_number(), 0)
+            # the refresh lock is released, so the next request queues it again
+            self.assertEqual(self._hvc_number(), 0)
+        self.assertEqual(delay.call_count, 2)
+        self.assertEqual(self._hvc_number(), 0)
+        self.assertEqual(self._hvc_number(), 1)
+
+    def test_stale_response_served_on_the_next_day(self):
+        self.assertEqual(self._hvc_number(), 0)
+        self._create_hvc_win(hvc_code='E017', confirm=True, response_date=self.frozen_date)
+
+        # the response of the day before, e.g. warmed then, is served while being refreshed
+        with freeze_time(datetime.date.today() + datetime.timedelta(days=1)):
+            self.assertEqual(self._hvc_number(), 0)
+            self.assertEqual(self._hvc_number(), 1)
+
+    def test_unchanged_response_is_not_modified(self):
+        response = self._get_api_response(self.url)
+        self.assertIn('Last-Modified', response)
+
+        self._login()
+        with patch('sso.middleware.saml2.has_MI_permission', lambda _: True), \
+                override_settings(MI_SECRET=self.alice_client.SECRET):
+            not_modified = self.alice_client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+
+            bump_data_version()
+            stale = self.alice_client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(stale.status_code, 200)
+            self.assertNotIn('ETag', stale)
+
+            modified = self.alice_client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(modified.status_code, 200)
+            self.assertNotEqual(modified['ETag'], response['ETag'])
+
+    def test_win_changes_bump_data_version(self):
+        version = get_data_version()
+        with patch('mi.signals.transaction.on_commit', lambda fn: fn()):
+            self._create_hvc_win(hvc_code='E017')
+        self.assertGreater(get_data_version(), version)
+
+    def test_rendered_response_is_cached(self):
+        response = render_response(reverse('mi:global_wins'), 'year=2016')
+        self.assertEqual(response.status_code, 200)
+
+        self._create_hvc_win(hvc_code='E017', confirm=True, response_date=self.frozen_date)
+        self.assertEqual(self._hvc_number(), 0)
+
+
+class MIPrewarmTestCase(MiApiViewsWithWinsBaseTestCase):
+
+    def test_mi_paths_cover_every_entity(self):
+        paths = list(mi_paths(FinancialYear.objects.filter(id=2016)))
+        self.assertEqual(len(paths), len(set(paths)))
+        for path in [
+            reverse('mi:sector_teams_overview'),
+            reverse('mi:sector_team_detail', kwargs={'team_id': 1}),
+            reverse('mi:overseas_region_campaigns', kwargs={'region_id': 10}),
+            reverse('mi:hvc_campaign_detail', kwargs={'campaign_id': 'E017'}),
+            reverse('mi:country_batch', kwargs={'country_code': 'FR'}),
+            reverse('mi:posts_months', kwargs={'team_slug': 'albania-tirana'}),
+        ]:
+            self.assertIn((path, 'year=2016'), paths)
+
+    def test_warm_cache_renders_every_path(self):
+        paths = list(mi_paths(FinancialYear.objects.filter(id__in=[2016, 2017])))
+        with patch('mi.prewarm.render_response') as render:
+            render.return_value.status_code = 200
+            self.assertEqual(warm_cache(years=[2016, 2017]), len(paths))
+        self.assertEqual(render.call_count, len(paths))
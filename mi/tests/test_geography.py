@@ -0,0 +1,78 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from mi.geography import FinYearGeography, bump_geography_version, get_geography
+from mi.models import Country, FinancialYear, OverseasRegion, Target
+
+LOCAL_MEMORY_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mi-geography-tests',
+    }
+}
+
+
+def target_tuples(targets):
+    return {(t.id, t.campaign_id, t.target, t.charcode) for t in targets}
+
+
+class FinYearGeographyTestCase(TestCase):
+
+    def setUp(self):
+        call_command('create_missing_hvcs', verbose=False)
+        self.fin_year = FinancialYear.objects.get(id=2017)
+        self.geography = FinYearGeography(self.fin_year.id)
+
+    def test_loaded_in_five_queries(self):
+        with self.assertNumQueries(5):
+            FinYearGeography(self.fin_year.id)
+
+    def test_target_names_match_models(self):
+        self.assertTrue(self.geography.targets)
+        for target in self.geography.targets.values():
+            self.assertEqual(target.name, Target.objects.get(id=target.id).name)
+
+    def test_region_targets_match_models(self):
+        for region in OverseasRegion.objects.all():
+            self.assertEqual(
+                target_tuples(self.geography.region_targets(region.id)),
+                target_tuples(region.fin_year_targets(self.fin_year)),
+            )
+            self.assertEqual(
+                target_tuples(self.geography.region_non_contributing_targets(region.id)),
+                target_tuples(region.fin_year_non_contributing_targets(self.fin_year)),
+            )
+            self.assertEqual(
+                sorted(self.geography.region_country_ids(region.id)),
+                sorted(region.fin_year_country_ids(self.fin_year)),
+            )
+
+    def test_region_market_counts_match_models(self):
+        for fin_year in FinancialYear.objects.filter(id__in=[2016, 2017]):
+            geography = FinYearGeography(fin_year.id)
+            for region in OverseasRegion.objects.all():
+                self.assertEqual(
+                    geography.region_market_count(region.id),
+                    len(region.fin_year_country_ids(fin_year, contributes_to_target=True)),
+                )
+
+    def test_country_targets_match_models(self):
+        for country in Country.objects.all():
+            self.assertEqual(
+                target_tuples(self.geography.country_targets(country.id)),
+                target_tuples(country.fin_year_targets(self.fin_year)),
+            )
+            self.assertEqual(
+                target_tuples(self.geography.country_non_contributing_targets(country.id)),
+                target_tuples(country.non_contributing_targets(self.fin_year)),
+            )
+
+    @override_settings(CACHES=LOCAL_MEMORY_CACHE)
+    def test_cached_until_geography_changes(self):
+        get_geography(self.fin_year)
+        with self.assertNumQueries(0):
+            get_geography(self.fin_year)
+
+        bump_geography_version()
+        with self.assertNumQueries(5):
+            get_geography(self.fin_year)
@@ -198,6 +198,13 @@ class OverseasRegionOverviewTestCase(OverseasRegionBaseViewTestCase):
         # North Africa still in 2017
         self.assertTrue('north africa' in self.countries)
 
+    def test_overview_markets(self):
+        self.url = self.get_url_for_year(2017)
+        markets = {region['name']: region['markets'] for region in self._api_response_data}
+        self.assertEqual(markets['Middle East'], 50)
+        self.assertEqual(markets['North America'], 29)
+        self.assertEqual(markets['Africa'], 17)
+
     def test_overview_value_1_win(self):
         w1 = self._create_hvc_win(
             hvc_code='E016', win_date=self.win_date_2017,
@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils.timezone import get_current_timezone
+
+from fixturedb.factories.win import create_win_factory
+from mi.models import WinFact
+from mi.win_facts import rebuild_win_facts
+from users.factories import UserFactory
+from wins.factories import NotificationFactory
+from wins.models import Notification, Win
+
+pytestmark = pytest.mark.django_db
+
+TZ = get_current_timezone()
+
+
+@pytest.fixture
+def win_factory():
+    return create_win_factory(UserFactory.create())
+
+
+def test_unconfirmed_win_gets_fact(win_factory):
+    win = win_factory('E017', win_date=datetime.datetime(2016, 5, 25, tzinfo=TZ))
+    fact = WinFact.objects.get(win=win)
+    assert fact.status == WinFact.STATUS_UNCONFIRMED
+    assert fact.hvc == 'E01716'
+    assert fact.hvc_campaign_id == 'E017'
+    assert fact.confirmation_created is None
+    assert fact.notification_created is None
+    assert fact.financial_year == 2016
+
+
+@pytest.mark.parametrize(
+    'response_date,agree_with_win,status,financial_year',
+    (
+        (datetime.datetime(2017, 1, 5, tzinfo=TZ), False, WinFact.STATUS_CONFIRMED, 2016),
+        (datetime.datetime(2017, 6, 5, tzinfo=TZ), True, WinFact.STATUS_CONFIRMED, 2017),
+        (datetime.datetime(2017, 6, 5, tzinfo=TZ), False, WinFact.STATUS_REJECTED, 2017),
+    ),
+)
+def test_confirmed_win_fact(win_factory, response_date, agree_with_win, status, financial_year):
+    notify_date = response_date - datetime.timedelta(days=2)
+    win = win_factory(
+        'E017',
+        confirm=True,
+        agree_with_win=agree_with_win,
+        notify_date=notify_date,
+        response_date=response_date,
+    )
+    fact = WinFact.objects.get(win=win)
+    assert fact.status == status
+    assert fact.financial_year == financial_year
+    assert fact.confirmation_created == response_date
+    assert fact.notification_created == notify_date
+
+
+def test_soft_deleted_win_loses_fact(win_factory):
+    win = win_factory('E017')
+    win.is_active = False
+    win.save()
+    assert not WinFact.objects.filter(win_id=win.id).exists()
+
+
+def test_un_soft_deleted_win_gets_fact_back(win_factory):
+    win = win_factory('E017')
+    notification = NotificationFactory(win=win, type=Notification.TYPE_CUSTOMER)
+
+    win.soft_delete()
+    assert not WinFact.objects.filter(win_id=win.id).exists()
+
+    win.un_soft_delete()
+    fact = WinFact.objects.get(win=win)
+    assert fact.status == WinFact.STATUS_UNCONFIRMED
+    assert fact.notification_created == notification.created
+
+
+def test_rebuild_win_facts(win_factory):
+    win_factory('E017')
+    win_factory(None, confirm=True)
+    WinFact.objects.all().delete()
+
+    assert rebuild_win_facts(batch_size=1) == 2
+    assert set(WinFact.objects.values_list('win_id', flat=True)) == {win.pk for win in Win.objects.all()}
+
+
+def test_rebuild_win_facts_command(win_factory):
+    win_factory('E017')
+    WinFact.objects.all().delete()
+
+    call_command('rebuild_win_facts')
+    assert WinFact.objects.count() == 1
+
+
+@pytest.mark.parametrize(
+    'response_date,agree_with_win',
+    (
+        (None, None),
+        (datetime.datetime(2017, 1, 5, tzinfo=TZ), False),
+        (datetime.datetime(2017, 6, 5, tzinfo=TZ), True),
+        (datetime.datetime(2017, 6, 5, tzinfo=TZ), False),
+    ),
+)
+def test_status_filter_matches_status(win_factory, response_date, agree_with_win):
+    if response_date:
+        win_factory('E017', confirm=True, agree_with_win=agree_with_win, response_date=response_date)
+    else:
+        win_factory('E017')
+    fact = WinFact.objects.get()
+
+    for status, _ in WinFact.STATUSES:
+        matches = WinFact.objects.filter(WinFact.status_filter(status)).exists()
+        assert matches == (status == fact.status)
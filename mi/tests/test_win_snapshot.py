@@ -0,0 +1,109 @@
+from collections import namedtuple
+from datetime import date, datetime
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from django.test import SimpleTestCase
+from pytz import UTC
+
+from mi.views.base_view import BaseWinMIView
+from mi.views.region_views import OverseasRegionOverviewView
+from mi.win_snapshot import WinSnapshot
+
+FakeTarget = namedtuple('FakeTarget', ['campaign_id', 'target'])
+
+
+def make_win(hvc, sector, country, confirmed, export_value, non_export_value=0, win_date=date(2017, 5, 1)):
+    return {
+        'hvc': hvc,
+        'sector': sector,
+        'country': country,
+        'date': win_date,
+        'total_expected_export_value': export_value,
+        'total_expected_non_export_value': non_export_value,
+        'confirmation__created': datetime(2017, 6, 1, tzinfo=UTC) if confirmed else None,
+        'confirmation__agree_with_win': confirmed,
+    }
+
+
+class WinSnapshotTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.view = BaseWinMIView()
+        self.wins = [
+            make_win('E00117', 1, 'FR', True, 100, 10),
+            make_win('E00117', 2, 'DE', False, 200),
+            make_win('E00217', 1, 'FR', True, 300, win_date=date(2017, 6, 3)),
+            make_win(None, 3, 'FR', False, 400, 40),
+        ]
+        self.snapshot = WinSnapshot(self.wins, self.view._win_status)
+
+    def test_status_totals_match_python_totals(self):
+        self.assertEqual(
+            self.view._status_totals(self.snapshot),
+            self.view._status_totals(list(self.wins)),
+        )
+
+    def test_selection_totals_match_python_totals(self):
+        selection = self.snapshot.select('country', ['FR', 'XX'])
+        self.assertEqual(list(selection), [self.wins[0], self.wins[2], self.wins[3]])
+        self.assertEqual(
+            self.view._status_totals(selection),
+            self.view._status_totals(list(selection)),
+        )
+        self.assertEqual(self.view._confirmed_unconfirmed(selection), (400, 400))
+
+    def test_group_totals(self):
+        campaigns = self.snapshot.group_totals('campaign_id')
+        self.assertEqual(set(campaigns), {'E001', 'E002', None})
+        self.assertEqual(campaigns['E001']['confirmed']['export'], 100)
+        self.assertEqual(campaigns['E001']['unconfirmed']['export'], 200)
+        self.assertEqual(self.snapshot.group_totals('month')[(2017, 6)]['confirmed']['number'], 1)
+
+    def test_selection_group_totals_by_other_column(self):
+        selection = self.snapshot.select('sector', [1])
+        self.assertEqual(
+            {key: totals['confirmed']['export'] for key, totals in selection.group_totals('hvc').items()},
+            {'E00117': 100, 'E00217': 300},
+        )
+
+    def test_group_wins_by_target(self):
+        targets = [FakeTarget('E002', 0), FakeTarget('E001', 0), FakeTarget('E003', 0)]
+        grouped = self.view._group_wins_by_target(self.wins, targets)
+        self.assertEqual(
+            [(target.campaign_id, list(wins)) for target, wins in grouped],
+            [('E001', self.wins[:2]), ('E002', [self.wins[2]]), ('E003', [])],
+        )
+
+    def test_win_index_built_once_per_wins(self):
+        self.assertIs(self.view._win_index(self.wins), self.view._win_index(self.wins))
+        self.assertIs(self.view._win_index(self.snapshot), self.snapshot)
+        self.assertIsNot(self.view._win_index(self.wins), self.view._win_index(list(self.wins)))
+
+    def test_cumulative_month_totals(self):
+        months = [(2017, 4), (2017, 5), (2017, 6)]
+        cumulative = self.snapshot.cumulative_month_totals(months, {'E001'})
+        self.assertEqual(
+            [(totals['hvc']['confirmed']['export'], totals['hvc']['unconfirmed']['export']) for totals in cumulative],
+            [(0, 0), (100, 200), (100, 200)],
+        )
+        self.assertEqual(
+            [(totals['non_hvc']['confirmed']['number'], totals['non_hvc']['unconfirmed']['number'])
+             for totals in cumulative],
+            [(0, 0), (0, 1), (1, 1)],
+        )
+        # wins outside the months are left out
+        april = self.snapshot.cumulative_month_totals(months[:1], {'E001'})[0]
+        self.assertEqual(april['hvc']['confirmed']['number'], 0)
+
+    def test_overview_region_hvc_wins_non_contributing(self):
+        geography = MagicMock()
+        geography.region_targets.return_value = {FakeTarget('E001', 0)}
+        geography.region_non_contributing_targets.return_value = {FakeTarget('E002', 0)}
+        view = OverseasRegionOverviewView()
+        view.hvc_snapshot = self.snapshot
+        region = MagicMock(id=1)
+
+        with patch.object(OverseasRegionOverviewView, 'geography', new_callable=PropertyMock) as mock_geography:
+            mock_geography.return_value = geography
+            self.assertEqual(list(view._get_region_hvc_wins(region)), self.wins[:2])
+            self.assertEqual(list(view._get_region_hvc_wins(region, non_contrib=True)), self.wins[:3])
@@ -1,5 +1,10 @@
 from django.conf.urls import url
 
+from mi.views.batch_views import (
+    CountryBatchView,
+    OverseasRegionBatchView,
+    SectorTeamBatchView,
+)
 from mi.views.country_views import (
     CountryListView,
     CountryDetailView,
@@ -76,6 +81,8 @@ urlpatterns = [
         name="sector_team_top_non_hvc"),
     url(r"^sector_teams/(?P<team_id>\d+)/win_table/$", SectorTeamWinTableView.as_view(),
         name="sector_team_win_table"),
+    url(r"^sector_teams/(?P<team_id>\d+)/batch/$", SectorTeamBatchView.as_view(),
+        name="sector_team_batch"),
 
     url(r"^parent_sectors/$", ParentSectorListView.as_view(), name="parent_sectors"),
 
@@ -94,6 +101,8 @@ urlpatterns = [
         name="overseas_region_top_nonhvc"),
     url(r"^os_regions/(?P<region_id>\d+)/win_table/$", OverseasRegionWinTableView.as_view(),
         name="overseas_region_win_table"),
+    url(r"^os_regions/(?P<region_id>\d+)/batch/$", OverseasRegionBatchView.as_view(),
+        name="overseas_region_batch"),
 
     url(r"^hvc_groups/$", HVCGroupsListView.as_view(), name="hvc_groups"),
     url(r"^hvc_groups/(?P<group_id>\d+)/$",
@@ -126,6 +135,8 @@ urlpatterns = [
         CountryTopNonHvcWinsView.as_view(), name="country_top_nonhvc"),
     url(r"^countries/(?P<country_code>[\w\-]+)/win_table/$",
         CountryWinTableView.as_view(), name="country_win_table"),
+    url(r"^countries/(?P<country_code>[\w\-]+)/batch/$",
+        CountryBatchView.as_view(), name="country_batch"),
 
     url(r"^posts/$", TeamTypeListView.as_view(team_type='post'), name="post"),
     url(r"^posts/(?P<team_slug>[\w\-]+)/$",
@@ -4,21 +4,39 @@ from collections import Counter
 from itertools import groupby
 from operator import attrgetter, itemgetter
 
-from django.db.models import Count, Sum, Q, OuterRef, Subquery
-from django.utils import timezone
+from django.db.models import Count, F, QuerySet, Sum, Q
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date
 
-from django_countries.fields import Country as DjangoCountry
 from pytz import UTC
+from rest_framework import status as http_status
+from rest_framework.response import Response
+
 from core.views import BaseMIView
+from mi.cache import (
+    CachedResponse,
+    get_data_version,
+    get_response_data,
+    response_cache_key,
+    set_response_data,
+    set_stale_response_data,
+    stale_response_cache_key,
+)
+from mi.geography import get_geography
 from mi.models import (
-    Sector
+    Sector,
+    WinFact,
 )
+from mi.tasks import refresh_in_background
 from mi.utils import (
     average,
     percentage,
     percentage_formatted,
     month_iterator,
 )
+from mi.win_snapshot import WinSelection, WinSnapshot
+from wins.choice_labels import choice_labels
 from wins.constants import UK_REGIONS, EXPERIENCE_CATEGORIES
 from wins.models import Notification, Win, _get_open_hvcs, HVC
 
@@ -41,8 +59,7 @@ def status(win):
 
 def country_name(win):
     if win['country']:
-        dc = DjangoCountry(win['country'])
-        return dc.name
+        return choice_labels(Win, 'country').get(win['country'], '')
 
 
 def uk_region_name(win):
@@ -66,6 +83,83 @@ def export_experience(win):
 class BaseExportMIView(BaseMIView):
     """ Base view for other MI endpoints to inherit from """
 
+    # GET responses are cached until MI data changes, see `mi.cache`
+    cache_responses = True
+    cache_key = None
+    stale_cache_key = None
+    etag = None
+    last_modified = None
+
+    # the latest response is served, while refreshed in the background, once
+    # MI data changes or the cached response expires
+    serving_stale = False
+
+    # set when computing a response for the cache rather than for a request,
+    # see `mi.prewarm`
+    refreshing = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.cache_responses and request.method == 'GET':
+            self._check_response_cache(request, **kwargs)
+
+    def _check_response_cache(self, request, **kwargs):
+        """
+        Raise `CachedResponse` if the response can be served without being
+        computed, i.e. the client's copy is current or it is in the cache
+        """
+        version = get_data_version()
+        self.cache_key = response_cache_key(self, request, version, **kwargs)
+        self.stale_cache_key = stale_response_cache_key(self, request, **kwargs)
+        self.etag = '"{}"'.format(self.cache_key.rsplit(':', 1)[-1])
+        # cached responses are keyed by date too, so are never older than today
+        start_of_today = datetime.combine(datetime.today(), datetime.min.time())
+        self.last_modified = max(version // 1000, int(start_of_today.replace(tzinfo=UTC).timestamp()))
+        if self.refreshing:
+            return
+
+        not_modified = get_conditional_response(
+            request,
+            etag=self.etag,
+            last_modified=self.last_modified,
+        )
+        if not_modified is not None:
+            raise CachedResponse(not_modified)
+
+        data = get_response_data(self.cache_key)
+        if data is not None:
+            raise CachedResponse(Response(data, status=http_status.HTTP_200_OK))
+
+        data = get_response_data(self.stale_cache_key)
+        if data is not None:
+            refresh_in_background(request.path, request.GET.urlencode())
+            self.serving_stale = True
+            raise CachedResponse(Response(data, status=http_status.HTTP_200_OK))
+
+    def check_permissions(self, request):
+        # responses computed for the cache are only served to permitted requests
+        if not self.refreshing:
+            super().check_permissions(request)
+
+    def _success(self, results, **extra):
+        response = super()._success(results, **extra)
+        if self.cache_key:
+            set_response_data(self.cache_key, response.data)
+            set_stale_response_data(self.stale_cache_key, response.data)
+        return response
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CachedResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.cache_key and not self.serving_stale and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
     def _hvc_overview(self, targets):
         """ Make an overview dict for a list of targets """
 
@@ -74,26 +168,11 @@ class BaseExportMIView(BaseMIView):
             'campaigns': sorted([t.name for t in targets]),
         }
 
-    def _win_date_for_grouping(self, win):
-        if hasattr(win, 'confirmation'):
-            return win['confirmation__created'].date()
-        else:
-            return win['date']
-
 
 class BaseWinMIView(BaseExportMIView):
     """ Base view with Win-related MI helpers """
 
-    # cumulative values for `_breakdowns_cumulative` method
-    hvc_confirm_cu_number = hvc_confirm_cu_value = hvc_non_cu_number = hvc_non_cu_value = 0
-    non_hvc_confirm_cu_number = non_hvc_confirm_cu_value = non_hvc_non_cu_number = non_hvc_non_cu_value = 0
-    non_export_confirm_cu_number = non_export_confirm_cu_value = non_export_non_cu_number = non_export_non_cu_value = 0
-    start_of_2017_fy = datetime(
-        year=2017,
-        month=4,
-        day=1,
-        tzinfo=timezone.utc,
-    )
+    start_of_2017_fy = WinFact.START_OF_2017_FY
 
     def _wins_filter(self):
         """
@@ -102,7 +181,7 @@ class BaseWinMIView(BaseExportMIView):
         :return: A wins QuerySet for the financial year and unconfjrmed wins
         """
         # get Wins where the customer responded in the given FY
-        win_filter = Q(confirmation__created__range=(
+        win_filter = Q(mi_fact__confirmation_created__range=(
             self._date_range_start(),
             self._date_range_end()
         ))
@@ -113,7 +192,7 @@ class BaseWinMIView(BaseExportMIView):
             unconfirmed_cutoff = datetime.utcnow() - relativedelta(years=1)
             win_filter = win_filter | Q(
                 date__gte=unconfirmed_cutoff,
-                confirmation__isnull=True,
+                mi_fact__confirmation_created__isnull=True,
             )
 
         return win_filter
@@ -131,6 +210,9 @@ class BaseWinMIView(BaseExportMIView):
         it in `_win_status` so that we can later include data on rejected
         Wins.
 
+        Customer response and notification details are read from the
+        denormalised `WinFact` row rather than joined on every request.
+
         """
         fields = [
             "id",
@@ -139,8 +221,6 @@ class BaseWinMIView(BaseExportMIView):
             'date',
             'total_expected_export_value',
             'total_expected_non_export_value',
-            'confirmation__created',
-            'confirmation__agree_with_win',
             'company_name',
             'cdms_reference',
             'lead_officer_name',
@@ -148,19 +228,16 @@ class BaseWinMIView(BaseExportMIView):
             'export_experience',
             'country',
             'customer_location',
-            'export_experience'
         ]
-        newest_notification = Notification.objects.filter(win=OuterRef(
-            'pk'), type=Notification.TYPE_CUSTOMER).order_by('-created')
+        fact_fields = {
+            'confirmation__created': F('mi_fact__confirmation_created'),
+            'confirmation__agree_with_win': F('mi_fact__agree_with_win'),
+            'notifications__created': F('mi_fact__notification_created'),
+        }
 
-        wins = None
         if not filter:
-            wins = Win.objects.filter(self._wins_filter()).only(*fields).values(*fields).annotate(
-                notifications__created=Subquery(newest_notification.values('created')[:1]))
-        else:
-            wins = Win.objects.filter(filter).only(*fields).values(*fields).annotate(
-                notifications__created=Subquery(newest_notification.values('created')[:1]))
-        return wins
+            filter = self._wins_filter()
+        return Win.objects.filter(filter).values(*fields, **fact_fields)
 
     def _non_hvc_wins(self):
         return self._wins().non_hvc(fin_year=self.fin_year)
@@ -183,16 +260,38 @@ class BaseWinMIView(BaseExportMIView):
         customer has explicitly agreed, else it is rejected.
         """
 
-        if not win['confirmation__created']:
-            return 'unconfirmed'
+        return WinFact.status_for(
+            win['confirmation__created'],
+            win['confirmation__agree_with_win'],
+        )
+
+    @cached_property
+    def geography(self):
+        """ Regions, countries and targets of the financial year, see `mi.geography` """
+        return get_geography(self.fin_year)
+
+    @cached_property
+    def _win_indexes(self):
+        return []
+
+    def _win_index(self, wins):
+        """ `WinSnapshot` of given wins, built once per request
 
-        if win['confirmation__created'] < self.start_of_2017_fy:
-            return 'confirmed'
-        else:
-            if win['confirmation__agree_with_win']:
-                return 'confirmed'
-            else:
-                return 'rejected'
+        Grouping helpers called with the same wins (e.g. a queryset shared
+        by `_colours` and `_group_wins_by_target`) reuse the one snapshot
+        and its indexes by campaign id, month etc.
+
+        """
+        if isinstance(wins, WinSnapshot):
+            return wins
+
+        for indexed_wins, snapshot in self._win_indexes:
+            if indexed_wins is wins:
+                return snapshot
+
+        snapshot = WinSnapshot(wins, self._win_status)
+        self._win_indexes.append((wins, snapshot))
+        return snapshot
 
     def _colours(self, hvc_wins, targets):
         """ Determine colour of all HVCs based on progress toward target
@@ -210,11 +309,15 @@ class BaseWinMIView(BaseExportMIView):
             'zero': 0,
         }
 
+        if not isinstance(hvc_wins, WinSelection):
+            hvc_wins = self._win_index(hvc_wins)
+        campaign_totals = hvc_wins.group_totals('campaign_id')
+
         hvc_colours = []
         for t in targets:
-            target_wins = [win for win in hvc_wins if win['hvc']
-                           [:-2] == t.charcode[:-2]]
-            current_val, _ = self._confirmed_unconfirmed(target_wins)
+            current_val = 0
+            if t.campaign_id in campaign_totals:
+                current_val = campaign_totals[t.campaign_id]['confirmed']['export']
             hvc_colours.append(self._get_status_colour(t.target, current_val))
 
         colours.update(dict(Counter(hvc_colours)))
@@ -351,48 +454,83 @@ class BaseWinMIView(BaseExportMIView):
 
         return 'amber'
 
-    def _breakdown_wins(self, wins, non_export=False):
-        """
-        Breakdown Wins by confirmed and non-confirmed
-        Clarification on not including non-export for non-HVC wins:
-        Non-export value is the value of a win entered into the export win system that is not technically an export
-        by definitions of export e.g. when we lobby a government to reduce corporate taxes – that profit back to
-        the UK is a benefit to us but not an export. It has nothing to do with Non-HVC wins which are export wins,
-        which could contain 0 or lots of non-export value as with any export win, but do not fall within a HVC.
+    def _status_totals(self, wins):
         """
+        Number, export value and non-export value of Wins for each status
 
-        confirmed = []
-        unconfirmed = []
+        Querysets are aggregated in the database in a single query, using the
+        same status rules as `_win_status`, snapshots are totalled from their
+        cached groups and anything else is summed in Python.
 
-        if wins:
-            for win in wins:
-                if non_export:
-                    value = win['total_expected_non_export_value']
-                else:
-                    value = win['total_expected_export_value']
+        Result looks like this:
+        {
+            'confirmed': {'number': ..., 'export': ..., 'non_export': ...},
+            'unconfirmed': {...},
+            'rejected': {...},
+        }
 
-                win_status = self._win_status(win)
-                if win_status == 'confirmed':
-                    confirmed.append(value)
-                elif win_status == 'unconfirmed':
-                    unconfirmed.append(value)
-                elif win_status == 'rejected':
-                    pass  # todo
+        """
+        statuses = [status for status, _ in WinFact.STATUSES]
+
+        if isinstance(wins, (WinSnapshot, WinSelection)):
+            return wins.status_totals()
+
+        if isinstance(wins, QuerySet):
+            aggregates = {}
+            for status in statuses:
+                status_filter = WinFact.status_filter(status, prefix='mi_fact__')
+                aggregates[status + '__number'] = Count('id', filter=status_filter)
+                aggregates[status + '__export'] = Sum('total_expected_export_value', filter=status_filter)
+                aggregates[status + '__non_export'] = Sum('total_expected_non_export_value', filter=status_filter)
+            row = wins.aggregate(**aggregates)
+            return {
+                status: {
+                    key: row[status + '__' + key] or 0
+                    for key in ('number', 'export', 'non_export')
+                }
+                for status in statuses
+            }
+
+        totals = {status: {'number': 0, 'export': 0, 'non_export': 0} for status in statuses}
+        for win in wins or []:
+            status_totals = totals[self._win_status(win)]
+            status_totals['number'] += 1
+            status_totals['export'] += win['total_expected_export_value']
+            status_totals['non_export'] += win['total_expected_non_export_value']
+        return totals
+
+    def _breakdown_from_totals(self, totals, non_export=False):
+        """ Confirmed/unconfirmed breakdown of `_status_totals` result """
 
+        value_key = 'non_export' if non_export else 'export'
+        confirmed = totals['confirmed']
+        unconfirmed = totals['unconfirmed']
         return {
             'value': {
-                'confirmed': sum(confirmed),
-                'unconfirmed': sum(unconfirmed),
-                'total': sum(confirmed) + sum(unconfirmed),
+                'confirmed': confirmed[value_key],
+                'unconfirmed': unconfirmed[value_key],
+                'total': confirmed[value_key] + unconfirmed[value_key],
             },
             'number': {
-                'confirmed': len(confirmed),
-                'unconfirmed': len(unconfirmed),
-                'total': len(confirmed) + len(unconfirmed),
+                'confirmed': confirmed['number'],
+                'unconfirmed': unconfirmed['number'],
+                'total': confirmed['number'] + unconfirmed['number'],
             },
 
         }
 
+    def _breakdown_wins(self, wins, non_export=False):
+        """
+        Breakdown Wins by confirmed and non-confirmed
+        Clarification on not including non-export for non-HVC wins:
+        Non-export value is the value of a win entered into the export win system that is not technically an export
+        by definitions of export e.g. when we lobby a government to reduce corporate taxes – that profit back to
+        the UK is a benefit to us but not an export. It has nothing to do with Non-HVC wins which are export wins,
+        which could contain 0 or lots of non-export value as with any export win, but do not fall within a HVC.
+        """
+
+        return self._breakdown_from_totals(self._status_totals(wins), non_export=non_export)
+
     def _breakdowns(self, include_hvc=True, hvc_wins=None, include_non_hvc=True, non_hvc_wins=None):
         """ Get breakdown of data for wins,
         option to have either hvc or non_hvc or both
@@ -431,9 +569,10 @@ class BaseWinMIView(BaseExportMIView):
 
         confirmed_value = unconfirmed_value = confirmed_number = unconfirmed_number = 0
         if include_hvc:
-            result['export']['hvc'] = self._breakdown_wins(hvc_wins)
-            result['non_export'] = self._breakdown_wins(
-                hvc_wins, non_export=True)
+            hvc_totals = self._status_totals(hvc_wins)
+            result['export']['hvc'] = self._breakdown_from_totals(hvc_totals)
+            result['non_export'] = self._breakdown_from_totals(
+                hvc_totals, non_export=True)
             confirmed_value = result['export']['hvc']['value']['confirmed']
             unconfirmed_value = result['export']['hvc']['value']['unconfirmed']
             confirmed_number = result['export']['hvc']['number']['confirmed']
@@ -480,124 +619,54 @@ class BaseWinMIView(BaseExportMIView):
             },
         }
 
-    def _breakdowns_cumulative(self, wins, include_non_hvc=True):
+    def _breakdowns_cumulative(self, totals, include_non_hvc=True):
         """ Breakdown wins by HVC, confirmed and non-export - cumulative
 
-        Month-by-month breakdown using class values
+        Month-by-month breakdown from the cumulative status totals of a month,
+        see `WinSnapshot.cumulative_month_totals`
 
         """
-        hvc_confirmed = []
-        hvc_unconfirmed = []
-        non_hvc_confirmed = []
-        non_hvc_unconfirmed = []
-        non_export_confirmed = []
-        non_export_unconfirmed = []
-        open_hvcs = set(_get_open_hvcs(self.fin_year))
-
-        for win in wins:
-            export_value = win['total_expected_export_value']
-            win_status = self._win_status(win)
-            if win['hvc'] and win['hvc'][:-2] in open_hvcs:
-                if win_status == 'confirmed':
-                    hvc_confirmed.append(export_value)
-                elif win_status == 'unconfirmed':
-                    hvc_unconfirmed.append(export_value)
-                elif win_status == 'rejected':
-                    pass  # todo
-            else:
-                if win_status == 'confirmed':
-                    non_hvc_confirmed.append(export_value)
-                elif win_status == 'unconfirmed':
-                    non_hvc_unconfirmed.append(export_value)
-                elif win_status == 'rejected':
-                    pass  # todo
-
-            non_export_value = win['total_expected_non_export_value']
-            if win_status == 'confirmed':
-                non_export_confirmed.append(non_export_value)
-            elif win_status == 'unconfirmed':
-                non_export_unconfirmed.append(non_export_value)
-            elif win_status == 'rejected':
-                pass  # todo
-
-        # these store cumulative values of each month (see class definition)
-        self.hvc_confirm_cu_number += len(hvc_confirmed)
-        self.hvc_non_cu_number += len(hvc_unconfirmed)
-        self.hvc_confirm_cu_value += sum(hvc_confirmed)
-        self.hvc_non_cu_value += sum(hvc_unconfirmed)
-        self.non_hvc_confirm_cu_number += len(non_hvc_confirmed)
-        self.non_hvc_non_cu_number += len(non_hvc_unconfirmed)
-        self.non_hvc_confirm_cu_value += sum(non_hvc_confirmed)
-        self.non_hvc_non_cu_value += sum(non_hvc_unconfirmed)
-        self.non_export_confirm_cu_number += len(non_export_confirmed)
-        self.non_export_non_cu_number += len(non_export_unconfirmed)
-        self.non_export_confirm_cu_value += sum(non_export_confirmed)
-        self.non_export_non_cu_value += sum(non_export_unconfirmed)
-
-        total_hvc_value = self.hvc_confirm_cu_value + self.hvc_non_cu_value
-        total_non_hvc_value = self.non_hvc_confirm_cu_value + self.non_hvc_non_cu_value
-        total_confirm_value = self.hvc_confirm_cu_value + self.non_hvc_confirm_cu_value
-        total_non_conf_value = self.hvc_non_cu_value + self.non_hvc_non_cu_value
-
-        total_hvc_number = self.hvc_confirm_cu_number + self.hvc_non_cu_number
-        total_non_hvc_number = self.non_hvc_confirm_cu_number + self.non_hvc_non_cu_number
-        total_confirm_number = self.hvc_confirm_cu_number + self.non_hvc_confirm_cu_number
-        total_non_conf_number = self.hvc_non_cu_number + self.non_hvc_non_cu_number
+        hvc = totals['hvc']
+        non_hvc = totals['non_hvc']
 
-        result = {
-            'export': {
-                'hvc': {
-                    'value': {
-                        'confirmed': self.hvc_confirm_cu_value,
-                        'unconfirmed': self.hvc_non_cu_value,
-                        'total': total_hvc_value,
-                    },
-                    'number': {
-                        'confirmed': self.hvc_confirm_cu_number,
-                        'unconfirmed': self.hvc_non_cu_number,
-                        'total': total_hvc_number,
-                    },
-                },
-            },
-            'non_export': {
+        def value_and_number(status_totals, key):
+            return {
                 'value': {
-                    'confirmed': self.non_export_confirm_cu_value,
-                    'unconfirmed': self.non_export_non_cu_value,
-                    'total': (self.non_export_confirm_cu_value + self.non_export_non_cu_value),
+                    'confirmed': status_totals['confirmed'][key],
+                    'unconfirmed': status_totals['unconfirmed'][key],
+                    'total': status_totals['confirmed'][key] + status_totals['unconfirmed'][key],
                 },
                 'number': {
-                    'confirmed': self.non_export_confirm_cu_number,
-                    'unconfirmed': self.non_export_non_cu_number,
-                    'total': (self.non_export_confirm_cu_number + self.non_export_non_cu_number),
-                }
+                    'confirmed': status_totals['confirmed']['number'],
+                    'unconfirmed': status_totals['unconfirmed']['number'],
+                    'total': status_totals['confirmed']['number'] + status_totals['unconfirmed']['number'],
+                },
             }
+
+        # non-export values of HVC and non-HVC wins alike
+        all_wins = {
+            status: {key: hvc[status][key] + non_hvc[status][key] for key in hvc[status]}
+            for status in hvc
         }
 
+        result = {
+            'export': {
+                'hvc': value_and_number(hvc, 'export'),
+            },
+            'non_export': value_and_number(all_wins, 'non_export'),
+        }
+
+        export_totals = all_wins if include_non_hvc else hvc
         if include_non_hvc:
-            result['export']['non_hvc'] = {
-                'value': {
-                    'confirmed': self.non_hvc_confirm_cu_value,
-                    'unconfirmed': self.non_hvc_non_cu_value,
-                    'total': total_non_hvc_value,
-                },
-                'number': {
-                    'confirmed': self.non_hvc_confirm_cu_number,
-                    'unconfirmed': self.non_hvc_non_cu_number,
-                    'total': total_non_hvc_number,
-                }
-            }
+            result['export']['non_hvc'] = value_and_number(non_hvc, 'export')
 
         result['export']['totals'] = {
-            'value': {
-                'confirmed': total_confirm_value if include_non_hvc else self.hvc_confirm_cu_value,
-                'unconfirmed': total_non_conf_value if include_non_hvc else self.hvc_non_cu_value,
-                'grand_total': total_hvc_value + total_non_hvc_value if include_non_hvc else total_hvc_value,
-            },
-            'number': {
-                'confirmed': total_confirm_number if include_non_hvc else self.hvc_confirm_cu_number,
-                'unconfirmed': total_non_conf_number if include_non_hvc else self.hvc_non_cu_number,
-                'grand_total': total_hvc_number + total_non_hvc_number if include_non_hvc else total_hvc_number,
-            },
+            key: {
+                'confirmed': breakdown['confirmed'],
+                'unconfirmed': breakdown['unconfirmed'],
+                'grand_total': breakdown['total'],
+            }
+            for key, breakdown in value_and_number(export_totals, 'export').items()
         }
         return result
 
@@ -606,20 +675,14 @@ class BaseWinMIView(BaseExportMIView):
 
         # convenient for testing to be ordered by campaign_id
         targets = sorted(targets, key=attrgetter('campaign_id'))
-
-        def target_wins(target):
-            return [w for w in wins if w['hvc'][:-2] == target.campaign_id]
-
-        return [(t, target_wins(t)) for t in targets]
+        snapshot = self._win_index(wins)
+        return [(t, snapshot.select('campaign_id', [t.campaign_id])) for t in targets]
 
     def _confirmed_unconfirmed(self, wins):
         """ Find total Confirmed & Unconfirmed export value for given Wins """
 
-        confirmed = sum(w['total_expected_export_value']
-                        for w in wins if self._win_status(w) == 'confirmed')
-        unconfirmed = sum(w['total_expected_export_value']
-                          for w in wins if self._win_status(w) == 'unconfirmed')
-        return confirmed, unconfirmed
+        totals = self._status_totals(wins)
+        return totals['confirmed']['export'], totals['unconfirmed']['export']
 
     def _top_non_hvc(self, non_hvc_wins_qs, records_to_retrieve=5):
         """ Get dict of data about non-HVC wins
@@ -648,7 +711,7 @@ class BaseWinMIView(BaseExportMIView):
         data = []
         for w in non_hvc_wins:
             data.append({
-                'region': DjangoCountry(w['country']).name,
+                'region': choice_labels(Win, 'country').get(w['country'], ''),
                 'sector': sector_id_to_name[w['sector']],
                 'totalValue': w['total_value'],
                 'totalWins': w['total_wins'],
@@ -710,41 +773,23 @@ class BaseWinMIView(BaseExportMIView):
         return results
 
     def _month_breakdowns(self, wins, include_non_hvc=True):
-        """ generic internal that groups wins into monthly aggregation """
-        month_to_wins = self._group_wins_by_month(wins)
+        """ generic internal that groups wins into monthly aggregation
+
+        Totals of each month of the date range, FY by default, are
+        cumulative from the start of the range.
+
+        """
+        months = list(month_iterator(self._date_range_start(), self._date_range_end()))
+        open_hvcs = set(_get_open_hvcs(self.fin_year))
+        month_totals = self._win_index(wins).cumulative_month_totals(months, open_hvcs)
         return [
             {
-                'date': date_str,
-                'totals': self._breakdowns_cumulative(month_wins, include_non_hvc),
+                'date': '{:d}-{:02d}'.format(*month),
+                'totals': self._breakdowns_cumulative(totals, include_non_hvc),
             }
-            for date_str, month_wins in month_to_wins
+            for month, totals in zip(months, month_totals)
         ]
 
-    def _group_wins_by_month(self, wins):
-        """ generic internal that groups wins into monthly aggregation """
-        sorted_wins = sorted(wins, key=self._win_date_for_grouping)
-        month_grouping = []
-        start_date = self._date_range_start()
-        end_date = self._date_range_end()
-        # group wins by date (month-year)
-        for k, g in groupby(sorted_wins, key=self._win_date_for_grouping):
-            month_wins = list(g)
-            date_str = month_wins[0]['date'].strftime('%Y-%m')
-            month_grouping.append((date_str, month_wins))
-
-        # Add missing months within the financial year until current month
-        months_range = []
-        for item in month_iterator(start_date, end_date):
-            date_str = '{:d}-{:02d}'.format(*item)
-            months_range.append(date_str)
-            existing = [m for m in month_grouping if m[0] == date_str]
-            if len(existing) == 0:
-                month_grouping.append((date_str, list()))
-
-        sorted_month_grouping = sorted(month_grouping, key=lambda tup: tup[0])
-        # return only months between date range, FY by default
-        return [wins for wins in sorted_month_grouping if wins[0] in months_range]
-
 
 class TopNonHvcMixin:
 
@@ -0,0 +1,174 @@
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from mi.views.base_view import BaseWinMIView
+from mi.views.country_views import (
+    BaseCountriesMIView,
+    CountryCampaignsView,
+    CountryDetailView,
+    CountryMonthsView,
+    CountryTopNonHvcWinsView,
+    CountryWinTableView,
+)
+from mi.views.region_views import (
+    BaseOverseasRegionsMIView,
+    OverseasRegionCampaignsView,
+    OverseasRegionDetailView,
+    OverseasRegionMonthsView,
+    OverseasRegionsTopNonHvcWinsView,
+    OverseasRegionWinTableView,
+)
+from mi.views.sector_views import (
+    BaseSectorMIView,
+    SectorTeamCampaignsView,
+    SectorTeamDetailView,
+    SectorTeamMonthsView,
+    SectorTeamWinTableView,
+    TopNonHvcSectorCountryWinsView,
+)
+
+
+class BaseBatchMIView(BaseWinMIView):
+    """
+    Several facets of one entity, e.g. detail, months and campaigns of a
+    sector team, in a single request
+
+    Facets are listed in the `facets` query param, comma separated, and
+    default to all of `facet_views`. Each facet is computed by its own view
+    as for its own endpoint, but with the financial year, date range and
+    anything in `shared_attrs` taken from this request, and the results of
+    `shared_methods` (the entity, its basic result and its wins, fetched
+    once as a list) shared between facets.
+
+    Results are keyed by facet, each holding what its endpoint returns
+    apart from `timestamp`, `financial_year` and `date_range`.
+
+    """
+
+    # {facet name: view class}
+    facet_views = {}
+
+    # attributes of this view that facet views use as they are
+    shared_attrs = ('fin_year', 'date_start', 'date_end', 'date_range', '_win_indexes')
+
+    # methods whose results are computed once for all facets
+    shared_methods = ()
+
+    envelope_keys = ('timestamp', 'financial_year', 'date_range')
+
+    def _facets(self):
+        facets = self.request.GET.get('facets')
+        if not facets:
+            return list(self.facet_views)
+
+        facets = [facet.strip() for facet in facets.split(',') if facet.strip()]
+        unknown = [facet for facet in facets if facet not in self.facet_views]
+        if unknown:
+            self._invalid('unknown facets: {}'.format(', '.join(unknown)))
+        return facets
+
+    @cached_property
+    def _shared_results(self):
+        return {}
+
+    def _shared_call(self, name, *args, **kwargs):
+        """ Result of this view's method `name`, computed once per arguments """
+
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if key not in self._shared_results:
+            value = getattr(self, name)(*args, **kwargs)
+            if isinstance(value, QuerySet):
+                value = list(value)
+            self._shared_results[key] = value
+
+        value = self._shared_results[key]
+        # facets add their own keys to the entity's basic result
+        return dict(value) if isinstance(value, dict) else value
+
+    def _facet_view(self, facet):
+        view = self.facet_views[facet](
+            request=self.request,
+            args=self.args,
+            kwargs=self.kwargs,
+            format_kwarg=self.format_kwarg,
+        )
+        for attr in self.shared_attrs:
+            setattr(view, attr, getattr(self, attr))
+        for name in self.shared_methods:
+            setattr(view, name, self._shared_method(name))
+        return view
+
+    def _shared_method(self, name):
+        def shared(*args, **kwargs):
+            return self._shared_call(name, *args, **kwargs)
+        return shared
+
+    def _facet_result(self, facet):
+        response = self._facet_view(facet).get(self.request, **self.kwargs)
+        return {
+            key: value
+            for key, value in response.data.items()
+            if key not in self.envelope_keys
+        }
+
+    def get(self, request, **kwargs):
+        results = {facet: self._facet_result(facet) for facet in self._facets()}
+        return self._success(results)
+
+
+class SectorTeamBatchView(BaseBatchMIView, BaseSectorMIView):
+    """ Facets of a Sector Team, see `BaseBatchMIView` """
+
+    facet_views = {
+        'detail': SectorTeamDetailView,
+        'months': SectorTeamMonthsView,
+        'campaigns': SectorTeamCampaignsView,
+        'top_non_hvcs': TopNonHvcSectorCountryWinsView,
+        'win_table': SectorTeamWinTableView,
+    }
+    shared_methods = (
+        '_get_team',
+        '_sector_result',
+        '_get_hvc_wins',
+        '_get_non_hvc_wins',
+        '_get_all_wins',
+    )
+
+
+class OverseasRegionBatchView(BaseBatchMIView, BaseOverseasRegionsMIView):
+    """ Facets of an Overseas Region, see `BaseBatchMIView` """
+
+    facet_views = {
+        'detail': OverseasRegionDetailView,
+        'months': OverseasRegionMonthsView,
+        'campaigns': OverseasRegionCampaignsView,
+        'top_non_hvcs': OverseasRegionsTopNonHvcWinsView,
+        'win_table': OverseasRegionWinTableView,
+    }
+    shared_attrs = BaseBatchMIView.shared_attrs + ('geography',)
+    shared_methods = (
+        '_get_region',
+        '_region_result',
+        '_get_region_hvc_wins',
+        '_get_region_non_hvc_wins',
+        '_get_region_wins',
+    )
+
+
+class CountryBatchView(BaseBatchMIView, BaseCountriesMIView):
+    """ Facets of a Country, see `BaseBatchMIView` """
+
+    facet_views = {
+        'detail': CountryDetailView,
+        'months': CountryMonthsView,
+        'campaigns': CountryCampaignsView,
+        'top_non_hvcs': CountryTopNonHvcWinsView,
+        'win_table': CountryWinTableView,
+    }
+    shared_attrs = BaseBatchMIView.shared_attrs + ('geography', 'country')
+    shared_methods = (
+        '_country_result',
+        '_get_hvc_wins',
+        '_get_non_hvc_wins',
+        '_get_all_wins',
+    )
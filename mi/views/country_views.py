@@ -1,5 +1,3 @@
-import operator
-from functools import reduce
 from itertools import groupby
 from operator import itemgetter
 
@@ -31,19 +29,13 @@ class BaseCountriesMIView(BaseWinMIView):
             return False
 
     def _get_hvc_wins(self, country, non_contrib=False):
-        targets = country.fin_year_targets(self.fin_year)
+        targets = self.geography.country_targets(country.id)
         if non_contrib:
-            targets = targets | country.non_contributing_targets(self.fin_year)
+            targets = targets | self.geography.country_non_contributing_targets(country.id)
         campaign_ids = [t.campaign_id for t in targets]
         charcodes = [t.charcode for t in targets]
         # There are countries where there is no assigned HVC
-        if campaign_ids:
-            region_hvc_filter = Q(
-                Q(reduce(operator.or_, [Q(hvc__startswith=t)
-                                        for t in campaign_ids])) | Q(hvc__in=charcodes)
-            )
-        else:
-            region_hvc_filter = Q(hvc__in=charcodes)
+        region_hvc_filter = Q(hvc_campaign_id__in=campaign_ids) | Q(hvc__in=charcodes)
 
         wins = self._hvc_wins().filter(region_hvc_filter)
         return wins
@@ -62,7 +54,7 @@ class BaseCountriesMIView(BaseWinMIView):
             'name': country.country.name,
             'id': country.country.code,
             'avg_time_to_confirm': self._average_confirm_time(win__country__exact=dj_country),
-            'hvcs': self._hvc_overview(country.fin_year_targets(fin_year=self.fin_year)),
+            'hvcs': self._hvc_overview(self.geography.country_targets(country.id)),
         }
 
 
@@ -108,8 +100,8 @@ class CountryCampaignsView(BaseCountriesMIView):
 
     def _campaign_breakdowns(self, country):
         wins = self._get_hvc_wins(country, non_contrib=True)
-        all_targets = country.fin_year_targets(
-            self.fin_year) | country.non_contributing_targets(self.fin_year)
+        all_targets = self.geography.country_targets(
+            country.id) | self.geography.country_non_contributing_targets(country.id)
         campaign_to_wins = self._group_wins_by_target(wins, all_targets)
         campaigns = [
             {
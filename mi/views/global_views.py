@@ -4,37 +4,24 @@ from mi.views.base_view import BaseWinMIView
 
 class GlobalWinsView(BaseWinMIView):
 
-    def value_and_number(self, wins):
-        confirmed_value = sum(w["total_expected_export_value"] for w in wins)
-        confirmed_number = len(wins)
-        return confirmed_value, confirmed_number
+    def value_and_number(self, totals, *statuses):
+        value = sum(totals[status]['export'] for status in statuses)
+        number = sum(totals[status]['number'] for status in statuses)
+        return value, number
 
     def get(self, request):
-        hvc_confirmed = []
-        hvc_unconfirmed = []
-        non_hvc_confirmed = []
-        non_hvc_unconfirmed = []
-        hvc_wins = self._hvc_wins()
-        non_hvc_wins = self._non_hvc_wins()
-        for win in hvc_wins:
-            if self._win_status(win) == "confirmed":
-                hvc_confirmed.append(win)
-            else:
-                hvc_unconfirmed.append(win)
-        for win in non_hvc_wins:
-            if self._win_status(win) == "confirmed":
-                non_hvc_confirmed.append(win)
-            else:
-                non_hvc_unconfirmed.append(win)
+        # rejected wins are reported as unconfirmed here
+        hvc_totals = self._status_totals(self._hvc_wins())
+        non_hvc_totals = self._status_totals(self._non_hvc_wins())
 
         hvc_confirmed_value, hvc_confirmed_number = self.value_and_number(
-            hvc_confirmed)
+            hvc_totals, 'confirmed')
         hvc_unconfirmed_value, hvc_unconfirmed_number = self.value_and_number(
-            hvc_unconfirmed)
+            hvc_totals, 'unconfirmed', 'rejected')
         non_hvc_confirmed_value, non_hvc_confirmed_number = self.value_and_number(
-            non_hvc_confirmed)
+            non_hvc_totals, 'confirmed')
         non_hvc_unconfirmed_value, non_hvc_unconfirmed_number = self.value_and_number(
-            non_hvc_unconfirmed)
+            non_hvc_totals, 'unconfirmed', 'rejected')
 
         targets = Target.objects.filter(financial_year=self.fin_year)
         total_target = sum(t.target for t in targets)
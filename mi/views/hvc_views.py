@@ -1,12 +1,12 @@
 from operator import itemgetter
 
 from django.db.models import Count, Sum
-from django_countries.fields import Country as DjangoCountry
 
 from mi.models import Target, Sector
 from mi.utils import percentage_formatted, percentage
 from mi.views.base_view import BaseWinMIView, BaseExportMIView
-from wins.models import HVC
+from wins.choice_labels import choice_labels
+from wins.models import HVC, Win
 
 GLOBAL_COUNTRY_CODE = "XG"
 
@@ -31,10 +31,10 @@ class BaseHVCDetailView(BaseWinMIView):
     def _get_hvc_wins(self, campaign):
         """
         wins of this HVC campaign,
-        using startswith campaign_id instead of charcode
+        using campaign_id instead of charcode
         to cover last FYs wins that were confirmed this FY
         """
-        return self._wins().filter(hvc__startswith=campaign.campaign_id)
+        return self._wins().filter(hvc_campaign_id=campaign.campaign_id)
 
 
 class HVCDetailView(BaseHVCDetailView):
@@ -128,7 +128,7 @@ class HVCWinsByMarketSectorView(BaseHVCDetailView):
         top_value = int(hvc_wins[0]["total_value"]) if hvc_wins else None
         return [
             {
-                "region": DjangoCountry(w["country"]).name,
+                "region": choice_labels(Win, 'country').get(w["country"], ''),
                 "sector": sector_id_to_name[w["sector"]],
                 "totalValue": w["total_value"],
                 "totalWins": w["total_wins"],
@@ -1,5 +1,3 @@
-import operator
-from functools import reduce
 from itertools import groupby
 from operator import itemgetter
 
@@ -9,6 +7,7 @@ from mi.models import OverseasRegion, OverseasRegionGroup
 from mi.serializers import OverseasRegionGroupSerializer
 from mi.utils import sort_campaigns_by
 from mi.views.base_view import BaseWinMIView, BaseExportMIView, TopNonHvcMixin
+from mi.win_snapshot import WinSnapshot
 
 
 class BaseOverseasRegionGroupMIView(BaseExportMIView):
@@ -44,21 +43,17 @@ class BaseOverseasRegionsMIView(BaseWinMIView):
     def _region_hvc_filter(self, region, non_contrib=False):
         """ filter to include all HVCs, irrespective of FY """
 
-        targets = region.fin_year_targets(self.fin_year)
+        targets = self.geography.region_targets(region.id)
         if non_contrib:
-            targets = targets | region.fin_year_non_contributing_targets(
-                self.fin_year)
+            targets = targets | self.geography.region_non_contributing_targets(region.id)
         campaign_ids = [t.campaign_id for t in targets]
         charcodes = [t.charcode for t in targets]
-        region_hvc_filter = Q(
-            Q(reduce(operator.or_, [Q(hvc__startswith=t)
-                                    for t in campaign_ids])) | Q(hvc__in=charcodes)
-        )
+        region_hvc_filter = Q(hvc_campaign_id__in=campaign_ids) | Q(hvc__in=charcodes)
         return region_hvc_filter
 
     def _region_non_hvc_filter(self, region):
         """ specific filter for non-HVC, with all countries for the given region """
-        region_countries = region.fin_year_country_ids(self.fin_year)
+        region_countries = self.geography.region_country_ids(region.id)
         region_non_hvc_filter = Q(
             Q(hvc__isnull=True) | Q(hvc='')) & Q(country__in=region_countries)
 
@@ -87,7 +82,7 @@ class BaseOverseasRegionsMIView(BaseWinMIView):
         return {
             'name': region.name,
             'avg_time_to_confirm': self._average_confirm_time(win__country__in=region.country_ids),
-            'hvcs': self._hvc_overview(region.fin_year_targets(self.fin_year)),
+            'hvcs': self._hvc_overview(self.geography.region_targets(region.id)),
         }
 
 
@@ -151,8 +146,8 @@ class OverseasRegionCampaignsView(BaseOverseasRegionsMIView):
 
     def _campaign_breakdowns(self, region):
         wins = self._get_region_hvc_wins(region, non_contrib=True)
-        all_targets = region.fin_year_targets(
-            self.fin_year) | region.fin_year_non_contributing_targets(self.fin_year)
+        all_targets = self.geography.region_targets(
+            region.id) | self.geography.region_non_contributing_targets(region.id)
         campaign_to_wins = self._group_wins_by_target(wins, all_targets)
         campaigns = [
             {
@@ -191,12 +186,26 @@ class OverseasRegionsTopNonHvcWinsView(BaseOverseasRegionsMIView, TopNonHvcMixin
 class OverseasRegionOverviewView(BaseOverseasRegionsMIView):
     """ Overview view for all Overseas Regions """
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.hvc_snapshot = None
+        self.non_hvc_snapshot = None
+
+    def _get_region_hvc_wins(self, region, non_contrib=False):
+        targets = self.geography.region_targets(region.id)
+        if non_contrib:
+            targets = targets | self.geography.region_non_contributing_targets(region.id)
+        campaign_ids = [t.campaign_id for t in targets]
+        return self.hvc_snapshot.select('campaign_id', campaign_ids)
+
+    def _get_region_non_hvc_wins(self, region):
+        return self.non_hvc_snapshot.select('country', self.geography.region_country_ids(region.id))
+
     def _region_data(self, region_obj):
         """ Calculate HVC & non-HVC data for an Overseas region """
 
-        targets = region_obj.fin_year_targets(self.fin_year)
-        country_ids = region_obj.fin_year_country_ids(self.fin_year, contributes_to_target=True)
-        total_countries = len(country_ids)
+        targets = self.geography.region_targets(region_obj.id)
+        total_countries = self.geography.region_market_count(region_obj.id)
         total_target = sum(t.target for t in targets)
 
         hvc_wins = self._get_region_hvc_wins(region_obj)
@@ -240,6 +249,12 @@ class OverseasRegionOverviewView(BaseOverseasRegionsMIView):
         return result
 
     def get(self, request):
+        # cache wins to avoid many queries
+        self.hvc_snapshot = WinSnapshot(self._hvc_wins(), self._win_status)
+        self.non_hvc_snapshot = WinSnapshot(
+            self._non_hvc_wins().filter(Q(hvc__isnull=True) | Q(hvc='')),
+            self._win_status,
+        )
         result = [self._region_data(region)
                   for region in self._regions_for_fin_year()]
         return self._success(result)
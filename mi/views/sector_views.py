@@ -1,10 +1,6 @@
-import operator
 from collections import defaultdict
 from itertools import groupby
 from operator import itemgetter
-from functools import reduce
-
-from django.db.models import Q
 
 from mi.models import (
     HVCGroup,
@@ -13,6 +9,7 @@ from mi.models import (
 )
 from mi.utils import sort_campaigns_by
 from mi.views.base_view import BaseWinMIView, TopNonHvcMixin
+from mi.win_snapshot import WinSnapshot
 
 
 def get_campaigns_from_group(g: HVCGroup, **kwargs):
@@ -90,10 +87,7 @@ class BaseSectorMIView(BaseWinMIView):
             return self._hvc_wins().none()
         group_hvcs = [hvc[:4]
                       for hvc in campaigns_for_year]
-
-        filter = reduce(
-            operator.or_, [Q(hvc__startswith=hvc) for hvc in group_hvcs])
-        return self._hvc_wins().filter(filter)
+        return self._hvc_wins().filter(hvc_campaign_id__in=group_hvcs)
 
     def _get_team_campaigns(self, team):
         """
@@ -239,20 +233,14 @@ class SectorTeamsOverviewView(BaseSectorMIView):
         super().__init__(**kwargs)
         self.team_groups = defaultdict(list)
         self.team_targets = defaultdict(list)
-        self.sector_to_wins = defaultdict(list)
-        self.hvc_to_wins = defaultdict(list)
+        self.hvc_snapshot = None
+        self.non_hvc_snapshot = None
 
     def _get_cached_hvc_wins(self, campaign_ids):
-        return [win
-                for code, wins in self.hvc_to_wins.items() if code in campaign_ids
-                for win in wins
-                ]
+        return self.hvc_snapshot.select('hvc', campaign_ids)
 
     def _get_cached_non_hvc_wins(self, sector_ids):
-        return [win
-                for sector, wins in self.sector_to_wins.items() if sector in sector_ids
-                for win in wins
-                ]
+        return self.non_hvc_snapshot.select('sector', sector_ids)
 
     def _sector_obj_data(self, sector_obj, campaign_ids):
         """ Get general data from SectorTeam or HVCGroup """
@@ -316,12 +304,8 @@ class SectorTeamsOverviewView(BaseSectorMIView):
     def get(self, request):
 
         # cache wins to avoid many queries
-        hvc_wins, non_hvc_wins = self._wins().hvc(
-            fin_year=self.fin_year), self._wins().non_hvc(fin_year=self.fin_year)
-        for win in hvc_wins:
-            self.hvc_to_wins[win['hvc']].append(win)
-        for win in non_hvc_wins:
-            self.sector_to_wins[win['sector']].append(win)
+        self.hvc_snapshot = WinSnapshot(self._hvc_wins(), self._win_status)
+        self.non_hvc_snapshot = WinSnapshot(self._non_hvc_wins(), self._win_status)
 
         # cache targets
         targets = Target.objects.filter(
@@ -0,0 +1,98 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Max
+
+from mi.models import WinFact
+from wins.models import CustomerResponse, Notification, Win
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _fact_values(win, confirmation, notification_created):
+    """ Column values of the `WinFact` row for a `Win` """
+
+    confirmation_created = confirmation.created if confirmation else None
+    agree_with_win = confirmation.agree_with_win if confirmation else None
+    return {
+        'status': WinFact.status_for(confirmation_created, agree_with_win),
+        'financial_year': WinFact.financial_year_for(confirmation_created, win.date),
+        'hvc': win.hvc,
+        'hvc_campaign_id': win.hvc[:4] if win.hvc else None,
+        'sector': win.sector,
+        'country': win.country,
+        'team_type': win.team_type,
+        'hq_team': win.hq_team,
+        'export_experience': win.export_experience,
+        'date': win.date,
+        'total_expected_export_value': win.total_expected_export_value,
+        'total_expected_non_export_value': win.total_expected_non_export_value,
+        'confirmation_created': confirmation_created,
+        'agree_with_win': agree_with_win,
+        'notification_created': notification_created,
+    }
+
+
+def _get_confirmation(win):
+    try:
+        return win.confirmation
+    except CustomerResponse.DoesNotExist:
+        return None
+
+
+def refresh_win_fact(win_id):
+    """
+    Recompute the `WinFact` row of a single `Win`
+
+    Soft-deleted (or deleted) wins lose their row, as MI never reports them.
+    """
+    try:
+        win = Win.objects.select_related('confirmation').get(id=win_id)
+    except Win.DoesNotExist:
+        WinFact.objects.filter(win_id=win_id).delete()
+        return None
+
+    notification_created = Notification.objects.filter(
+        win_id=win_id,
+        type=Notification.TYPE_CUSTOMER,
+    ).aggregate(created=Max('created'))['created']
+
+    fact, _ = WinFact.objects.update_or_create(
+        win=win,
+        defaults=_fact_values(win, _get_confirmation(win), notification_created),
+    )
+    return fact
+
+
+def rebuild_win_facts(batch_size=REBUILD_BATCH_SIZE):
+    """ Throw away every `WinFact` row and build them again from the wins """
+
+    notifications = dict(
+        Notification.objects.filter(
+            type=Notification.TYPE_CUSTOMER,
+        ).values('win_id').annotate(
+            created=Max('created'),
+        ).values_list('win_id', 'created')
+    )
+    wins = Win.objects.select_related('confirmation').order_by('id').iterator()
+
+    with transaction.atomic():
+        WinFact.objects.all().delete()
+        batch = []
+        count = 0
+        for win in wins:
+            batch.append(WinFact(
+                win=win,
+                **_fact_values(win, _get_confirmation(win), notifications.get(win.id)),
+            ))
+            if len(batch) >= batch_size:
+                WinFact.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        WinFact.objects.bulk_create(batch)
+        count += len(batch)
+
+    logger.info(f'Rebuilt {count} MI win facts')
+    return count
@@ -0,0 +1,174 @@
+import copy
+from collections import defaultdict
+
+from django.utils.functional import cached_property
+
+from mi.models import WinFact
+
+STATUSES = tuple(status for status, _ in WinFact.STATUSES)
+
+# columns of a `WinSnapshot` that wins can be grouped and selected by
+GROUP_COLUMNS = ('hvc', 'campaign_id', 'sector', 'country', 'month')
+
+
+def empty_totals():
+    """ Zeroed totals in the shape of `BaseWinMIView._status_totals` """
+
+    return {status: {'number': 0, 'export': 0, 'non_export': 0} for status in STATUSES}
+
+
+def _add_totals(totals, other):
+    for status, status_totals in other.items():
+        for key, value in status_totals.items():
+            totals[status][key] += value
+    return totals
+
+
+class WinSnapshot:
+    """
+    Columnar snapshot of MI win dicts, as returned by `BaseWinMIView._wins`
+
+    The wins are read once into parallel columns (one list per attribute,
+    status encoded as an index into `STATUSES`). Status totals are then
+    computed in one pass per group column and cached, so totalling any
+    number of campaigns, sectors or countries does not scan the wins again.
+    """
+
+    def __init__(self, wins, win_status):
+        self.wins = []
+        self.status = []
+        self.export = []
+        self.non_export = []
+        self.columns = {column: [] for column in GROUP_COLUMNS}
+        self._group_totals = {}
+
+        status_codes = {status: code for code, status in enumerate(STATUSES)}
+        for win in wins:
+            self.wins.append(win)
+            self.status.append(status_codes[win_status(win)])
+            self.export.append(win['total_expected_export_value'])
+            self.non_export.append(win['total_expected_non_export_value'])
+            hvc = win['hvc'] or None
+            self.columns['hvc'].append(hvc)
+            self.columns['campaign_id'].append(hvc[:4] if hvc else None)
+            self.columns['sector'].append(win['sector'])
+            self.columns['country'].append(win['country'])
+            self.columns['month'].append((win['date'].year, win['date'].month))
+
+    def __iter__(self):
+        return iter(self.wins)
+
+    def __len__(self):
+        return len(self.wins)
+
+    @property
+    def rows(self):
+        return range(len(self.wins))
+
+    def total_rows(self, rows, column=None):
+        """ Status totals of given rows, grouped by `column` if given """
+
+        groups = defaultdict(empty_totals)
+        keys = self.columns[column] if column else None
+        for row in rows:
+            totals = groups[keys[row] if keys else None][STATUSES[self.status[row]]]
+            totals['number'] += 1
+            totals['export'] += self.export[row]
+            totals['non_export'] += self.non_export[row]
+        return dict(groups)
+
+    @cached_property
+    def indexes(self):
+        """ {column: {value: [row, ...]}} for each of `GROUP_COLUMNS` """
+
+        indexes = {}
+        for column in GROUP_COLUMNS:
+            index = defaultdict(list)
+            for row, key in enumerate(self.columns[column]):
+                index[key].append(row)
+            indexes[column] = dict(index)
+        return indexes
+
+    def group_totals(self, column):
+        """ {value: status totals} of the wins for each value of `column` """
+
+        if column not in self._group_totals:
+            self._group_totals[column] = self.total_rows(self.rows, column)
+        return self._group_totals[column]
+
+    def status_totals(self):
+        return self.total_rows(self.rows).get(None, empty_totals())
+
+    def select(self, column, keys):
+        """ `WinSelection` of the wins whose `column` value is one of `keys` """
+
+        return WinSelection(self, column, keys)
+
+    def cumulative_month_totals(self, months, hvc_campaign_ids):
+        """
+        Status totals of the wins up to and including each of `months`
+
+        Returns [{'hvc': totals, 'non_hvc': totals}], one per month, where
+        HVC wins are those of `hvc_campaign_ids`. Wins are binned by month in
+        one pass and the bins summed as prefix sums, wins of other months are
+        left out.
+        """
+        positions = {month: position for position, month in enumerate(months)}
+        bins = [{'hvc': empty_totals(), 'non_hvc': empty_totals()} for _ in months]
+        campaign_ids = self.columns['campaign_id']
+        for row, month in enumerate(self.columns['month']):
+            position = positions.get(month)
+            if position is None:
+                continue
+            kind = 'hvc' if campaign_ids[row] in hvc_campaign_ids else 'non_hvc'
+            totals = bins[position][kind][STATUSES[self.status[row]]]
+            totals['number'] += 1
+            totals['export'] += self.export[row]
+            totals['non_export'] += self.non_export[row]
+
+        running = {'hvc': empty_totals(), 'non_hvc': empty_totals()}
+        cumulative = []
+        for month_bin in bins:
+            for kind, totals in month_bin.items():
+                _add_totals(running[kind], totals)
+            cumulative.append(copy.deepcopy(running))
+        return cumulative
+
+
+class WinSelection:
+    """
+    Wins of a `WinSnapshot` with one of the given values in a column
+
+    Iterates like a list of win dicts, while its status totals are added up
+    from the snapshot's cached group totals.
+    """
+
+    def __init__(self, snapshot, column, keys):
+        self.snapshot = snapshot
+        self.column = column
+        index = snapshot.indexes[column]
+        self.keys = {key for key in keys if key in index}
+
+    @cached_property
+    def rows(self):
+        index = self.snapshot.indexes[self.column]
+        return sorted(row for key in self.keys for row in index[key])
+
+    def __iter__(self):
+        return (self.snapshot.wins[row] for row in self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def group_totals(self, column):
+        if column == self.column:
+            groups = self.snapshot.group_totals(column)
+            return {key: groups[key] for key in self.keys}
+        return self.snapshot.total_rows(self.rows, column)
+
+    def status_totals(self):
+        groups = self.snapshot.group_totals(self.column)
+        totals = empty_totals()
+        for key in self.keys:
+            _add_totals(totals, groups[key])
+        return totals
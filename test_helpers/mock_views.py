@@ -1,3 +1,4 @@
+from django.http import StreamingHttpResponse
 from django.utils.decorators import decorator_from_middleware
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -32,3 +33,16 @@ class HawkViewWithScope(APIView):
     def get(self, request):
         """Simple test view with fixed response."""
         return Response({'content': 'hawk-test-view-with-scope'})
+
+
+@method_decorator(alice_exempt, name='dispatch')
+class HawkStreamingView(APIView):
+    """View using Hawk authentication, streaming its response."""
+
+    authentication_classes = (HawkAuthentication,)
+
+    @decorator_from_middleware(HawkResponseMiddleware)
+    def get(self, request):
+        """Simple test view with fixed lines of NDJSON."""
+        lines = (f'{{"line": {number}}}\n'.encode('utf-8') for number in range(3))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
@@ -7,3 +7,5 @@ class WinsConfig(AppConfig):
     def ready(self):
         from . import checks
         import wins.signals # noqa
+        from .choice_labels import build_choice_labels
+        build_choice_labels()
@@ -0,0 +1,341 @@
+"""
+Prebuilt CSV downloads
+
+Each artifact is a file in `settings.CSV_ARTIFACT_ROOT` named by a digest of
+the artifact and its parameters, and the version of wins data it was built
+from. The version is bumped whenever wins or the rows flattened into their
+CSVs change, see `wins.signals`, so an artifact is rebuilt only once data
+changed and is otherwise served from disk, with ETag and Range support.
+
+Requests never wait on a build: the latest complete build is served while
+the current one is built in a background thread, and an artifact never
+built is streamed while it is written. Artifacts are on local disk, so each
+instance builds those it serves, and builds are locked per host.
+"""
+import glob
+import hashlib
+import logging
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import decorator_from_middleware
+
+from mi.cache import bump_data_version, get_data_version
+
+ARTIFACT_VERSION_KEY = 'wins:artifact-data-version'
+BUILD_LOCK_PREFIX = 'wins:artifact-building'
+
+# seconds a build of an artifact is expected to take at most
+BUILD_LOCK_TIMEOUT = 30 * 60
+
+# seconds after which builds of other params than the latest are pruned,
+# e.g. those of a day gone by
+STALE_ARTIFACT_AGE = 2 * 24 * 60 * 60
+
+# bytes read at a time when serving part of an artifact
+CHUNK_SIZE = 64 * 1024
+
+BYTE_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+logger = logging.getLogger(__name__)
+
+
+def bump_artifact_version():
+    """ Make every artifact stale, so it is rebuilt when next requested """
+    bump_data_version(key=ARTIFACT_VERSION_KEY)
+
+
+def artifact_data_changed():
+    """
+    Artifacts are stale once the current transaction is committed, bumping
+    the version any earlier would let a concurrent build store old data
+    """
+    transaction.on_commit(bump_artifact_version)
+
+
+def _params_digest(name, params):
+    parts = [name] + [str(param) for param in params]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _artifact_pattern(name, params_digest, version):
+    base, extension = os.path.splitext(name)
+    return os.path.join(
+        settings.CSV_ARTIFACT_ROOT, '{}-{}-{}{}'.format(base, params_digest, version, extension))
+
+
+def artifact_path(name, *params):
+    """ (path, digest) of artifact `name` with given params for the current data """
+
+    params_digest = _params_digest(name, params)
+    version = get_data_version(key=ARTIFACT_VERSION_KEY)
+    return _artifact_pattern(name, params_digest, version), '{}-{}'.format(params_digest, version)
+
+
+def _build_version(path):
+    return int(os.path.splitext(path)[0].rsplit('-', 1)[1])
+
+
+def latest_artifact(name, *params):
+    """
+    (path, digest, whether for the current data) of the latest complete
+    build of artifact `name` with given params, None if never built
+    """
+    path, digest = artifact_path(name, *params)
+    if os.path.exists(path):
+        return path, digest, True
+
+    params_digest = _params_digest(name, params)
+    builds = glob.glob(_artifact_pattern(name, params_digest, '*'))
+    if not builds:
+        return None
+    path = max(builds, key=_build_version)
+    return path, '{}-{}'.format(params_digest, _build_version(path)), False
+
+
+def _build_lock_key(name, params):
+    # the disk built to is that of this host alone
+    return '{}:{}:{}'.format(BUILD_LOCK_PREFIX, socket.gethostname(), _params_digest(name, params))
+
+
+def lock_artifact_build(name, *params):
+    """ True unless a build of artifact `name` with given params is under way on this host """
+    return cache.add(_build_lock_key(name, params), True, timeout=BUILD_LOCK_TIMEOUT)
+
+
+def unlock_artifact_build(name, *params):
+    cache.delete(_build_lock_key(name, params))
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _prune_artifacts(name, path):
+    """
+    Delete builds of `name` older than `path` with the same params, and
+    those of other params unused for `STALE_ARTIFACT_AGE`
+    """
+    params_prefix = os.path.splitext(path)[0].rsplit('-', 1)[0] + '-'
+    version = _build_version(path)
+    stale_before = time.time() - STALE_ARTIFACT_AGE
+    for other_path in glob.glob(_artifact_pattern(name, '*', '*')):
+        if other_path.startswith(params_prefix):
+            if _build_version(other_path) < version:
+                _unlink(other_path)
+        else:
+            try:
+                if os.path.getmtime(other_path) < stale_before:
+                    _unlink(other_path)
+            except FileNotFoundError:
+                pass
+
+
+def _tee_artifact(name, path, chunks):
+    """
+    Bytes of `chunks`, written to `path` as they are read, replacing older
+    builds of `name` once all are
+    """
+    os.makedirs(settings.CSV_ARTIFACT_ROOT, exist_ok=True)
+    # readers only ever see complete files
+    fd, temp_path = tempfile.mkstemp(dir=settings.CSV_ARTIFACT_ROOT, prefix='.build-')
+    try:
+        with os.fdopen(fd, 'wb') as artifact_file:
+            for chunk in chunks:
+                artifact_file.write(chunk)
+                yield chunk
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    _prune_artifacts(name, path)
+
+
+def _write_artifact(name, path, chunks):
+    """ Write bytes of `chunks` to `path`, replacing older builds of `name` """
+    for _ in _tee_artifact(name, path, chunks):
+        pass
+
+
+def get_artifact(name, build, *params):
+    """
+    (path, digest) of artifact `name` with given params for the current
+    data, writing what `build()` yields, bytes, unless already built
+    """
+    path, digest = artifact_path(name, *params)
+    if not os.path.exists(path):
+        _write_artifact(name, path, build())
+    return path, digest
+
+
+def _build_in_background(name, build, params):
+    try:
+        path, _ = get_artifact(name, build, *params)
+        logger.info('Built %s', path)
+    except Exception:
+        # the latest build is still served, and the next request retries
+        logger.exception('Could not build %s', name)
+    finally:
+        unlock_artifact_build(name, *params)
+        # the thread's own DB connection
+        connection.close()
+
+
+def refresh_artifact(name, build, *params):
+    """
+    Thread building artifact `name` with given params for the current data,
+    writing what `build()` yields, None if a build of it is under way
+
+    The build runs in this process, as the artifact is served from its disk.
+    A build cut short with the process is retried once its lock expires.
+    """
+    if not lock_artifact_build(name, *params):
+        return None
+    thread = threading.Thread(target=_build_in_background, args=(name, build, params), daemon=True)
+    try:
+        thread.start()
+    except RuntimeError:
+        logger.exception('Could not start a build of %s', name)
+        unlock_artifact_build(name, *params)
+        return None
+    return thread
+
+
+def stream_artifact(name, build, *params):
+    """
+    Bytes `build()` yields, written as artifact `name` with given params for
+    the current data as they are, unless another build of it is under way
+    """
+    if not lock_artifact_build(name, *params):
+        yield from build()
+        return
+    try:
+        path, _ = artifact_path(name, *params)
+        yield from _tee_artifact(name, path, build())
+    finally:
+        unlock_artifact_build(name, *params)
+
+
+def artifact_chunks(name, build, *params):
+    """
+    Bytes of artifact `name` with given params for the current data, read
+    from disk when already built, otherwise straight from `build()`
+    """
+    path, _ = artifact_path(name, *params)
+    try:
+        artifact_file = open(path, 'rb')
+    except FileNotFoundError:
+        return build()
+    return _file_chunks(artifact_file, 0, os.fstat(artifact_file.fileno()).st_size)
+
+
+def _byte_range(request, etag, size):
+    """
+    (first, last) byte of a satisfiable Range request, None to serve the
+    whole artifact, or False when no requested byte exists
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header:
+        return None
+
+    # a range of an older build is no use
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        return None
+
+    # several ranges are allowed to be served as the whole artifact
+    match = BYTE_RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix_length = int(last)
+        if not suffix_length or not size:
+            return False
+        return max(size - suffix_length, 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        return False
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _file_chunks(artifact_file, first, length):
+    with artifact_file:
+        artifact_file.seek(first)
+        while length > 0:
+            chunk = artifact_file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def artifact_response(request, path, digest, content_type):
+    """
+    Response serving an artifact built by `get_artifact`, honouring
+    If-None-Match and single byte Range requests
+
+    The artifact is opened before anything else is read, so FileNotFoundError
+    is raised when it was pruned after its path was found, and the open file
+    is served even if pruned while sent.
+    """
+    etag = '"{}"'.format(digest)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        artifact_file = open(path, 'rb')
+        size = os.fstat(artifact_file.fileno()).st_size
+        byte_range = _byte_range(request, etag, size)
+        if byte_range is None:
+            response = FileResponse(artifact_file, content_type=content_type)
+        elif byte_range is False:
+            artifact_file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+        else:
+            first, last = byte_range
+            response = StreamingHttpResponse(
+                _file_chunks(artifact_file, first, last - first + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Range'] = 'bytes {}-{}/{}'.format(first, last, size)
+            response['Content-Length'] = str(last - first + 1)
+
+    response['ETag'] = etag
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+class GZipUnlessPartialMiddleware(GZipMiddleware):
+    """
+    Compress responses apart from parts of an artifact, as a byte range
+    refers to the artifact as stored
+    """
+
+    def process_response(self, request, response):
+        if response.status_code == 206:
+            return response
+        return super().process_response(request, response)
+
+
+gzip_unless_partial = decorator_from_middleware(GZipUnlessPartialMiddleware)
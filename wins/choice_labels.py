@@ -0,0 +1,55 @@
+"""
+Labels of the values of every model field with choices in wins and mi
+
+Each field's {value: label} map is built once, when the apps are ready, and
+is read-only, so exports and serializers resolve labels without building
+dicts or calling `get_FOO_display` for every row.
+"""
+from types import MappingProxyType
+
+from django.apps import apps
+from django.utils.encoding import force_str
+
+CHOICE_APPS = ('wins', 'mi')
+
+# {(model label, field name): read-only {value: label}}
+_LABELS = {}
+
+
+def _field_labels(field):
+    # fields offering a subset of choices label all values of the superset,
+    # as older records may hold values no longer offered
+    choices = getattr(field.choices, 'superset', None)
+    if choices is None:
+        choices = field.flatchoices
+    return MappingProxyType({value: str(label) for value, label in choices})
+
+
+def build_choice_labels():
+    """ Build the labels of every field with choices in `CHOICE_APPS` """
+
+    for app_label in CHOICE_APPS:
+        for model in apps.get_app_config(app_label).get_models():
+            for field in model._meta.fields:
+                if field.choices:
+                    _LABELS[(model._meta.label, field.name)] = _field_labels(field)
+
+
+def choice_labels(model, field_name):
+    """ Read-only {value: label} of a field with choices of a model """
+
+    key = (model._meta.label, field_name)
+    labels = _LABELS.get(key)
+    if labels is None:
+        labels = _LABELS[key] = _field_labels(model._meta.get_field(field_name))
+    return labels
+
+
+def choice_label(instance, field_name):
+    """ Label of the value of a field with choices of a model instance, as `get_FOO_display` """
+
+    value = getattr(instance, field_name)
+    try:
+        return choice_labels(type(instance), field_name)[value]
+    except KeyError:
+        return force_str(value, strings_only=True)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from wins.views import CSVView, CompleteWinsCSVView, CompleteWinsParquetView, CurrentFinancialYearWins
+
+
+class Command(BaseCommand):
+    help = 'Build the CSV downloads of current wins data that are not already built'
+
+    def handle(self, *args, **options):
+        for view_class in (CSVView, CompleteWinsCSVView, CompleteWinsParquetView, CurrentFinancialYearWins):
+            path, _ = view_class()._get_artifact()
+            self.stdout.write(path)
@@ -1,5 +1,4 @@
 import sys
-from tempfile import NamedTemporaryFile
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils.timezone import now, timedelta
@@ -8,6 +7,7 @@ import boto3
 from boto3.exceptions import Boto3Error
 from botocore.exceptions import ClientError
 
+from core.utils import gzip_chunks, upload_chunks_to_s3
 from csvfiles.constants import FILE_TYPES
 from csvfiles.models import File as CSVFile
 from wins.views import CurrentFinancialYearWins
@@ -17,11 +17,19 @@ from raven.contrib.django.raven_compat.models import client as sentry
 
 class Command(BaseCommand):
 
-    def upload_to_s3(self, file):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Upload the CSV gzip compressed, as .csv.gz',
+        )
+
+    def upload_to_s3(self, chunks, compress=False):
         """
-        upload a file like object to s3
+        upload bytes yielded by chunks to s3, in parts as they are yielded
 
-        :param file_: file to upload
+        :param chunks: iterator of bytes to upload
+        :param compress: whether to gzip compress the bytes
         :return: full s3uri
         """
         now_ = now()
@@ -31,6 +39,11 @@ class Command(BaseCommand):
             month=now_.month,
             timestamp=now_.isoformat()
         )
+        extra_args = {'ServerSideEncryption': "AES256", 'ContentType': 'text/csv'}
+        if compress:
+            chunks = gzip_chunks(chunks)
+            file_name += '.gz'
+            extra_args['ContentType'] = 'application/gzip'
 
         s3 = boto3.client(
             's3',
@@ -38,12 +51,7 @@ class Command(BaseCommand):
             aws_secret_access_key=settings.AWS_SECRET_CSV_UPLOAD_ACCESS,
             region_name=settings.AWS_REGION_CSV
         )
-        s3.upload_file(
-            file,
-            settings.AWS_BUCKET_CSV,
-            file_name,
-            ExtraArgs={'ServerSideEncryption': "AES256"}
-        )
+        upload_chunks_to_s3(s3, settings.AWS_BUCKET_CSV, file_name, chunks, **extra_args)
         return 's3://{bucket_name}/{key}'.format(
             bucket_name=settings.AWS_BUCKET_CSV,
             key=file_name
@@ -51,23 +59,18 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         try:
-            v = CurrentFinancialYearWins()
-            csv_stream = v._make_flat_wins_csv_stream(
-                v._make_flat_wins_csv())
-
-            with NamedTemporaryFile(mode='w+') as ew_file:
-                for line in csv_stream:
-                    ew_file.write(line)
+            # the file `/csv/auto/` serves, streamed from the query unless prebuilt
+            chunks = CurrentFinancialYearWins()._artifact_chunks()
 
-                result = self.upload_to_s3(ew_file.name)
-                # as this report is for data until yesterday
-                # yesterday = now() - timedelta(days=1)
-                CSVFile(
-                    # report_end_date=yesterday,
-                    file_type=FILE_TYPES.EXPORT_WINS,
-                    name='Export Wins Daily',
-                    s3_path=result
-                ).save()
+            result = self.upload_to_s3(chunks, compress=options['gzip'])
+            # as this report is for data until yesterday
+            # yesterday = now() - timedelta(days=1)
+            CSVFile(
+                # report_end_date=yesterday,
+                file_type=FILE_TYPES.EXPORT_WINS,
+                name='Export Wins Daily',
+                s3_path=result
+            ).save()
         except Exception:
             sentry.captureException(exc_info=sys.exc_info())
             raise
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.13 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+def populate_hvc_parts(apps, schema_editor):
+    # frozen copy of `wins.models.split_hvc_code`, one update per distinct code
+    Win = apps.get_model('wins', 'Win')
+
+    hvcs = Win.objects.exclude(hvc__isnull=True).exclude(hvc='').values_list('hvc', flat=True).distinct()
+    for hvc in list(hvcs):
+        fin_year = hvc[4:]
+        Win.objects.filter(hvc=hvc).update(
+            hvc_campaign_id=hvc[:4],
+            hvc_fin_year=int(fin_year) if fin_year.isdigit() else None,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wins', '0060_auto_20210120_1408'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='win',
+            name='hvc_campaign_id',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=4, null=True),
+        ),
+        migrations.AddField(
+            model_name='win',
+            name='hvc_fin_year',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_hvc_parts, migrations.RunPython.noop),
+    ]
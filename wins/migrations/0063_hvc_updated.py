@@ -0,0 +1,18 @@
+# Generated by Django 2.2.13 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wins', '0062_changed_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hvc',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, null=True),
+        ),
+    ]
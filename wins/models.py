@@ -1,17 +1,17 @@
 import datetime
-import operator
 import uuid
-from functools import reduce
 
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models import Max, Q
 from django.db.utils import OperationalError, ProgrammingError
+from django.utils import timezone
 from django_countries.fields import CountryField
 
 from users.models import User
 from . import constants
+from .choice_labels import choice_labels
 
 
 class SoftDeleteManager(models.Manager):
@@ -74,6 +74,7 @@ class HVC(models.Model):
     campaign_id = models.CharField(max_length=4)
     financial_year = models.PositiveIntegerField()
     name = models.CharField(max_length=128)
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         # note name includes code
@@ -153,14 +154,24 @@ def _get_open_hvcs(fin_year):
     return open_hvcs_for_fin_year
 
 
+def split_hvc_code(hvc):
+    """
+    Campaign id and financial year of a win's HVC code e.g. 'E01716' is
+    ('E017', 16), see `HVC.charcode`
+    """
+    if not hvc:
+        return None, None
+    fin_year = hvc[4:]
+    return hvc[:4], int(fin_year) if fin_year.isdigit() else None
+
+
 class WinQuerySet(models.QuerySet):
 
     def _get_open_hvcs_filter(self, fin_year):
         # normalize financial_year to the short format used by HVC table
         open_hvcs_for_fin_year = _get_open_hvcs(fin_year)
-        filters = [Q(hvc__startswith=x) for x in open_hvcs_for_fin_year]
-        if filters:
-            return reduce(operator.or_, filters)
+        if open_hvcs_for_fin_year:
+            return Q(hvc_campaign_id__in=open_hvcs_for_fin_year)
 
     def hvc(self, fin_year=None):
         base_filter = Q(hvc__isnull=False) & ~Q(hvc='')
@@ -180,6 +191,17 @@ class WinQuerySet(models.QuerySet):
             return self.filter(base_filter | ~open_hvcs_filter)
         return self.filter(base_filter).none()
 
+    def changed_since(self, since):
+        """
+        Wins updated after `since`, or whose advisors, breakdowns, customer
+        response or notifications were
+        """
+        changed = Q(updated__gt=since)
+        for model in (Advisor, Breakdown, CustomerResponse, Notification):
+            changed_rows = model.objects.including_inactive().filter(updated__gt=since)
+            changed |= Q(id__in=changed_rows.values('win_id'))
+        return self.filter(changed)
+
 
 WinManager = SoftDeleteManager.from_queryset(WinQuerySet)
 
@@ -253,6 +275,10 @@ class Win(SoftDeleteModel):
         blank=True,
         null=True,
     )
+    # both parts of `hvc` stored separately, so MI can filter on them with
+    # an index rather than `hvc__startswith`, kept in sync by `save`
+    hvc_campaign_id = models.CharField(max_length=4, blank=True, null=True, editable=False, db_index=True)
+    hvc_fin_year = models.PositiveSmallIntegerField(blank=True, null=True, editable=False, db_index=True)
     hvo_programme = models.CharField(
         max_length=6,
         choices=constants.HVO_PROGRAMMES,
@@ -324,7 +350,7 @@ class Win(SoftDeleteModel):
     )
     location = models.CharField(max_length=128, blank=True)
     created = models.DateTimeField(auto_now_add=True)
-    updated = models.DateTimeField(auto_now=True, null=True)
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
     complete = models.BooleanField()  # has an email been sent to the customer?
     audit = models.TextField(null=True)
     match_id = models.PositiveIntegerField(null=True, blank=True)
@@ -357,6 +383,10 @@ class Win(SoftDeleteModel):
     def save(self, *args, **kwargs):
         if not self.id:
             self.id = str(uuid.uuid4())
+        self.hvc_campaign_id, self.hvc_fin_year = split_hvc_code(self.hvc)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'hvc' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'hvc_campaign_id', 'hvc_fin_year'}
         models.Model.save(self, *args, **kwargs)
 
     @property
@@ -390,10 +420,11 @@ class Win(SoftDeleteModel):
 
         This could be done more abstractly, but KISS
 
-        """
-        self.is_active = is_active
-        self.save()
+        The win itself is saved last, as the bulk updates of its relations
+        send no signals, and listeners of its own save (the MI fact row) need
+        to see them at their new state.
 
+        """
         foreignkey_fields = [
             'advisors',
             'breakdowns',
@@ -408,7 +439,8 @@ class Win(SoftDeleteModel):
                 qs = related_manager.inactive().filter(win=self)
             else:
                 qs = related_manager.all()
-            qs.update(is_active=is_active)
+            # update skips auto_now, which deltas of the datasets rely on
+            qs.update(is_active=is_active, updated=timezone.now())
 
         # have to handle one-to-one differently
         try:
@@ -419,6 +451,9 @@ class Win(SoftDeleteModel):
             confirmation.is_active = is_active
             confirmation.save()
 
+        self.is_active = is_active
+        self.save()
+
     def soft_delete(self):
         self._is_active_cascade(False)
 
@@ -468,12 +503,13 @@ class Breakdown(SoftDeleteModel):
     type = models.PositiveIntegerField(choices=constants.BREAKDOWN_TYPES)
     year = models.PositiveIntegerField()
     value = models.BigIntegerField()
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return "{}/{} {}: {}K".format(
             self.year,
             str(self.year + 1)[-2:],
-            dict(constants.BREAKDOWN_TYPES)[self.type],
+            choice_labels(Breakdown, 'type')[self.type],
             self.value / 1000,
         )
 
@@ -494,12 +530,13 @@ class Advisor(SoftDeleteModel):
         verbose_name="Location (if applicable)",
         blank=True,
     )
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return "Name: {0}, Team {1} - {2}".format(
             self.name,
-            dict(constants.TEAMS)[self.team_type],
-            dict(constants.HQ_TEAM_REGION_OR_POST)[self.hq_team],
+            choice_labels(Advisor, 'team_type')[self.team_type],
+            choice_labels(Advisor, 'hq_team')[self.hq_team],
         )
 
 
@@ -603,6 +640,7 @@ class CustomerResponse(SoftDeleteModel):
         max_length=256,
         verbose_name='Other marketing source',
         null=True, blank=True)
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return "Customer response to {}".format(self.win)
@@ -620,10 +658,11 @@ class Notification(SoftDeleteModel):
     recipient = models.EmailField()
     type = models.CharField(max_length=1, choices=constants.NOTIFICATION_TYPES)
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         return "{0} notification to {1} regarding Win {2} sent {3}".format(
-            dict(constants.NOTIFICATION_TYPES)[self.type],
+            choice_labels(Notification, 'type')[self.type],
             self.recipient,
             self.win.id,
             self.created
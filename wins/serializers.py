@@ -1,4 +1,4 @@
-from django_countries.fields import Country as DjangoCountry
+from types import MappingProxyType
 
 from rest_framework.serializers import (
     BooleanField,
@@ -11,16 +11,17 @@ from rest_framework.serializers import (
 
 from mi.models import Sector
 
+from wins.choice_labels import choice_label, choice_labels
 from wins.constants import (
     BREAKDOWN_TYPES,
-    BUSINESS_POTENTIAL,
     EXPERIENCE_CATEGORIES,
-    HQ_TEAM_REGION_OR_POST,
-    TEAMS,
     WITH_OUR_SUPPORT,
 )
 from wins.models import Advisor, Breakdown, CustomerResponse, HVC, Win
 
+# labels of how much of a win is put down to our help
+OUR_HELP_LABELS = MappingProxyType(dict(WITH_OUR_SUPPORT))
+
 
 class WinSerializer(ModelSerializer):
 
@@ -95,7 +96,7 @@ class WinSerializer(ModelSerializer):
         )
 
     def _our_help(self, conf):
-        return dict(WITH_OUR_SUPPORT)[conf.expected_portion_without_help]
+        return OUR_HELP_LABELS[conf.expected_portion_without_help]
 
     def get_responded(self, win):
         if not hasattr(win, 'confirmation'):
@@ -112,16 +113,16 @@ class WinSerializer(ModelSerializer):
         return [n.created for n in notifications]
 
     def get_country_name(self, win):
-        return win.get_country_display()
+        return choice_label(win, 'country')
 
     def get_type_display(self, win):
-        return win.get_type_display()
+        return choice_label(win, 'type')
 
     def validate_user(self, value):
         return self.context["request"].user
 
     def get_export_experience_display(self, win):
-        return win.get_export_experience_display() or ''
+        return choice_label(win, 'export_experience') or ''
 
 
 class ChoicesSerializerField(SerializerMethodField):
@@ -134,9 +135,7 @@ class ChoicesSerializerField(SerializerMethodField):
     """
 
     def to_representation(self, value):
-        method_name = 'get_{}_display'.format(self.field_name)
-        method = getattr(value, method_name)
-        return method()
+        return choice_label(value, self.field_name)
 
 
 class LimitedWinSerializer(ModelSerializer):
@@ -273,8 +272,8 @@ class DetailWinSerializer(ModelSerializer):
         return [
             {
                 'name': a.name,
-                'team_type': a.get_team_type_display(),
-                'hq_team': a.get_hq_team_display(),
+                'team_type': choice_label(a, 'team_type'),
+                'hq_team': choice_label(a, 'hq_team'),
                 'location': a.location,
             }
             for a in win.advisors.all()
@@ -294,10 +293,10 @@ class DetailWinSerializer(ModelSerializer):
         return [n.created for n in notifications]
 
     def get_export_experience_display(self, win):
-        return win.get_export_experience_display()
+        return choice_label(win, 'export_experience')
 
     def get_business_potential_display(self, win):
-        return win.get_business_potential_display()
+        return choice_label(win, 'business_potential')
 
 
 class BreakdownSerializer(ModelSerializer):
@@ -420,8 +419,8 @@ class DataHubWinSerializer(ModelSerializer):
 
     def get_officer(self, win):
         """Return lead officer in a officer nested dict."""
-        teams_dict = dict(TEAMS)
-        hq_dict = dict(HQ_TEAM_REGION_OR_POST)
+        teams_dict = choice_labels(Win, 'team_type')
+        hq_dict = choice_labels(Win, 'hq_team')
         return {
             'name': win.lead_officer_name,
             'email': win.lead_officer_email_address,
@@ -459,9 +458,7 @@ class DataHubWinSerializer(ModelSerializer):
     def get_country(self, win):
         """Return country name for the code."""
         if win.country:
-            dc = DjangoCountry(win.country)
-            if dc.name:
-                return dc.name
+            return choice_labels(Win, 'country').get(win.country) or None
         return None
 
     def get_sector(self, win):
@@ -473,7 +470,7 @@ class DataHubWinSerializer(ModelSerializer):
 
     def get_business_potential(self, win):
         """Return human readable name for business type."""
-        business_potential_dict = dict(BUSINESS_POTENTIAL)
+        business_potential_dict = choice_labels(Win, 'business_potential')
         if win.business_potential:
             return business_potential_dict[win.business_potential]
 
@@ -2,10 +2,13 @@ import logging
 
 from django.db import transaction
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
+from django.utils.timezone import now
 
+from users.models import User
+from wins.artifacts import artifact_data_changed
 from wins.tasks.match_id_task import update_match_id
-from wins.models import Win
+from wins.models import Advisor, Breakdown, CustomerResponse, Notification, Win
 
 logger = logging.getLogger(__name__)
 
@@ -24,3 +27,34 @@ def save_match_id(sender, instance, **kwargs):
         return
 
     transaction.on_commit(lambda: update_match_id.delay(instance.pk))
+
+
+@receiver(post_save, sender=Win, dispatch_uid='artifact_win_post_save')
+@receiver(post_delete, sender=Win, dispatch_uid='artifact_win_post_delete')
+@receiver(post_save, sender=Advisor, dispatch_uid='artifact_advisor_post_save')
+@receiver(post_delete, sender=Advisor, dispatch_uid='artifact_advisor_post_delete')
+@receiver(post_save, sender=Breakdown, dispatch_uid='artifact_breakdown_post_save')
+@receiver(post_delete, sender=Breakdown, dispatch_uid='artifact_breakdown_post_delete')
+@receiver(post_save, sender=CustomerResponse, dispatch_uid='artifact_response_post_save')
+@receiver(post_delete, sender=CustomerResponse, dispatch_uid='artifact_response_post_delete')
+@receiver(post_save, sender=Notification, dispatch_uid='artifact_notification_post_save')
+@receiver(post_delete, sender=Notification, dispatch_uid='artifact_notification_post_delete')
+@receiver(post_save, sender=User, dispatch_uid='artifact_user_post_save')
+@receiver(post_delete, sender=User, dispatch_uid='artifact_user_post_delete')
+def csv_data_changed(sender, **kwargs):
+    """ Rebuild prebuilt CSVs, unless for a login, which no CSV includes """
+    if kwargs.get('update_fields') == frozenset(['last_login']):
+        return
+    artifact_data_changed()
+
+
+@receiver(post_delete, sender=Advisor, dispatch_uid='touch_win_advisor_post_delete')
+@receiver(post_delete, sender=Breakdown, dispatch_uid='touch_win_breakdown_post_delete')
+@receiver(post_delete, sender=CustomerResponse, dispatch_uid='touch_win_response_post_delete')
+@receiver(post_delete, sender=Notification, dispatch_uid='touch_win_notification_post_delete')
+def touch_win(sender, instance, **kwargs):
+    """
+    A deleted row leaves no `updated` behind, so mark its win as updated
+    for `WinQuerySet.changed_since`
+    """
+    Win.objects.including_inactive().filter(id=instance.win_id).update(updated=now())
@@ -0,0 +1,323 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from alice.tests.client import AliceClient
+from users.factories import UserFactory
+from wins.artifacts import (
+    STALE_ARTIFACT_AGE,
+    artifact_chunks,
+    artifact_response,
+    bump_artifact_version,
+    get_artifact,
+    latest_artifact,
+    lock_artifact_build,
+    refresh_artifact,
+    stream_artifact,
+)
+from wins.factories import WinFactory
+from wins.views.flat_csv import CurrentFinancialYearWins
+
+LOCAL_MEMORY_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wins-artifact-tests',
+    }
+}
+
+CONTENT = b'0123456789' * 10
+
+
+class ArtifactTestCase(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings_override = override_settings(CSV_ARTIFACT_ROOT=self.root, CACHES=LOCAL_MEMORY_CACHE)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # versions and build locks of other tests
+        cache.clear()
+
+    def build(self):
+        yield CONTENT[:50]
+        yield CONTENT[50:]
+
+
+class GetArtifactTestCase(ArtifactTestCase):
+
+    def test_built_once_per_data_version(self):
+        path, digest = get_artifact('test.csv', self.build)
+        with open(path, 'rb') as artifact_file:
+            self.assertEqual(artifact_file.read(), CONTENT)
+
+        def fail():
+            raise AssertionError('artifact rebuilt')
+
+        self.assertEqual(get_artifact('test.csv', fail), (path, digest))
+
+        bump_artifact_version()
+        new_path, new_digest = get_artifact('test.csv', self.build)
+        self.assertNotEqual(new_digest, digest)
+        self.assertEqual(os.listdir(self.root), [os.path.basename(new_path)])
+
+    def test_params_make_separate_artifacts(self):
+        path, digest = get_artifact('test.csv', self.build, '2017-01-01')
+        other_path, other_digest = get_artifact('test.csv', self.build, '2018-01-01')
+        self.assertNotEqual(digest, other_digest)
+
+        bump_artifact_version()
+        new_path, _ = get_artifact('test.csv', self.build, '2018-01-01')
+        self.assertEqual(
+            sorted(os.listdir(self.root)),
+            sorted(os.path.basename(kept) for kept in (path, new_path)),
+        )
+
+    def test_other_params_pruned_once_stale(self):
+        path, _ = get_artifact('test.csv', self.build, '2017-01-01')
+        stale = time.time() - STALE_ARTIFACT_AGE - 1
+        os.utime(path, (stale, stale))
+
+        other_path, _ = get_artifact('test.csv', self.build, '2018-01-01')
+        self.assertEqual(os.listdir(self.root), [os.path.basename(other_path)])
+
+    def test_failed_build_leaves_no_artifact(self):
+        def build():
+            yield CONTENT
+            raise ValueError('build failed')
+
+        with self.assertRaises(ValueError):
+            get_artifact('test.csv', build)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_streamed_and_written(self):
+        self.assertIsNone(latest_artifact('test.csv'))
+        self.assertEqual(b''.join(stream_artifact('test.csv', self.build)), CONTENT)
+        path, digest, current = latest_artifact('test.csv')
+        self.assertTrue(current)
+        self.assertEqual((path, digest), get_artifact('test.csv', self.build))
+
+        bump_artifact_version()
+        self.assertEqual(latest_artifact('test.csv'), (path, digest, False))
+
+    def test_streamed_not_written_while_built_elsewhere(self):
+        self.assertTrue(lock_artifact_build('test.csv'))
+        self.assertEqual(b''.join(stream_artifact('test.csv', self.build)), CONTENT)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_stream_stopped_leaves_no_artifact(self):
+        chunks = stream_artifact('test.csv', self.build)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(os.listdir(self.root), [])
+        self.assertTrue(lock_artifact_build('test.csv'))
+
+    def test_refreshed_in_background(self):
+        thread = refresh_artifact('test.csv', self.build)
+        self.assertIsNone(refresh_artifact('test.csv', self.build))
+        thread.join()
+
+        path, _, current = latest_artifact('test.csv')
+        self.assertTrue(current)
+        with open(path, 'rb') as artifact_file:
+            self.assertEqual(artifact_file.read(), CONTENT)
+        # the lock is released once built
+        self.assertTrue(lock_artifact_build('test.csv'))
+
+    def test_failed_refresh_unlocked(self):
+        def build():
+            yield CONTENT
+            raise ValueError('build failed')
+
+        refresh_artifact('test.csv', build).join()
+        self.assertEqual(os.listdir(self.root), [])
+        self.assertTrue(lock_artifact_build('test.csv'))
+
+    def test_builds_locked_per_host(self):
+        self.assertTrue(lock_artifact_build('test.csv'))
+        self.assertFalse(lock_artifact_build('test.csv'))
+        with patch('wins.artifacts.socket.gethostname', return_value='other-host'):
+            self.assertTrue(lock_artifact_build('test.csv'))
+
+    def test_chunks_built_or_read(self):
+        self.assertEqual(b''.join(artifact_chunks('test.csv', self.build)), CONTENT)
+        self.assertEqual(os.listdir(self.root), [])
+
+        get_artifact('test.csv', self.build)
+        self.assertEqual(b''.join(artifact_chunks('test.csv', lambda: iter([b'rebuilt']))), CONTENT)
+
+
+class ArtifactResponseTestCase(ArtifactTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path, self.digest = get_artifact('test.csv', self.build)
+        self.etag = '"{}"'.format(self.digest)
+
+    def get(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        return artifact_response(request, self.path, self.digest, 'text/csv')
+
+    def test_whole_artifact(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_not_modified(self):
+        response = self.get(HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_byte_range(self):
+        response = self.get(HTTP_RANGE='bytes=5-14')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[5:15])
+        self.assertEqual(response['Content-Range'], 'bytes 5-14/100')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_open_ended_and_suffix_ranges(self):
+        response = self.get(HTTP_RANGE='bytes=95-')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[95:])
+
+        response = self.get(HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[97:])
+        self.assertEqual(response['Content-Range'], 'bytes 97-99/100')
+
+    def test_range_past_the_end(self):
+        response = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_range_of_another_build(self):
+        response = self.get(HTTP_RANGE='bytes=5-14', HTTP_IF_RANGE='"older"')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get(HTTP_RANGE='bytes=5-14', HTTP_IF_RANGE=self.etag)
+        self.assertEqual(response.status_code, 206)
+
+    def test_several_ranges_served_whole(self):
+        response = self.get(HTTP_RANGE='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, 200)
+
+    def test_pruned_artifact(self):
+        response = self.get(HTTP_RANGE='bytes=5-14')
+        os.unlink(self.path)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[5:15])
+
+        with self.assertRaises(FileNotFoundError):
+            self.get()
+
+
+@override_settings(UI_SECRET=AliceClient.SECRET)
+class CurrentFinancialYearWinsArtifactTestCase(ArtifactTestCase):
+
+    def setUp(self):
+        super().setUp()
+        user = UserFactory.create(is_superuser=True, is_staff=True, email='a@b.c')
+        user.set_password('asdf')
+        user.save()
+        WinFactory(user=user)
+        self.client = AliceClient()
+        self.client.login(username=user.email, password='asdf')
+        self.url = reverse('csv_auto')
+
+    @contextmanager
+    def builds_joined(self):
+        """ Background builds the view starts, finished before it responds """
+        threads = []
+
+        def refresh(*args):
+            thread = refresh_artifact(*args)
+            if thread is not None:
+                thread.join()
+                threads.append(thread)
+            return thread
+
+        with patch('wins.views.flat_csv.refresh_artifact', refresh):
+            yield threads
+
+    def test_streamed_while_first_built(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(os.listdir(self.root), [])
+
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith('\ufeffid,user,'.encode('utf-8')))
+        self.assertEqual(len(os.listdir(self.root)), 1)
+
+    def test_served_from_artifact_until_data_changes(self):
+        b''.join(self.client.get(self.url).streaming_content)
+
+        with patch.object(CurrentFinancialYearWins, '_make_flat_wins_csv') as make_csv:
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            content = b''.join(response.streaming_content)
+            self.assertTrue(content.startswith('\ufeffid,user,'.encode('utf-8')))
+            etag = response['ETag']
+
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(self.url, HTTP_RANGE='bytes=0-2')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(b''.join(response.streaming_content), content[:3])
+        make_csv.assert_not_called()
+
+        bump_artifact_version()
+        with patch('wins.artifacts.threading.Thread') as thread:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            # a build is started once
+            self.client.get(self.url)
+        thread.return_value.start.assert_called_once_with()
+
+    def test_stale_build_served_while_rebuilt(self):
+        b''.join(self.client.get(self.url).streaming_content)
+        etag = self.client.get(self.url)['ETag']
+
+        bump_artifact_version()
+        with self.builds_joined() as threads:
+            response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(threads), 1)
+        # the build of this instance is served next
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(os.listdir(self.root)), 1)
+
+    def test_stale_build_served_when_rebuild_fails(self):
+        b''.join(self.client.get(self.url).streaming_content)
+        bump_artifact_version()
+
+        with patch.object(CurrentFinancialYearWins, '_build_artifact', side_effect=OSError('disk full')), \
+                self.builds_joined() as threads:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        # the lock is released, so every request retries
+        self.assertEqual(len(threads), 2)
+
+    def test_rebuilt_when_pruned_while_served(self):
+        b''.join(self.client.get(self.url).streaming_content)
+        served = []
+
+        def pruned_once(request, path, digest, content_type):
+            if not served:
+                served.append(path)
+                os.unlink(path)
+            return artifact_response(request, path, digest, content_type)
+
+        with patch('wins.views.flat_csv.artifact_response', pruned_once):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(served), 1)
+        self.assertTrue(b''.join(response.streaming_content).startswith('\ufeffid,user,'.encode('utf-8')))
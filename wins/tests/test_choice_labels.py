@@ -0,0 +1,46 @@
+from django.apps import apps
+from django.test import SimpleTestCase
+
+from wins.choice_labels import CHOICE_APPS, choice_label, choice_labels
+from wins.constants import PROGRAMMES
+from wins.models import Advisor, Breakdown, Win
+
+
+class ChoiceLabelsTestCase(SimpleTestCase):
+
+    def test_labels_of_get_display(self):
+        for app_label in CHOICE_APPS:
+            for model in apps.get_app_config(app_label).get_models():
+                for field in model._meta.fields:
+                    if not field.choices:
+                        continue
+                    labels = choice_labels(model, field.name)
+                    for value, label in field.flatchoices:
+                        instance = model(**{field.attname: value})
+                        self.assertEqual(labels[value], getattr(instance, 'get_{}_display'.format(field.name))())
+
+    def test_superset_labels(self):
+        inactive = set(dict(PROGRAMMES)) - set(dict(PROGRAMMES.ACTIVE))
+        self.assertTrue(inactive)
+        labels = choice_labels(Win, 'associated_programme_1')
+        for value in inactive:
+            self.assertEqual(labels[value], dict(PROGRAMMES)[value])
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            choice_labels(Advisor, 'team_type')['other'] = 'Other'
+
+    def test_unknown_value(self):
+        self.assertEqual(choice_label(Advisor(team_type='nope'), 'team_type'), 'nope')
+        self.assertEqual(choice_label(Advisor(team_type='post'), 'team_type'), 'Overseas Post')
+
+    def test_unknown_value_as_get_display(self):
+        for instance, field_name in (
+            (Advisor(team_type='nope'), 'team_type'),
+            (Breakdown(type=99), 'type'),
+            (Win(export_experience=None), 'export_experience'),
+        ):
+            self.assertEqual(
+                choice_label(instance, field_name),
+                getattr(instance, 'get_{}_display'.format(field_name))(),
+            )
@@ -0,0 +1,101 @@
+import datetime
+import importlib
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from ..constants import BREAKDOWN_NAME_TO_ID
+from ..factories import (
+    AdvisorFactory,
+    BreakdownFactory,
+    CustomerResponseFactory,
+    NotificationFactory,
+    WinFactory,
+)
+from users.factories import UserFactory
+from wins.views import CompleteWinsCSVView, CompleteWinsParquetView
+
+
+class TestParquet(TestCase):
+
+    def setUp(self):
+        user = UserFactory(name='Johnny Fakeman', email='jfakeman@example.com')
+        self.win = WinFactory(
+            user=user,
+            id='6e18a056-1a25-46ce-a4bb-0553a912706f',
+            total_expected_export_value=1234567,
+            export_experience=1,
+            date=datetime.date(2016, 5, 25),
+        )
+        BreakdownFactory(win=self.win, year=2018, value=20000, type=BREAKDOWN_NAME_TO_ID['Export'])
+        BreakdownFactory(win=self.win, year=2016, value=10000, type=BREAKDOWN_NAME_TO_ID['Export'])
+        BreakdownFactory(win=self.win, year=2017, value=300, type=BREAKDOWN_NAME_TO_ID['Non-export'])
+        AdvisorFactory(win=self.win, name='Bobby Beedle', team_type='post', hq_team='post:Albania - Tirana')
+        CustomerResponseFactory(win=self.win, agree_with_win=False)
+        NotificationFactory(win=self.win)
+        self.other = WinFactory(user=user, id='ff18a056-1a25-46ce-a4bb-0553a912706f')
+
+    def _read(self, view):
+        return pq.ParquetFile(io.BytesIO(b''.join(view._make_parquet())))
+
+    def test_typed_columns(self):
+        table = self._read(CompleteWinsParquetView()).read()
+        schema = table.schema
+        self.assertEqual(schema.field('total expected export value').type, pa.int64())
+        self.assertEqual(schema.field('Date business won [MM/YY]').type, pa.date32())
+        self.assertEqual(schema.field('customer response recieved').type, pa.bool_())
+        self.assertEqual(schema.field('export experience').type, pa.dictionary(pa.int32(), pa.string()))
+
+        win = table.to_pydict()
+        self.assertEqual(win['id'], [str(self.win.id), str(self.other.id)])
+        self.assertEqual(win['total expected export value'][0], 1234567)
+        self.assertEqual(win['Date business won [MM/YY]'][0], datetime.date(2016, 5, 25))
+        self.assertEqual(win['Export breakdowns'][0], [
+            {'year': 2016, 'value': 10000},
+            {'year': 2018, 'value': 20000},
+        ])
+        self.assertEqual(win['Non-export breakdowns'], [[{'year': 2017, 'value': 300}], []])
+        self.assertEqual(
+            win['contributing advisors/team'][0],
+            ['Name: Bobby Beedle, Team Overseas Post - Albania - Tirana'],
+        )
+        self.assertEqual(win['customer response recieved'], [True, False])
+        self.assertEqual(win['Please confirm these details are correct'], [False, None])
+        self.assertEqual(win['customer email sent'][0], True)
+
+    def test_columns_of_csv(self):
+        """ Columns are those of the CSV, with breakdowns as lists """
+
+        csv_headers = [
+            header for header in CompleteWinsCSVView()._win_headers
+            if 'breakdown ' not in header
+        ]
+        parquet_headers = [
+            header for header in self._read(CompleteWinsParquetView()).schema_arrow.names
+            if not header.endswith(' breakdowns')
+        ]
+        self.assertEqual(parquet_headers, csv_headers)
+
+    def test_row_groups(self):
+        view = CompleteWinsParquetView()
+        view.ROW_GROUP_SIZE = 1
+        parquet_file = self._read(view)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(parquet_file.metadata.num_rows, 2)
+
+
+class TestParquetURL(TestCase):
+
+    @override_settings(API_DEBUG=True)
+    def test_routes(self):
+        import data.urls
+        urls = importlib.reload(data.urls)
+        try:
+            self.assertEqual(reverse('csv_wins', urlconf=urls), '/csv/wins/')
+            self.assertEqual(reverse('parquet_wins', urlconf=urls), '/csv/wins/parquet/')
+            self.assertIs(resolve('/csv/wins/parquet/', urlconf=urls).func.view_class, CompleteWinsParquetView)
+        finally:
+            importlib.reload(data.urls)
@@ -2,9 +2,13 @@ import csv
 import io
 import tempfile
 import zipfile
+from datetime import timedelta
+from unittest.mock import patch
+from urllib.parse import urlencode
 
 from django.urls import reverse
 from django.test import override_settings, TestCase
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import now
 
 from ..constants import BREAKDOWN_NAME_TO_ID
@@ -18,7 +22,8 @@ from ..factories import (
 from ..serializers import WinSerializer
 from alice.tests.client import AliceClient
 from users.factories import UserFactory
-from wins.views.flat_csv import CSVView
+from wins.models import Win
+from wins.views.flat_csv import CSVView, CompleteWinsCSVView, CurrentFinancialYearWins
 
 
 class TestFlatCSV(TestCase):
@@ -115,6 +120,41 @@ class TestFlatCSV(TestCase):
         win_dict = list(csv.DictReader(csv_str.split('\n')))[0]
         self._assert_about_win_dict(win_dict)
 
+    def test_related_rows_merged_by_win(self):
+        user = UserFactory(name='Jane Fakeman', email='jane@example.com')
+        WinFactory(user=user, id='00000000-0000-0000-0000-000000000001')
+        last_win = WinFactory(user=user, id='ffffffff-0000-0000-0000-000000000001')
+        AdvisorFactory(win=last_win, name='Carly Clark')
+        BreakdownFactory(win=last_win, year=2019, value=500, type=BREAKDOWN_NAME_TO_ID['Export'])
+
+        csv_str = b''.join(CSVView()._make_flat_wins_csv()).decode('utf-8-sig')
+        rows = list(csv.DictReader(csv_str.split('\n')))
+
+        self.assertEqual(
+            [row['id'] for row in rows],
+            ['00000000-0000-0000-0000-000000000001', str(self.win1.id), str(last_win.id)],
+        )
+        first, middle, last = rows
+        self.assertEqual(first['contributing advisors/team'], '')
+        self.assertEqual(first['Export breakdown 1'], '')
+        self.assertEqual(first['customer response recieved'], 'No')
+        self.assertEqual(first['user'], 'Jane Fakeman <jane@example.com>')
+        self.assertIn('Bobby Beedle', middle['contributing advisors/team'])
+        self.assertEqual(middle['customer response recieved'], 'Yes')
+        self.assertEqual(middle['user'], 'Johnny Fakeman <jfakeman@example.com>')
+        self.assertTrue(last['contributing advisors/team'].startswith('Name: Carly Clark'))
+        self.assertEqual(last['Export breakdown 1'], '2019: £500')
+        self.assertEqual(last['customer email sent'], 'No')
+
+    def test_current_financial_year_wins(self):
+        WinFactory(user=self.win1.user, id='ffffffff-0000-0000-0000-000000000001')
+
+        view = CurrentFinancialYearWins()
+        rows = [dict(zip(view._win_headers, row)) for row in view._make_flat_wins_csv()]
+
+        self.assertEqual([row['id'] for row in rows], [str(self.win1.id)])
+        self.assertEqual(rows[0]['customer email sent'], 'Yes')
+
     def _choice_to_str(self, obj, fieldname):
         """ Convert display of a choice to equivalent as expected in CSV """
 
@@ -158,6 +198,33 @@ class TestFlatCSV(TestCase):
                 self.assertEqual(actual_col, expected_col)
                 counter += 1
 
+    def test_plain_csv_copied_by_postgres(self):
+        view = CSVView()
+        copied = list(csv.reader(io.StringIO(b''.join(view._make_plain_csv('advisor')).decode('utf-8'))))
+        selected = list(csv.reader(io.StringIO(b''.join(view._select_plain_csv('advisor')).decode('utf-8'))))
+
+        self.assertEqual(copied[0], selected[0])
+        self.assertEqual(len(copied), 3)
+        self.assertEqual(
+            sorted(row[:copied[0].index('name') + 1] for row in copied[1:]),
+            sorted(row[:selected[0].index('name') + 1] for row in selected[1:]),
+        )
+
+    def test_zip_members_built_by_workers(self):
+        members = [
+            (name, (row.encode('utf-8') for row in rows))
+            for name, rows in [('a.csv', ['id\n', '1\n']), ('b.csv', []), ('c.csv', ['id\n'])]
+        ]
+        with patch.object(CSVView, '_zip_members', return_value=members), \
+                patch('wins.views.flat_csv.connection') as connection:
+            connection.in_atomic_block = False
+            zf = zipfile.ZipFile(io.BytesIO(b''.join(CSVView()._make_zip())))
+
+        self.assertEqual(zf.namelist(), ['a.csv', 'b.csv', 'c.csv'])
+        self.assertEqual(zf.read('a.csv'), b'id\n1\n')
+        self.assertEqual(zf.read('b.csv'), b'')
+        self.assertEqual(connection.close.call_count, 3)
+
     def test_users_expected_output(self):
         chunks = list(CSVView()._make_user_csv())
         bytesio = io.BytesIO()
@@ -217,3 +284,83 @@ Johnny Fakeman,jfakeman@example.com,{self.DATE_JOINED},True\r'''.split('\n')
                         )
                     else:
                         raise Exception(exc)
+
+
+class TestDeltaCSV(TestCase):
+
+    def setUp(self):
+        self.user = UserFactory(name='Johnny Fakeman', email='jfakeman@example.com')
+        self.edited = WinFactory(user=self.user)
+        self.advised = WinFactory(user=self.user)
+        self.unchanged = WinFactory(user=self.user)
+        self.deleted = WinFactory(user=self.user)
+        self.breakdown_deleted = WinFactory(user=self.user)
+        self.breakdown = BreakdownFactory(win=self.breakdown_deleted, year=2016, value=1, type=1)
+
+        self.since = now()
+
+        self.edited.company_name = 'new name'
+        self.edited.save()
+        AdvisorFactory(win=self.advised)
+        self.created = WinFactory(user=self.user)
+        self.deleted.soft_delete()
+        self.breakdown.delete(for_real=True)
+
+    def _read_delta(self, response):
+        zf = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        changed = list(csv.DictReader(io.StringIO(zf.read('wins_changed.csv').decode('utf-8-sig'))))
+        deleted = list(csv.DictReader(io.StringIO(zf.read('wins_deleted.csv').decode('utf-8'))))
+        return {row['id'] for row in changed}, [row['id'] for row in deleted]
+
+    def test_changed_since(self):
+        self.assertEqual(
+            {str(win.id) for win in Win.objects.changed_since(self.since)},
+            {str(win.id) for win in (self.edited, self.advised, self.created, self.breakdown_deleted)},
+        )
+
+    def test_delta_of_changed_and_deleted_wins(self):
+        response = CompleteWinsCSVView().delta_response(self.since, 'wins_changed.zip')
+
+        changed, deleted = self._read_delta(response)
+        self.assertEqual(changed, {
+            str(win.id) for win in (self.edited, self.advised, self.created, self.breakdown_deleted)
+        })
+        self.assertEqual(deleted, [str(self.deleted.id)])
+
+    @override_settings(CSV_DELTA_LAG=60)
+    def test_watermark_lags_behind_request(self):
+        started = now()
+        response = CompleteWinsCSVView().delta_response(self.since, 'wins_changed.zip')
+        watermark = parse_datetime(response['X-Watermark'])
+        self.assertLessEqual(watermark, started - timedelta(seconds=59))
+        self.assertGreaterEqual(watermark, started - timedelta(seconds=61))
+        self._read_delta(response)
+
+        # saved just before the request, by a transaction committed after it
+        late = WinFactory(user=self.user)
+        Win.objects.filter(id=late.id).update(updated=started - timedelta(seconds=1))
+
+        response = CompleteWinsCSVView().delta_response(watermark, 'wins_changed.zip')
+        changed, _ = self._read_delta(response)
+        self.assertIn(str(late.id), changed)
+        # changes within the lag are delivered again
+        self.assertIn(str(self.created.id), changed)
+
+    @override_settings(UI_SECRET=AliceClient.SECRET)
+    def test_current_financial_year_delta(self):
+        admin = UserFactory.create(is_superuser=True, is_staff=True, email='a@b.c')
+        admin.set_password('asdf')
+        admin.save()
+        NotificationFactory(win=self.unchanged)
+        NotificationFactory(win=self.edited)
+        client = AliceClient()
+        client.login(username=admin.email, password='asdf')
+
+        url = reverse('csv_auto') + '?' + urlencode({'since': self.since.isoformat()})
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        changed, _ = self._read_delta(response)
+        self.assertEqual(changed, {str(self.unchanged.id), str(self.edited.id)})
+
+        response = client.get(reverse('csv_auto') + '?since=yesterday')
+        self.assertEqual(response.status_code, 400)
@@ -6,11 +6,13 @@ from wins.models import (
     CustomerResponse,
     Notification,
     Win,
+    split_hvc_code,
 )
 from wins.factories import (
     AdvisorFactory,
     BreakdownFactory,
     CustomerResponseFactory,
+    HVCFactory,
     NotificationFactory,
     WinFactory,
 )
@@ -94,3 +96,36 @@ class WinSoftDeleteTest(TestCase):
         self.assertFalse(Win.objects.inactive().count())
         self.assertTrue(CustomerResponse.objects.count())
         self.assertFalse(CustomerResponse.objects.inactive().count())
+
+
+class WinHVCPartsTest(TestCase):
+
+    def test_split_hvc_code(self):
+        self.assertEqual(split_hvc_code('E01716'), ('E017', 16))
+        self.assertEqual(split_hvc_code(''), (None, None))
+        self.assertEqual(split_hvc_code(None), (None, None))
+
+    def test_hvc_parts_follow_hvc_on_save(self):
+        win = WinFactory.create(hvc='E01716')
+        self.assertEqual((win.hvc_campaign_id, win.hvc_fin_year), ('E017', 16))
+
+        win.hvc = None
+        win.save()
+        win.refresh_from_db()
+        self.assertEqual((win.hvc_campaign_id, win.hvc_fin_year), (None, None))
+
+    def test_hvc_parts_follow_hvc_update_fields(self):
+        win = WinFactory.create(hvc='E01716')
+
+        win.hvc = 'E00217'
+        win.save(update_fields=['hvc'])
+        win.refresh_from_db()
+        self.assertEqual((win.hvc_campaign_id, win.hvc_fin_year), ('E002', 17))
+
+    def test_hvc_queryset_filters_by_campaign_id(self):
+        HVCFactory.create(campaign_id='E017', financial_year=16)
+        WinFactory.create(hvc='E01716')
+        WinFactory.create(hvc='E99916')
+        WinFactory.create(hvc=None)
+        self.assertEqual(list(Win.objects.hvc(fin_year=2016).values_list('hvc', flat=True)), ['E01716'])
+        self.assertCountEqual(Win.objects.non_hvc(fin_year=2016).values_list('hvc', flat=True), ['E99916', None])
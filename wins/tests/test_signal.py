@@ -7,8 +7,8 @@ from wins.factories import WinFactory
 
 @pytest.fixture
 def patch_transaction():
-    with patch('django.db.transaction.on_commit') as mock_tansaction:
-        yield mock_tansaction
+    with patch('wins.signals.transaction') as mock_tansaction:
+        yield mock_tansaction.on_commit
 
 
 @pytest.mark.django_db
@@ -0,0 +1,85 @@
+import gzip
+from unittest.mock import ANY, MagicMock, patch
+
+import boto3
+from botocore.stub import Stubber
+from django.core.management import call_command
+from django.test import TestCase
+
+from csvfiles.models import File as CSVFile
+from wins.views import CurrentFinancialYearWins
+
+CHUNKS = [b'id,user\n', b'1,a\n', b'2,b\n', b'3,c\n']
+
+
+@patch('core.utils.S3_PART_SIZE', 10)
+@patch.object(CurrentFinancialYearWins, '_artifact_chunks', lambda view: iter(CHUNKS))
+class UploadExportWinsCSVTestCase(TestCase):
+
+    def setUp(self):
+        self.s3 = boto3.client(
+            's3', region_name='eu-west-2', aws_access_key_id='key', aws_secret_access_key='secret')
+        client_patch = patch('wins.management.commands.upload_export_wins_csv.boto3.client')
+        client_patch.start().return_value = self.s3
+        self.addCleanup(client_patch.stop)
+
+    def _expect_part(self, stubber, part_number, body):
+        stubber.add_response(
+            'upload_part',
+            {'ETag': '"{}"'.format(part_number)},
+            {'Bucket': ANY, 'Key': ANY, 'UploadId': 'upload', 'PartNumber': part_number, 'Body': body},
+        )
+
+    def test_streamed_in_parts(self):
+        with Stubber(self.s3) as stubber:
+            stubber.add_response(
+                'create_multipart_upload',
+                {'UploadId': 'upload'},
+                {'Bucket': ANY, 'Key': ANY, 'ServerSideEncryption': 'AES256', 'ContentType': 'text/csv'},
+            )
+            self._expect_part(stubber, 1, b'id,user\n1,a\n')
+            self._expect_part(stubber, 2, b'2,b\n3,c\n')
+            stubber.add_response(
+                'complete_multipart_upload',
+                {},
+                {
+                    'Bucket': ANY,
+                    'Key': ANY,
+                    'UploadId': 'upload',
+                    'MultipartUpload': {'Parts': [
+                        {'ETag': '"1"', 'PartNumber': 1},
+                        {'ETag': '"2"', 'PartNumber': 2},
+                    ]},
+                },
+            )
+            call_command('upload_export_wins_csv')
+            stubber.assert_no_pending_responses()
+
+        self.assertTrue(CSVFile.objects.get().s3_path.endswith('.csv'))
+
+    def test_aborted_on_failure(self):
+        with Stubber(self.s3) as stubber:
+            stubber.add_response('create_multipart_upload', {'UploadId': 'upload'})
+            stubber.add_client_error('upload_part', 'InternalError')
+            stubber.add_response(
+                'abort_multipart_upload',
+                {},
+                {'Bucket': ANY, 'Key': ANY, 'UploadId': 'upload'},
+            )
+            with self.assertRaises(Exception):
+                call_command('upload_export_wins_csv')
+            stubber.assert_no_pending_responses()
+
+        self.assertFalse(CSVFile.objects.exists())
+
+    def test_gzip(self):
+        s3 = MagicMock()
+        s3.create_multipart_upload.return_value = {'UploadId': 'upload'}
+        s3.upload_part.return_value = {'ETag': '"1"'}
+        with patch('wins.management.commands.upload_export_wins_csv.boto3.client', return_value=s3):
+            call_command('upload_export_wins_csv', gzip=True)
+
+        body = b''.join(call[1]['Body'] for call in s3.upload_part.call_args_list)
+        self.assertEqual(gzip.decompress(body), b''.join(CHUNKS))
+        self.assertEqual(s3.create_multipart_upload.call_args[1]['ContentType'], 'application/gzip')
+        self.assertTrue(CSVFile.objects.get().s3_path.endswith('.csv.gz'))
@@ -8,6 +8,7 @@ from .admin import (
     SendCustomerEmailView,
     SoftDeleteWinView,
 )
+from .columnar import CompleteWinsParquetView
 from .flat_csv import CSVView, CompleteWinsCSVView, CurrentFinancialYearWins
 from .model_views import (
     StandardPagination,
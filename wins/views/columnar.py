@@ -0,0 +1,217 @@
+"""
+Columnar export of the flattened wins, for loading into pandas or Spark
+
+The columns are those of the complete wins CSV, but typed: amounts are
+integers, flags booleans, dates dates and choice labels categorical, while
+breakdowns and advisors are lists. Rows are written as Parquet row groups
+while the wins are read.
+"""
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import models
+from django.utils.functional import cached_property
+from django.utils.timezone import now
+
+from ..choice_labels import choice_labels
+from ..constants import BREAKDOWN_TYPES
+from .flat_csv import CompleteWinsCSVView
+from users.models import User
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+BREAKDOWNS = pa.list_(pa.struct([('year', pa.int32()), ('value', pa.int64())]))
+TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+# (model field classes, arrow type of their values), first match wins
+FIELD_TYPES = (
+    ((models.BooleanField, models.NullBooleanField), pa.bool_()),
+    ((models.IntegerField,), pa.int64()),
+    ((models.DateTimeField,), TIMESTAMP),
+    ((models.DateField,), pa.date32()),
+)
+
+
+def _arrow_type(model_field):
+    if model_field.choices:
+        return CATEGORY
+    for field_classes, arrow_type in FIELD_TYPES:
+        if isinstance(model_field, field_classes):
+            return arrow_type
+    return pa.string()
+
+
+class _ChunkSink(object):
+    """
+    File-like object keeping what is written until popped, so a Parquet
+    file can be streamed while its writer still tracks offsets
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class CompleteWinsParquetView(CompleteWinsCSVView):
+    """ Endpoint returning Parquet of all Win data, with foreign keys flattened """
+
+    artifact_name = 'wins_complete.parquet'
+    artifact_content_type = 'application/octet-stream'
+    # rows in each row group, the most held in memory at once
+    ROW_GROUP_SIZE = 10000
+
+    def _field_column(self, model_field, get_value):
+        """
+        (arrow type, extractor) of a model field, whose value for a win dict
+        and {table -> list of its rows} `get_value` returns
+        """
+        arrow_type = _arrow_type(model_field)
+
+        if arrow_type is CATEGORY:
+            choices = choice_labels(model_field.model, model_field.name)
+
+            def extract(win, related):
+                value = get_value(win, related)
+                if value is None or value == '':
+                    return None
+                return choices.get(value, str(value))
+        elif arrow_type == pa.string():
+            def extract(win, related):
+                value = get_value(win, related)
+                return None if value is None else str(value)
+        else:
+            extract = get_value
+
+        return arrow_type, extract
+
+    def _win_field_column(self, field_name):
+        model_field = self._get_win_field(field_name)
+        header = model_field.verbose_name or model_field.name
+
+        if field_name == 'user':
+            return header, pa.string(), lambda win, related: str(
+                User(name=win['user_name'], email=win['user_email']))
+        return (header,) + self._field_column(model_field, lambda win, related: win[field_name])
+
+    def _email_columns(self):
+        # old Wins do not have notifications
+        def email_date(win, related):
+            notifications = related['notifications']
+            return notifications[0].created if notifications else None
+
+        return [
+            ('customer email sent', pa.bool_(),
+             lambda win, related: bool(related['notifications'] or win['complete'])),
+            ('customer email date', TIMESTAMP, email_date),
+        ]
+
+    def _breakdowns_column(self, db_val, name):
+        """ (header, arrow type, extractor) of the breakdowns of given type, by year """
+
+        def extract(win, related):
+            return [
+                {'year': breakdown.year, 'value': breakdown.value}
+                for breakdown in related['breakdowns'] if breakdown.type == db_val
+            ]
+
+        return "{0} breakdowns".format(name), BREAKDOWNS, extract
+
+    def _confirmation_column(self, field_name):
+        model_field = self._get_customerresponse_field(field_name)
+        header = model_field.verbose_name or model_field.name
+        if header == 'created':
+            header = 'date response received'
+
+        def get_value(win, related):
+            confirmations = related['confirmations']
+            return getattr(confirmations[0], field_name) if confirmations else None
+
+        return (header,) + self._field_column(model_field, get_value)
+
+    @cached_property
+    def _typed_columns(self):
+        """
+        Tuple of (header, arrow type, extractor) of each column, where
+        extractor takes Win dict and {table -> list of its rows} and returns
+        the column's value
+        """
+        columns = [
+            self._win_field_column(field_name)
+            for field_name in self.win_fields
+            if field_name not in self.IGNORE_FIELDS
+        ]
+        columns.append((
+            'contributing advisors/team',
+            pa.list_(pa.string()),
+            lambda win, related: [str(advisor) for advisor in related['advisors']],
+        ))
+        columns.extend(self._email_columns())
+        columns.extend(self._breakdowns_column(db_val, name) for db_val, name in BREAKDOWN_TYPES)
+        columns.append((
+            'customer response recieved',
+            pa.bool_(),
+            lambda win, related: bool(related['confirmations']),
+        ))
+        columns.extend(
+            self._confirmation_column(field_name)
+            for field_name in self.customerresponse_fields
+            if field_name != 'win'
+        )
+        return tuple(columns)
+
+    @cached_property
+    def _win_columns(self):
+        return tuple((header, extract) for header, _, extract in self._typed_columns)
+
+    @cached_property
+    def _schema(self):
+        return pa.schema([(header, arrow_type) for header, arrow_type, _ in self._typed_columns])
+
+    def _row_group(self, win_rows):
+        """ Arrow table of a list of rows, each a list of column values """
+
+        columns = zip(*win_rows)
+        return pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema,
+        )
+
+    def _make_parquet(self, **kwargs):
+        """ Parquet of all Wins, written a row group at a time """
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, self._schema)
+        win_rows = self._make_flat_wins_csv(**kwargs)
+        for rows in iter(lambda: list(islice(win_rows, self.ROW_GROUP_SIZE)), []):
+            writer.write_table(self._row_group(rows))
+            yield sink.pop()
+        writer.close()
+        yield sink.pop()
+
+    def _build_artifact(self):
+        return self._make_parquet()
+
+    def get(self, request, format=None):
+        return self.artifact_response(request, f'wins_complete_{now().isoformat()}.parquet')
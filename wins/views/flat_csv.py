@@ -1,36 +1,108 @@
-import collections
 import csv
 import zipstream
 from zipfile import ZIP_DEFLATED
+from itertools import groupby
 from operator import attrgetter
 import mimetypes
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
 
 from django.conf import settings
 from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
 from django.core.exceptions import ValidationError
 from django.db import connection, models
 from django.db.models import F, Func
+from django.db.models.expressions import RawSQL
 from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
 from django.utils.functional import cached_property
-from django.utils.timezone import now
-from django.views.decorators.gzip import gzip_page
+from django.utils.timezone import is_naive, make_aware, now
 
 from rest_framework import permissions
+from rest_framework.exceptions import ParseError
 from rest_framework.views import APIView
 
 from alice.authenticators import IsDataTeamServer
+from ..artifacts import (
+    artifact_chunks,
+    artifact_response,
+    get_artifact,
+    gzip_unless_partial,
+    latest_artifact,
+    refresh_artifact,
+    stream_artifact,
+)
+from ..choice_labels import choice_labels
 from ..constants import BREAKDOWN_TYPES
 from ..models import Advisor, Breakdown, CustomerResponse, Notification, Win
 from ..serializers import CustomerResponseSerializer, WinSerializer
 from users .models import User
 
+# bytes of a zip member kept in memory before it is spooled to disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
 
 class HasUnusablePassword(Func):
     function = 'LEFT'
     template = f'%(function)s(%(expressions)s, 1) != \'{UNUSABLE_PASSWORD_PREFIX}\''
 
 
+def _spool(chunks):
+    """
+    Temporary file of the bytes `chunks` yields, written by a worker
+    thread, which closes its own DB connection once done
+    """
+    try:
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+    finally:
+        connection.close()
+
+
+def _read_spool(spool, chunk_size):
+    with spool:
+        yield from iter(partial(spool.read, chunk_size), b'')
+
+
+def _rows_by_win(queryset):
+    """ (win id, list of its rows) of a queryset ordered by win id """
+
+    for win_id, rows in groupby(queryset.iterator(), key=attrgetter('win_id')):
+        yield win_id, list(rows)
+
+
+def merge_related(wins, related):
+    """
+    Pair each win dict of `wins` with {name: list of its rows} for each
+    queryset in the `related` dict, all ordered by win id
+
+    Each queryset is read once through its own cursor, in step with the
+    wins, so only the current win's related rows are held in memory.
+    """
+    streams = {name: _rows_by_win(queryset) for name, queryset in related.items()}
+    heads = {name: next(stream, None) for name, stream in streams.items()}
+
+    for win in wins:
+        win_rows = {}
+        for name, stream in streams.items():
+            head = heads[name]
+            # skip rows of wins created after `wins` was read
+            while head is not None and head[0] < win['id']:
+                head = next(stream, None)
+            if head is not None and head[0] == win['id']:
+                win_rows[name] = head[1]
+                head = next(stream, None)
+            else:
+                win_rows[name] = []
+            heads[name] = head
+        yield win, win_rows
+
+
 class CSVView(APIView):
     """ Endpoint returning CSV of all Win data, with foreign keys flattened """
 
@@ -41,96 +113,13 @@ class CSVView(APIView):
     IGNORE_FIELDS = ['responded', 'sent', 'country_name', 'updated',
                      'complete', 'type', 'type_display',
                      'export_experience_display', 'location']
-    _choices_cache = {}
-
-    def __init__(self, **kwargs):
-        # cache some stuff to make flat CSV. like prefetch but works easily
-        # with .values()
-        self.users_map = {u.id: u for u in User.objects.all()}
-        prefetch_tables = [
-            ('advisors', Advisor),
-            ('breakdowns', Breakdown),
-            ('confirmations', CustomerResponse),
-            ('notifications', Notification),
-        ]
-        self.table_maps = {}
-        for table, model in prefetch_tables:
-            prefetch_map = collections.defaultdict(list)
-            instances = model.objects.all()
-            if table == 'notifications':
-                instances = instances.filter(type='c').order_by('created')
-            for instance in instances:
-                prefetch_map[instance.win_id].append(instance)
-            self.table_maps[table] = prefetch_map
-        super().__init__(**kwargs)
-
-    def _extract_breakdowns(self, win):
-        """ Return list of 10 tuples, 5 for export, 5 for non-export """
-
-        breakdowns = self.table_maps['breakdowns'][win['id']]
-        retval = []
-        for db_val, name in BREAKDOWN_TYPES:
-
-            # get breakdowns of given type sorted by year
-            type_breakdowns = [b for b in breakdowns if b.type == db_val]
-            type_breakdowns = sorted(type_breakdowns, key=attrgetter('year'))
-
-            # we currently solicit 5 years worth of breakdowns, but historic
-            # data may have no input for some years
-            for index in range(5):
-                try:
-                    breakdown = "{0}: £{1:,}".format(
-                        type_breakdowns[index].year,
-                        type_breakdowns[index].value,
-                    )
-                except IndexError:
-                    breakdown = None
-
-                retval.append((
-                    "{0} breakdown {1}".format(name, index + 1),
-                    breakdown,
-                ))
-
-        return retval
-
-    def _confirmation(self, win):
-        """ Add fields for confirmation """
-
-        if win['id'] in self.table_maps['confirmations']:
-            confirmation = self.table_maps['confirmations'][win['id']][0]
-        else:
-            confirmation = None
-
-        values = [
-            ('customer response recieved',
-             self._val_to_str(bool(confirmation)))
-        ]
-        for field_name in self.customerresponse_fields:
-            if field_name in ['win']:
-                continue
-
-            model_field = self._get_customerresponse_field(field_name)
-            if confirmation:
-                if model_field.choices:
-                    display_fn = getattr(
-                        confirmation, "get_{0}_display".format(field_name)
-                    )
-                    value = display_fn()
-                else:
-                    value = getattr(confirmation, field_name)
-            else:
-                value = ''
-
-            model_field_name = model_field.verbose_name or model_field.name
-            if model_field_name == 'created':
-                csv_field_name = 'date response received'
-                if value:
-                    value = value.date()  # just want date
-            else:
-                csv_field_name = model_field_name
-
-            values.append((csv_field_name, self._val_to_str(value)))
-        return values
+    artifact_name = 'wins.zip'
+    artifact_content_type = mimetypes.types_map['.csv']
+    # bytes of a temporary file read at a time
+    READ_CHUNK_SIZE = 64 * 1024
+    CURRENCY_FIELDS = ['total_expected_export_value',
+                       'total_expected_non_export_value',
+                       'total_expected_odi_value']
 
     def _get_model_field(self, model, name):
         return next(
@@ -163,94 +152,163 @@ class CSVView(APIView):
         else:
             return str(val)
 
-    def _choices_dict(self, choices):
-        """
-        Memoizes result of conversion of a choices object to a dict.
-        Cache is stored on the instance
-        """
-        key = id(choices)
-        result = self._choices_cache.get(key)
-        if not result:
-            result = self._choices_cache[key] = dict(choices)
-        return result
+    def _cdms_reference(self, value):
+        # numeric cdms reference numbers should be prefixed with
+        # an apostrophe to make excel interpret them as text
+        try:
+            int(value)
+        except ValueError:
+            pass
+        else:
+            if value.startswith('0'):
+                value = "'" + value
+        return value
 
-    def _get_win_data(self, win):
-        """ Take Win dict, return ordered dict of {name -> value} """
+    def _win_field_column(self, field_name):
+        """ (header, extractor) of a local field of Win """
+
+        model_field = self._get_win_field(field_name)
+        header = model_field.verbose_name or model_field.name
+        val_to_str = self._val_to_str
+
+        if field_name == 'user':
+            def extract(win, related):
+                return str(User(name=win['user_name'], email=win['user_email']))
+        elif field_name == 'created':
+            def extract(win, related):
+                return str(win['created'].date())  # don't care about time
+        elif field_name == 'cdms_reference':
+            def extract(win, related):
+                return val_to_str(self._cdms_reference(win['cdms_reference']))
+        elif model_field.choices:
+            choices = choice_labels(Win, field_name)
+            keep_unknown = model_field.attname == 'hvc'
+
+            def extract(win, related):
+                value = win[field_name]
+                if value:
+                    try:
+                        value = choices[value]
+                    except KeyError:
+                        if not keep_unknown:
+                            raise
+                return val_to_str(value)
+        elif field_name in self.CURRENCY_FIELDS:
+            def extract(win, related):
+                return "£{:,}".format(win[field_name])
+        else:
+            def extract(win, related):
+                return val_to_str(win[field_name])
 
-        # want consistent ordering so CSVs are always same format
-        win_data = collections.OrderedDict()
+        return header, extract
 
-        # local fields
-        for field_name in self.win_fields:
-            if field_name in self.IGNORE_FIELDS:
-                continue
+    def _email_columns(self):
+        """ (header, extractor) of customer email sent & date """
 
-            model_field = self._get_win_field(field_name)
-            if field_name == 'user':
-                value = str(self.users_map[win['user_id']])
-            elif field_name == 'created':
-                value = win[field_name].date()  # don't care about time
-            elif field_name == 'cdms_reference':
-                # numeric cdms reference numbers should be prefixed with
-                # an apostrophe to make excel interpret them as text
-                value = win[field_name]
-                try:
-                    int(value)
-                except ValueError:
-                    pass
-                else:
-                    if value.startswith('0'):
-                        value = "'" + value
-            else:
-                value = win[field_name]
-            # if it is a choicefield, do optimized lookup of the display value
-            if model_field.choices and value:
-                try:
-                    choices = getattr(model_field.choices, 'superset', model_field.choices)
-                    value = self._choices_dict(choices)[value]
-                except KeyError as e:
-                    if model_field.attname == 'hvc':
-                        value = value
-                    else:
-                        raise e
-            else:
-                comma_fields = [
-                    'total_expected_export_value',
-                    'total_expected_non_export_value',
-                    'total_expected_odi_value',
-                ]
-                if field_name in comma_fields:
-                    value = "£{:,}".format(value)
+        # old Wins do not have notifications
+        def email_sent(win, related):
+            return self._val_to_str(bool(related['notifications'] or win['complete']))
+
+        def email_date(win, related):
+            notifications = related['notifications']
+            if notifications:
+                return str(notifications[0].created.date())
+            elif win['complete']:
+                return '[manual]'
+            return ''
 
-            model_field_name = model_field.verbose_name or model_field.name
-            win_data[model_field_name] = self._val_to_str(value)
+        return [
+            ('customer email sent', email_sent),
+            ('customer email date', email_date),
+        ]
 
-        # remote fields
-        win_data['contributing advisors/team'] = (
-            ', '.join(map(str, self.table_maps['advisors'][win['id']]))
-        )
+    def _breakdown_column(self, db_val, name, index):
+        """ (header, extractor) of the breakdown of given type and index """
 
-        # get customer email sent & date
-        notifications = self.table_maps['notifications'][win['id']]
-        # old Wins do not have notifications
-        email_sent = bool(notifications or win['complete'])
-        win_data['customer email sent'] = self._val_to_str(email_sent)
-        if notifications:
-            win_data['customer email date'] = str(
-                notifications[0].created.date())
-        elif win['complete']:
-            win_data['customer email date'] = '[manual]'
+        def extract(win, related):
+            # breakdowns are ordered by year, see `_related_rows`
+            type_breakdowns = [b for b in related['breakdowns'] if b.type == db_val]
+            try:
+                breakdown = type_breakdowns[index]
+            except IndexError:
+                return ''
+            return "{0}: £{1:,}".format(breakdown.year, breakdown.value)
+
+        return "{0} breakdown {1}".format(name, index + 1), extract
+
+    def _confirmation_column(self, field_name):
+        """ (header, extractor) of a field of the customer response """
+
+        model_field = self._get_customerresponse_field(field_name)
+        header = model_field.verbose_name or model_field.name
+        choices = choice_labels(CustomerResponse, field_name) if model_field.choices else None
+        val_to_str = self._val_to_str
+
+        if header == 'created':
+            header = 'date response received'
+
+            def extract(win, related):
+                confirmations = related['confirmations']
+                return str(confirmations[0].created.date()) if confirmations else ''  # just want date
         else:
-            win_data['customer email date'] = ''
+            def extract(win, related):
+                confirmations = related['confirmations']
+                if not confirmations:
+                    return ''
+                value = getattr(confirmations[0], field_name)
+                if choices is not None:
+                    value = choices.get(value, value)
+                return val_to_str(value)
+
+        return header, extract
 
-        win_data.update(self._extract_breakdowns(win))
-        win_data.update(self._confirmation(win))
+    @cached_property
+    def _win_columns(self):
+        """
+        Tuple of (header, extractor) of each column of the flat CSV, where
+        extractor takes Win dict and {table -> list of its rows} and returns
+        the column's value as str
+        """
 
-        return win_data
+        columns = [
+            self._win_field_column(field_name)
+            for field_name in self.win_fields
+            if field_name not in self.IGNORE_FIELDS
+        ]
 
-    def _make_flat_wins_csv(self, deleted=False):
-        """ Make CSV of all Wins, with non-local data flattened """
+        # remote fields
+        columns.append((
+            'contributing advisors/team',
+            lambda win, related: ', '.join(map(str, related['advisors'])),
+        ))
+        columns.extend(self._email_columns())
+
+        # we currently solicit 5 years worth of breakdowns, but historic
+        # data may have no input for some years
+        for db_val, name in BREAKDOWN_TYPES:
+            columns.extend(self._breakdown_column(db_val, name, index) for index in range(5))
+
+        columns.append((
+            'customer response recieved',
+            lambda win, related: self._val_to_str(bool(related['confirmations'])),
+        ))
+        columns.extend(
+            self._confirmation_column(field_name)
+            for field_name in self.customerresponse_fields
+            if field_name != 'win'
+        )
+        return tuple(columns)
 
+    @cached_property
+    def _win_headers(self):
+        return [header for header, _ in self._win_columns]
+
+    def _get_win_row(self, win, related):
+        """ Take Win dict and {table -> list of its rows}, return list of CSV values """
+
+        return [extract(win, related) for _, extract in self._win_columns]
+
+    def _wins(self, deleted=False):
         if deleted:
             wins = Win.objects.inactive()
         else:
@@ -261,20 +319,48 @@ class CSVView(APIView):
             wins = wins.exclude(
                 user__email__in=settings.IGNORE_USERS
             )
+        return wins
+
+    def _related_rows(self, wins):
+        """ Rows of related tables flattened into the CSV, ordered by win id """
+
+        win_ids = wins.order_by().values('id')
+        return {
+            'advisors': Advisor.objects.filter(win__in=win_ids).order_by('win_id', 'id'),
+            'breakdowns': Breakdown.objects.filter(win__in=win_ids).order_by('win_id', 'year'),
+            'confirmations': CustomerResponse.objects.filter(win__in=win_ids).order_by('win_id'),
+            'notifications': Notification.objects.filter(
+                win__in=win_ids, type='c').order_by('win_id', 'created'),
+        }
+
+    def _win_rows(self, wins):
+        """
+        CSV row of each of `wins`, streamed in order of win id and merged
+        with the related rows of one win at a time
+        """
+        related = self._related_rows(wins)
+        wins = wins.order_by('id').annotate(
+            user_name=F('user__name'),
+            user_email=F('user__email'),
+        ).values().iterator()
+
+        for win, win_related in merge_related(wins, related):
+            yield self._get_win_row(win, win_related)
+
+    def _make_flat_wins_csv(self, deleted=False):
+        """ Make CSV of all Wins, with non-local data flattened """
 
         stringio = Echo()
         yield stringio.write(u'\ufeff').encode('utf-8')
 
-        if wins.count():
-            wins_iter = wins.values().iterator()
-            win_datas = (self._get_win_data(win) for win in wins_iter)
-            first = next(win_datas)
-            csv_writer = csv.DictWriter(stringio, first.keys())
-            header = dict(zip(csv_writer.fieldnames, csv_writer.fieldnames))
-            yield csv_writer.writerow(header).encode('utf-8')
+        win_rows = self._win_rows(self._wins(deleted))
+        first = next(win_rows, None)
+        if first is not None:
+            csv_writer = csv.writer(stringio)
+            yield csv_writer.writerow(self._win_headers).encode('utf-8')
             yield csv_writer.writerow(first).encode('utf-8')
-            for win_data in win_datas:
-                yield csv_writer.writerow(win_data).encode('utf-8')
+            for win_row in win_rows:
+                yield csv_writer.writerow(win_row).encode('utf-8')
 
     def _make_user_csv(self):
         users = User.objects.all().values(
@@ -296,6 +382,27 @@ class CSVView(APIView):
     def _make_plain_csv(self, table):
         """ Get CSV of table """
 
+        if connection.vendor == 'postgresql':
+            return self._copy_plain_csv(table)
+        return self._select_plain_csv(table)
+
+    def _copy_plain_csv(self, table):
+        """
+        CSV of table written by Postgres itself, with no Python work per row
+
+        COPY writes the whole table before returning, so it is spooled to a
+        temporary file and read back in chunks.
+        """
+        with tempfile.TemporaryFile() as dump:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    "COPY (select * from wins_{}) TO STDOUT WITH CSV HEADER".format(table),
+                    dump,
+                )
+            dump.seek(0)
+            yield from iter(partial(dump.read, self.READ_CHUNK_SIZE), b'')
+
+    def _select_plain_csv(self, table):
         cursor = connection.cursor()
         cursor.execute("select * from wins_{};".format(table))
         csv_writer = csv.writer(Echo())
@@ -304,24 +411,86 @@ class CSVView(APIView):
         for row in cursor:
             yield csv_writer.writerow(row).encode('utf-8')
 
-    def get(self, request, format=None):
+    def _zip_members(self):
+        """ (name, iterator of bytes) of each member of the admin zip """
+
+        members = [
+            (table + 's.csv', self._make_plain_csv(table))
+            for table in ['customerresponse', 'notification', 'advisor']
+        ]
+        members.append(('wins_complete.csv', self._make_flat_wins_csv()))
+        members.append(('wins_deleted_complete.csv', self._make_flat_wins_csv(deleted=True)))
+        members.append(('users.csv', self._make_user_csv()))
+        return members
+
+    def _make_zip(self):
+        """
+        Zip of the admin CSVs, each built at the same time by a worker with
+        its own DB connection into a temporary file
+
+        Inside a transaction, whose rows other connections cannot see, the
+        members are built one after another as the zip is read.
+        """
         zf = zipstream.ZipFile(mode='w', compression=ZIP_DEFLATED)
-        for table in ['customerresponse', 'notification', 'advisor']:
-            csv_iter = self._make_plain_csv(table)
-            zf.write_iter(table + 's.csv', csv_iter)
+        members = self._zip_members()
+
+        if connection.in_atomic_block:
+            for name, csv_iter in members:
+                zf.write_iter(name, csv_iter)
+            return zf
 
-        full_csv_iter = self._make_flat_wins_csv()
-        zf.write_iter('wins_complete.csv', full_csv_iter)
+        with ThreadPoolExecutor(max_workers=settings.CSV_EXPORT_WORKERS) as pool:
+            spools = [pool.submit(_spool, csv_iter) for _, csv_iter in members]
+        for (name, _), spool in zip(members, spools):
+            zf.write_iter(name, _read_spool(spool.result(), self.READ_CHUNK_SIZE))
+        return zf
 
-        full_csv_del_iter = self._make_flat_wins_csv(deleted=True)
-        zf.write_iter('wins_deleted_complete.csv', full_csv_del_iter)
+    def _artifact_params(self):
+        return ()
 
-        user_csv_iter = self._make_user_csv()
-        zf.write_iter('users.csv', user_csv_iter)
+    def _build_artifact(self):
+        return self._make_zip()
 
-        response = StreamingHttpResponse(zf, content_type=mimetypes.types_map['.csv'])
+    def _get_artifact(self):
+        """ (path, digest) of the prebuilt download of this view, see `wins.artifacts` """
+        return get_artifact(self.artifact_name, self._build_artifact, *self._artifact_params())
 
-        return response
+    def _artifact_chunks(self):
+        """ Bytes of the download of this view, without writing it to disk """
+        return artifact_chunks(self.artifact_name, self._build_artifact, *self._artifact_params())
+
+    def _refresh_artifact(self):
+        """ Build the download of this view for the current data in the background """
+        return refresh_artifact(self.artifact_name, self._build_artifact, *self._artifact_params())
+
+    def _serve_artifact(self, request):
+        """
+        Response serving the latest build of the download of this view, see
+        `wins.artifacts`, while one for the current data is built in the
+        background, or streaming the download as it is first built
+        """
+        params = self._artifact_params()
+        # a build found may be pruned by a newer one before it is opened
+        for _ in range(2):
+            artifact = latest_artifact(self.artifact_name, *params)
+            if artifact is None:
+                break
+            path, digest, current = artifact
+            try:
+                response = artifact_response(request, path, digest, self.artifact_content_type)
+            except FileNotFoundError:
+                continue
+            if not current:
+                self._refresh_artifact()
+            return response
+
+        return StreamingHttpResponse(
+            stream_artifact(self.artifact_name, self._build_artifact, *params),
+            content_type=self.artifact_content_type,
+        )
+
+    def get(self, request, format=None):
+        return self._serve_artifact(request)
 
 
 class Echo(object):
@@ -334,63 +503,107 @@ class Echo(object):
         return value
 
 
-@method_decorator(gzip_page, name='dispatch')
+@method_decorator(gzip_unless_partial, name='dispatch')
 class CompleteWinsCSVView(CSVView):
 
     permission_classes = (IsDataTeamServer,)
+    artifact_name = 'wins_complete.csv'
 
-    def _make_flat_wins_csv(self, deleted=False):
-        """ Make CSV of all Wins, with non-local data flattened """
+    def _make_flat_wins_csv(self, deleted=False, since=None):
+        """
+        Make CSV of all Wins, or those changed after `since`, with non-local
+        data flattened
+        """
+        wins = self._wins(deleted)
+        if since is not None:
+            wins = wins.changed_since(since)
+        return self._win_rows(wins)
 
-        if deleted:
-            wins = Win.objects.inactive()
-        else:
-            wins = Win.objects.all()
+    def _make_flat_wins_csv_stream(self, win_rows):
+        stringio = Echo()
+        yield stringio.write(u'\ufeff')
+        csv_writer = csv.writer(stringio)
+        yield csv_writer.writerow(self._win_headers)
 
-        if deleted:
-            # ignore users should show up in normal CSV
-            wins = wins.exclude(
-                user__email__in=settings.IGNORE_USERS
-            )
+        for win_row in win_rows:
+            yield csv_writer.writerow(win_row)
 
-        wins = wins.values()
+    def _make_flat_wins_csv_bytes(self, **kwargs):
+        for chunk in self._make_flat_wins_csv_stream(self._make_flat_wins_csv(**kwargs)):
+            yield chunk.encode('utf-8')
 
-        for win in wins:
-            yield self._get_win_data(win)
+    def _make_deleted_ids_csv(self, since):
+        """ CSV of ids of Wins soft-deleted after `since` """
 
-    def _make_flat_wins_csv_stream(self, win_data_generator):
-        stringio = Echo()
-        yield stringio.write(u'\ufeff')
-        first = next(win_data_generator)
-        csv_writer = csv.DictWriter(stringio, first.keys())
-        header = dict(zip(first.keys(), first.keys()))
-        yield csv_writer.writerow(header)
-        yield csv_writer.writerow(first)
+        csv_writer = csv.writer(Echo())
+        yield csv_writer.writerow(['id']).encode('utf-8')
+        deleted_ids = Win.objects.inactive().filter(updated__gt=since).values_list('id', flat=True)
+        for win_id in deleted_ids.iterator():
+            yield csv_writer.writerow([win_id]).encode('utf-8')
+
+    def _build_artifact(self):
+        return self._make_flat_wins_csv_bytes()
+
+    def _since(self, request):
+        """ Watermark of a delta export from the `since` query param, if any """
+
+        since = request.GET.get('since')
+        if not since:
+            return None
+        try:
+            since = models.DateTimeField().to_python(since)
+        except ValidationError:
+            since = None
+        if since is None:
+            raise ParseError('since must be a date or timestamp')
+        return make_aware(since) if is_naive(since) else since
+
+    def delta_response(self, since, filename):
+        """
+        Zip of the CSV of Wins changed after `since` and of ids of Wins
+        deleted since, with the watermark of the next delta in a header
 
-        for win_data in win_data_generator:
-            yield csv_writer.writerow(win_data)
+        `updated` is set when a row is saved, not when its transaction is
+        committed, so the watermark lags `settings.CSV_DELTA_LAG` behind the
+        request, and Wins changed within the lag are in the next delta too.
+        """
+        watermark = now() - timedelta(seconds=settings.CSV_DELTA_LAG)
+        zf = zipstream.ZipFile(mode='w', compression=ZIP_DEFLATED)
+        zf.write_iter('wins_changed.csv', self._make_flat_wins_csv_bytes(since=since))
+        zf.write_iter('wins_deleted.csv', self._make_deleted_ids_csv(since))
 
-    def streaming_response(self, filename):
-        resp = StreamingHttpResponse(
-            self._make_flat_wins_csv_stream(self._make_flat_wins_csv()),
-            content_type=mimetypes.types_map['.csv'],
-        )
+        resp = StreamingHttpResponse(zf, content_type=mimetypes.types_map['.zip'])
+        resp['Content-Disposition'] = f'attachment; filename={filename}'
+        resp['X-Watermark'] = watermark.isoformat()
+        return resp
+
+    def artifact_response(self, request, filename):
+        resp = self._serve_artifact(request)
         resp['Content-Disposition'] = f'attachent; filename={filename}'
         return resp
 
     def get(self, request, format=None):
-        return self.streaming_response(f'wins_complete_{now().isoformat()}.csv')
+        since = self._since(request)
+        if since is not None:
+            return self.delta_response(since, f'wins_changed_{now().isoformat()}.zip')
+        return self.artifact_response(request, f'wins_complete_{now().isoformat()}.csv')
 
 
-@method_decorator(gzip_page, name='dispatch')
+@method_decorator(gzip_unless_partial, name='dispatch')
 class CurrentFinancialYearWins(CompleteWinsCSVView):
 
     permission_classes = (permissions.IsAdminUser,)
+    artifact_name = 'wins_current_fy.csv'
     end_date = None
 
-    def _make_flat_wins_csv(self, **kwargs):
+    def _artifact_params(self):
+        # the completed wins view is of the financial year of today
+        return self.end_date, date.today()
+
+    def _make_flat_wins_csv(self, since=None, **kwargs):
         """
-        Make CSV of all completed Wins till now for this financial year, with non-local data flattened
+        Make CSV of all completed Wins till now for this financial year, or those changed after `since`,
+        with non-local data flattened
         remove all rows where:
         1. total expected export value = 0 and total non export value = 0 and total odi value = 0
         2. date created = today (not necessary if this task runs before end of the day for next day download)
@@ -399,18 +612,15 @@ class CurrentFinancialYearWins(CompleteWinsCSVView):
         Note that this view removes win, notification and customer response entries
         that might have been made inactive in duecourse
         """
-        with connection.cursor() as cursor:
-            if self.end_date:
-                cursor.execute(
-                    "SELECT id FROM wins_completed_wins_fy where created <= %s", (self.end_date,))
-            else:
-                cursor.execute("SELECT id FROM wins_completed_wins_fy")
-            ids = cursor.fetchall()
-
-        wins = Win.objects.filter(id__in=[id[0] for id in ids]).values()
+        if self.end_date:
+            completed_ids = RawSQL("SELECT id FROM wins_completed_wins_fy where created <= %s", (self.end_date,))
+        else:
+            completed_ids = RawSQL("SELECT id FROM wins_completed_wins_fy", ())
 
-        for win in wins:
-            yield self._get_win_data(win)
+        wins = Win.objects.filter(id__in=completed_ids)
+        if since is not None:
+            wins = wins.changed_since(since)
+        return self._win_rows(wins)
 
     def get(self, request, format=None):
         end_str = request.GET.get("end", None)
@@ -420,4 +630,7 @@ class CurrentFinancialYearWins(CompleteWinsCSVView):
             except ValidationError:
                 self.end_date = None
 
-        return self.streaming_response(f'wins_current_fy_{now().isoformat()}.csv')
+        since = self._since(request)
+        if since is not None:
+            return self.delta_response(since, f'wins_current_fy_changed_{now().isoformat()}.zip')
+        return self.artifact_response(request, f'wins_current_fy_{now().isoformat()}.csv')